@@ -26,6 +26,13 @@ from models import Base  # Importar a base do SQLAlchemy
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """O índice de busca (busca.py) é criado fora do metadata; o autogenerate não deve apagá-lo."""
+    if reflected and compare_to is None and name and (name.startswith("busca_catalogo") or name.endswith("_busca")):
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -71,7 +78,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,32 @@
+"""versões das tabelas do catálogo (ETag)
+
+Revision ID: a3c9e07d5b21
+Revises: e5f17a2b9c04
+Create Date: 2026-10-18 15:12:40.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e07d5b21'
+down_revision: Union[str, Sequence[str], None] = 'e5f17a2b9c04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('versoes_tabelas',
+    sa.Column('TABELA', sa.String(), nullable=False),
+    sa.Column('VERSAO', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('TABELA')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('versoes_tabelas')
@@ -0,0 +1,54 @@
+"""índices para consultas frequentes (chaves estrangeiras e filtros)
+
+Revision ID: b7e2c4a91d3f
+Revises: d6baac1e21e1
+Create Date: 2026-10-18 10:12:41.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c4a91d3f'
+down_revision: Union[str, Sequence[str], None] = 'd6baac1e21e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDICES = [
+    # deletar_usuario: cliente do usuário
+    ('ix_clientes_id_usuario', 'clientes', ['ID_USUARIO']),
+    # criar_pet: pet duplicado por cliente (índice cobre a consulta inteira)
+    ('ix_pets_id_cliente_nome', 'pets', ['ID_CLIENTE', 'NOME']),
+    # listagem de brinquedos por categoria e/ou faixa de preço
+    ('ix_brinquedos_categoria_preco', 'brinquedos', ['CATEGORIA', 'PRECO']),
+    ('ix_brinquedos_preco', 'brinquedos', ['PRECO']),
+    # chaves estrangeiras de transacoes (join com clientes e buscas por remédio/pet)
+    ('ix_transacoes_id_cliente', 'transacoes', ['ID_CLIENTE']),
+    ('ix_transacoes_id_remedio', 'transacoes', ['ID_REMEDIO']),
+    ('ix_transacoes_id_pet', 'transacoes', ['ID_PET']),
+]
+
+
+def _tabelas_existentes():
+    # bancos antigos podem não ter todas as tabelas (ex.: brinquedos criada via create_tables.py)
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tabelas = _tabelas_existentes()
+    for nome, tabela, colunas in INDICES:
+        if tabela in tabelas:
+            op.create_index(nome, tabela, colunas)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    tabelas = _tabelas_existentes()
+    for nome, tabela, _ in reversed(INDICES):
+        if tabela in tabelas:
+            op.drop_index(nome, table_name=tabela)
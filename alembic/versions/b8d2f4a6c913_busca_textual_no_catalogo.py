@@ -0,0 +1,90 @@
+"""busca textual no catálogo (FTS5 / tsvector)
+
+Revision ID: b8d2f4a6c913
+Revises: a3c9e07d5b21
+Create Date: 2026-10-18 16:04:27.915230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d2f4a6c913'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e07d5b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Cópia do DDL de busca.py no momento desta revisão (a migração não importa o código da
+# aplicação, que pode mudar depois). rowid = ID * 2 nos brinquedos e ID * 2 + 1 nos remédios.
+DDL_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS busca_catalogo USING fts5("
+    "TIPO UNINDEXED, NOME, DESCRICAO, tokenize = 'unicode61 remove_diacritics 2')",
+
+    'CREATE TRIGGER IF NOT EXISTS busca_brinquedos_ai AFTER INSERT ON brinquedos BEGIN '
+    'INSERT INTO busca_catalogo(rowid, TIPO, NOME, DESCRICAO) '
+    'VALUES (new."ID" * 2 + 0, \'BRINQUEDO\', new."NOME", new."DESCRICAO"); END',
+    'CREATE TRIGGER IF NOT EXISTS busca_brinquedos_ad AFTER DELETE ON brinquedos BEGIN '
+    'DELETE FROM busca_catalogo WHERE rowid = old."ID" * 2 + 0; END',
+    'CREATE TRIGGER IF NOT EXISTS busca_brinquedos_au AFTER UPDATE OF "ID", "NOME", "DESCRICAO" ON brinquedos BEGIN '
+    'DELETE FROM busca_catalogo WHERE rowid = old."ID" * 2 + 0; '
+    'INSERT INTO busca_catalogo(rowid, TIPO, NOME, DESCRICAO) '
+    'VALUES (new."ID" * 2 + 0, \'BRINQUEDO\', new."NOME", new."DESCRICAO"); END',
+
+    'CREATE TRIGGER IF NOT EXISTS busca_remedios_ai AFTER INSERT ON remedios BEGIN '
+    'INSERT INTO busca_catalogo(rowid, TIPO, NOME, DESCRICAO) '
+    'VALUES (new."ID" * 2 + 1, \'REMEDIO\', new."NOME", new."DESCRICAO"); END',
+    'CREATE TRIGGER IF NOT EXISTS busca_remedios_ad AFTER DELETE ON remedios BEGIN '
+    'DELETE FROM busca_catalogo WHERE rowid = old."ID" * 2 + 1; END',
+    'CREATE TRIGGER IF NOT EXISTS busca_remedios_au AFTER UPDATE OF "ID", "NOME", "DESCRICAO" ON remedios BEGIN '
+    'DELETE FROM busca_catalogo WHERE rowid = old."ID" * 2 + 1; '
+    'INSERT INTO busca_catalogo(rowid, TIPO, NOME, DESCRICAO) '
+    'VALUES (new."ID" * 2 + 1, \'REMEDIO\', new."NOME", new."DESCRICAO"); END',
+]
+
+# carga inicial a partir do catálogo atual (no Postgres o índice já nasce cheio)
+CARGA_SQLITE = [
+    'INSERT INTO busca_catalogo(rowid, TIPO, NOME, DESCRICAO) '
+    'SELECT "ID" * 2 + 0, \'BRINQUEDO\', "NOME", "DESCRICAO" FROM brinquedos',
+    'INSERT INTO busca_catalogo(rowid, TIPO, NOME, DESCRICAO) '
+    'SELECT "ID" * 2 + 1, \'REMEDIO\', "NOME", "DESCRICAO" FROM remedios',
+]
+
+DDL_POSTGRES = [
+    f'CREATE INDEX IF NOT EXISTS ix_{tabela}_busca ON {tabela} USING GIN (('
+    f'setweight(to_tsvector(\'portuguese\', coalesce({tabela}."NOME", \'\')), \'A\') || '
+    f'setweight(to_tsvector(\'portuguese\', coalesce({tabela}."DESCRICAO", \'\')), \'B\')))'
+    for tabela in ('brinquedos', 'remedios')
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conexao = op.get_bind()
+    tabelas = sa.inspect(conexao).get_table_names()
+    if 'brinquedos' not in tabelas or 'remedios' not in tabelas:
+        return
+    if conexao.dialect.name == 'sqlite':
+        for comando in DDL_SQLITE:
+            op.execute(comando)
+        op.execute('DELETE FROM busca_catalogo')
+        for comando in CARGA_SQLITE:
+            op.execute(comando)
+    elif conexao.dialect.name == 'postgresql':
+        for comando in DDL_POSTGRES:
+            op.execute(comando)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'sqlite':
+        for tabela in ('brinquedos', 'remedios'):
+            for sufixo in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS busca_{tabela}_{sufixo}')
+        op.execute('DROP TABLE IF EXISTS busca_catalogo')
+    elif dialeto == 'postgresql':
+        for tabela in ('brinquedos', 'remedios'):
+            op.execute(f'DROP INDEX IF EXISTS ix_{tabela}_busca')
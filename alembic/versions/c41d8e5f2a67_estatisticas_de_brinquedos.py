@@ -0,0 +1,49 @@
+"""estatísticas de brinquedos por categoria
+
+Revision ID: c41d8e5f2a67
+Revises: b7e2c4a91d3f
+Create Date: 2026-10-18 11:03:55.418270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e5f2a67'
+down_revision: Union[str, Sequence[str], None] = 'b7e2c4a91d3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('brinquedos_estatisticas',
+    sa.Column('CATEGORIA', sa.String(), nullable=False),
+    sa.Column('TOTAL_PRODUTOS', sa.Integer(), nullable=False),
+    sa.Column('TOTAL_UNIDADES', sa.Integer(), nullable=False),
+    sa.Column('VALOR_ESTOQUE', sa.Float(), nullable=False),
+    sa.Column('EM_FALTA', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('CATEGORIA')
+    )
+
+    if 'brinquedos' in sa.inspect(op.get_bind()).get_table_names():
+        op.create_index('ix_brinquedos_estoque', 'brinquedos', ['ESTOQUE'])
+        # carga inicial a partir do catálogo atual
+        op.execute(
+            'INSERT INTO brinquedos_estatisticas '
+            '("CATEGORIA", "TOTAL_PRODUTOS", "TOTAL_UNIDADES", "VALOR_ESTOQUE", "EM_FALTA") '
+            'SELECT "CATEGORIA", COUNT(*), SUM(COALESCE("ESTOQUE", 0)), '
+            'SUM("PRECO" * COALESCE("ESTOQUE", 0)), '
+            'SUM(CASE WHEN COALESCE("ESTOQUE", 0) = 0 THEN 1 ELSE 0 END) '
+            'FROM brinquedos GROUP BY "CATEGORIA"'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if 'brinquedos' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_index('ix_brinquedos_estoque', table_name='brinquedos')
+    op.drop_table('brinquedos_estatisticas')
@@ -0,0 +1,66 @@
+"""resumo de vendas por forma de pagamento, remédio, cliente e pet
+
+Revision ID: c5a8e3d7f214
+Revises: b8d2f4a6c913
+Create Date: 2026-10-18 18:22:41.603118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a8e3d7f214'
+down_revision: Union[str, Sequence[str], None] = 'b8d2f4a6c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Carga inicial: uma agregação por dimensão (mesmas regras dos eventos em models.py:
+# chaves nulas ficam fora da dimensão; o total geral é a soma das linhas REMEDIO).
+RESUMO_PELAS_TRANSACOES = """
+INSERT INTO vendas_resumo ("DIMENSAO", "CHAVE", "TRANSACOES", "UNIDADES", "RECEITA")
+SELECT 'FORMA_PAGAMENTO', "FORMA_PAGAMENTO", COUNT(*), SUM(COALESCE("QUANTIDADE", 0)), SUM(COALESCE("VALOR_TOTAL", 0))
+  FROM transacoes WHERE "FORMA_PAGAMENTO" IS NOT NULL GROUP BY "FORMA_PAGAMENTO"
+UNION ALL
+SELECT 'REMEDIO', CAST("ID_REMEDIO" AS VARCHAR), COUNT(*), SUM(COALESCE("QUANTIDADE", 0)), SUM(COALESCE("VALOR_TOTAL", 0))
+  FROM transacoes WHERE "ID_REMEDIO" IS NOT NULL GROUP BY "ID_REMEDIO"
+UNION ALL
+SELECT 'CLIENTE', CAST("ID_CLIENTE" AS VARCHAR), COUNT(*), SUM(COALESCE("QUANTIDADE", 0)), SUM(COALESCE("VALOR_TOTAL", 0))
+  FROM transacoes WHERE "ID_CLIENTE" IS NOT NULL GROUP BY "ID_CLIENTE"
+UNION ALL
+SELECT 'PET', CAST("ID_PET" AS VARCHAR), COUNT(*), SUM(COALESCE("QUANTIDADE", 0)), SUM(COALESCE("VALOR_TOTAL", 0))
+  FROM transacoes WHERE "ID_PET" IS NOT NULL GROUP BY "ID_PET"
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('vendas_resumo',
+    sa.Column('DIMENSAO', sa.String(), nullable=False),
+    sa.Column('CHAVE', sa.String(), nullable=False),
+    sa.Column('TRANSACOES', sa.Integer(), nullable=False),
+    sa.Column('UNIDADES', sa.Integer(), nullable=False),
+    sa.Column('RECEITA', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('DIMENSAO', 'CHAVE')
+    )
+    op.create_index('ix_vendas_resumo_receita', 'vendas_resumo', ['DIMENSAO', 'RECEITA'])
+    op.create_index('ix_vendas_resumo_unidades', 'vendas_resumo', ['DIMENSAO', 'UNIDADES'])
+    op.create_index('ix_vendas_resumo_transacoes', 'vendas_resumo', ['DIMENSAO', 'TRANSACOES'])
+
+    inspetor = sa.inspect(op.get_bind())
+    if 'transacoes' in inspetor.get_table_names():
+        colunas = {coluna['name'] for coluna in inspetor.get_columns('transacoes')}
+        # carga inicial a partir das transações existentes (bancos antigos, com colunas
+        # "ID CLIENTE" etc., ficam vazios até serem migrados para o modelo atual)
+        if {'ID_CLIENTE', 'ID_REMEDIO', 'ID_PET', 'FORMA_PAGAMENTO', 'VALOR_TOTAL'} <= colunas:
+            op.execute(RESUMO_PELAS_TRANSACOES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_vendas_resumo_transacoes', table_name='vendas_resumo')
+    op.drop_index('ix_vendas_resumo_unidades', table_name='vendas_resumo')
+    op.drop_index('ix_vendas_resumo_receita', table_name='vendas_resumo')
+    op.drop_table('vendas_resumo')
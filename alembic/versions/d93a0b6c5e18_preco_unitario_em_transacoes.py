@@ -0,0 +1,43 @@
+"""preço unitário gravado na transação
+
+Revision ID: d93a0b6c5e18
+Revises: c41d8e5f2a67
+Create Date: 2026-10-18 11:47:20.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93a0b6c5e18'
+down_revision: Union[str, Sequence[str], None] = 'c41d8e5f2a67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRECO_UNITARIO_PELO_TOTAL = (
+    'UPDATE transacoes SET "PRECO_UNITARIO" = '
+    '("VALOR_TOTAL" + COALESCE("VALOR_DESCONTO", 0) - COALESCE("VALOR_FRETE", 0)) / "QUANTIDADE" '
+    'WHERE "VALOR_TOTAL" IS NOT NULL AND "QUANTIDADE" > 0'
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if 'transacoes' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    with op.batch_alter_table('transacoes') as batch_op:
+        batch_op.add_column(sa.Column('PRECO_UNITARIO', sa.Float(), nullable=True))
+
+    # reconstrói o preço da época da venda a partir do total já gravado
+    op.execute(PRECO_UNITARIO_PELO_TOTAL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if 'transacoes' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    with op.batch_alter_table('transacoes') as batch_op:
+        batch_op.drop_column('PRECO_UNITARIO')
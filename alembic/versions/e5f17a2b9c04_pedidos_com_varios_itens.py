@@ -0,0 +1,58 @@
+"""pedidos com vários itens (remédios e brinquedos)
+
+Revision ID: e5f17a2b9c04
+Revises: d93a0b6c5e18
+Create Date: 2026-10-18 12:31:08.662417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f17a2b9c04'
+down_revision: Union[str, Sequence[str], None] = 'd93a0b6c5e18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('pedidos',
+    sa.Column('ID', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('ID_CLIENTE', sa.Integer(), nullable=False),
+    sa.Column('VALOR_DESCONTO', sa.Float(), nullable=True),
+    sa.Column('VALOR_FRETE', sa.Float(), nullable=True),
+    sa.Column('VALOR_TOTAL', sa.Float(), nullable=True),
+    sa.Column('FORMA_PAGAMENTO', sa.String(), nullable=True),
+    sa.Column('PARCELAS', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['ID_CLIENTE'], ['clientes.ID'], ),
+    sa.PrimaryKeyConstraint('ID')
+    )
+    op.create_index('ix_pedidos_id_cliente', 'pedidos', ['ID_CLIENTE'])
+    op.create_table('itens_pedido',
+    sa.Column('ID', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('ID_PEDIDO', sa.Integer(), nullable=False),
+    sa.Column('ID_REMEDIO', sa.Integer(), nullable=True),
+    sa.Column('ID_BRINQUEDO', sa.Integer(), nullable=True),
+    sa.Column('ID_PET', sa.Integer(), nullable=True),
+    sa.Column('QUANTIDADE', sa.Integer(), nullable=False),
+    sa.Column('PRECO_UNITARIO', sa.Float(), nullable=False),
+    sa.Column('VALOR_TOTAL', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['ID_PEDIDO'], ['pedidos.ID'], ),
+    sa.ForeignKeyConstraint(['ID_REMEDIO'], ['remedios.ID'], ),
+    sa.ForeignKeyConstraint(['ID_BRINQUEDO'], ['brinquedos.ID'], ),
+    sa.ForeignKeyConstraint(['ID_PET'], ['pets.ID'], ),
+    sa.PrimaryKeyConstraint('ID')
+    )
+    op.create_index('ix_itens_pedido_id_pedido', 'itens_pedido', ['ID_PEDIDO'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_itens_pedido_id_pedido', table_name='itens_pedido')
+    op.drop_table('itens_pedido')
+    op.drop_index('ix_pedidos_id_cliente', table_name='pedidos')
+    op.drop_table('pedidos')
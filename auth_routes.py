@@ -1,32 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException
-from models import Usuario, db,Cliente
-from dependencies import pegar_sessao
-from security import bcrypt_context
+from models import Usuario, Cliente
+from dependencies import pegar_sessao_async
+from security import servico_senhas
 from schemas import UsuarioSchema
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import pandas as pd
 
 auth_router = APIRouter(prefix="/auth",tags=["auth"])
 
 
 
 @auth_router.post("/criar_conta", status_code=201)
-async def criar_conta(usuarioschema:UsuarioSchema,session: Session=Depends(pegar_sessao)):
+async def criar_conta(usuarioschema:UsuarioSchema,session: AsyncSession = Depends(pegar_sessao_async)):
     """Essa é a rota para criar um novo usuário
     - Cria Usuario (hash de senha)
     - Opcionalmente cria Cliente se não for admin
     """
-    usuario = session.query(Usuario).filter(Usuario.EMAIL == usuarioschema.email).first()
+    usuario = await session.scalar(select(Usuario).where(Usuario.EMAIL == usuarioschema.email))
     if usuario:
         raise HTTPException(status_code=400, detail="Email do usuário já cadastrado")
 
     try:
-        senha_criptografada = bcrypt_context.hash(usuarioschema.senha)
+        senha_criptografada = await servico_senhas.hash(usuarioschema.senha)
         novo_usuario = Usuario(usuarioschema.nome, usuarioschema.email, senha_criptografada)
         session.add(novo_usuario)
-        session.commit()
-        session.refresh(novo_usuario)  # Garante que ID está disponível
+        await session.commit()
+        await session.refresh(novo_usuario)  # Garante que ID está disponível
 
         # Se não for admin, cria cliente associado (verifica campos mínimos)
         if not getattr(usuarioschema, 'admin', False):
@@ -50,12 +49,12 @@ async def criar_conta(usuarioschema:UsuarioSchema,session: Session=Depends(pegar
                     CPF=usuarioschema.cpf,
                 )
                 session.add(novo_cliente)
-                session.commit()
-                session.refresh(novo_cliente)
+                await session.commit()
+                await session.refresh(novo_cliente)
                 print(f"[DEBUG] Cliente criado com sucesso: id={novo_cliente.ID}")
             except Exception as exc_cli:
                 # rollback da tentativa de criar cliente (não remove o usuário já criado)
-                session.rollback()
+                await session.rollback()
                 import traceback as _tb
                 print("[ERROR] falha ao criar cliente:")
                 _tb.print_exc()
@@ -63,22 +62,24 @@ async def criar_conta(usuarioschema:UsuarioSchema,session: Session=Depends(pegar
                 raise HTTPException(status_code=500, detail=f"Erro ao criar cliente: {str(exc_cli)}")
 
         return {"mensagem": f"Usuário criado com sucesso {usuarioschema.email}", "id": novo_usuario.ID}
+    except HTTPException:
+        raise
     except Exception as exc:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao criar usuário: {str(exc)}")
     
 @auth_router.patch("/alterar_senha")
-async def alterar_senha(usuarioschema:UsuarioSchema,session: Session=Depends(pegar_sessao)):
+async def alterar_senha(usuarioschema:UsuarioSchema,session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Essa é a rota para alterar a senha do usuário
     """
-    usuario = session.query(Usuario).filter(Usuario.EMAIL==usuarioschema.email).first()
+    usuario = await session.scalar(select(Usuario).where(Usuario.EMAIL==usuarioschema.email))
     if not usuario:
         raise HTTPException(status_code=404,detail="Email do usuário não cadastrado")
-    senha_criptografada = bcrypt_context.hash(usuarioschema.senha)
+    senha_criptografada = await servico_senhas.hash(usuarioschema.senha)
     usuario.SENHA = senha_criptografada
     session.add(usuario)
-    session.commit()
+    await session.commit()
     return {"mensagem": f"Senha alterada com sucesso {usuarioschema.email}"}
 
 
@@ -89,30 +90,40 @@ async def alterar_senha(usuarioschema:UsuarioSchema,session: Session=Depends(peg
 
 
 @auth_router.post("/login")
-async def Login(usuarioschema:UsuarioSchema,session: Session=Depends(pegar_sessao)):
+async def Login(usuarioschema:UsuarioSchema,session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Essa é a rota para fazer login
     """
-    usuario = session.query(Usuario).filter(Usuario.EMAIL==usuarioschema.email).first()
+    usuario = await session.scalar(select(Usuario).where(Usuario.EMAIL==usuarioschema.email))
     if not usuario:
         raise HTTPException(status_code=404,detail="Email do usuário não cadastrado")
-    if not bcrypt_context.verify(usuarioschema.senha,usuario.SENHA):
+    if not await servico_senhas.verify(usuarioschema.senha,usuario.SENHA):
         raise HTTPException(status_code=401,detail="Senha incorreta")
     return {"mensagem": f"Login realizado com sucesso {usuarioschema.email}", "id": usuario.ID}
 
 
+@auth_router.get("/senhas/metricas")
+async def metricas_senhas():
+    """
+    Fila e tempos do pool de hashing de senhas (bcrypt)
+    - em_execucao / na_fila: situação agora
+    - rejeitadas: chamadas respondidas com 503 por falta de vaga
+    """
+    return {"mensagem": "Métricas do serviço de senhas", "data": servico_senhas.metricas()}
+
+
 @auth_router.put("/atualizar_usuario/{usuario_id}")
-async def atualizar_usuario(usuario_id: int, usuarioschema: UsuarioSchema, session: Session = Depends(pegar_sessao)):
+async def atualizar_usuario(usuario_id: int, usuarioschema: UsuarioSchema, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Atualiza os dados de um usuário existente
     """
-    usuario = session.query(Usuario).filter(Usuario.ID == usuario_id).first()
+    usuario = await session.scalar(select(Usuario).where(Usuario.ID == usuario_id))
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
     # Verifica se o email já está sendo usado por outro usuário
     if usuarioschema.email != usuario.EMAIL:
-        email_existe = session.query(Usuario).filter(Usuario.EMAIL == usuarioschema.email).first()
+        email_existe = await session.scalar(select(Usuario).where(Usuario.EMAIL == usuarioschema.email))
         if email_existe:
             raise HTTPException(status_code=400, detail="Email já está sendo usado por outro usuário")
     
@@ -120,36 +131,38 @@ async def atualizar_usuario(usuario_id: int, usuarioschema: UsuarioSchema, sessi
         usuario.NOME = usuarioschema.nome
         usuario.EMAIL = usuarioschema.email
         if usuarioschema.senha:  # Só atualiza a senha se foi fornecida
-            usuario.SENHA = bcrypt_context.hash(usuarioschema.senha)
+            usuario.SENHA = await servico_senhas.hash(usuarioschema.senha)
         usuario.ATIVO = usuarioschema.ativo if usuarioschema.ativo is not None else usuario.ATIVO
         usuario.ADMIN = usuarioschema.admin if usuarioschema.admin is not None else usuario.ADMIN
         
-        session.commit()
-        session.refresh(usuario)
+        await session.commit()
+        await session.refresh(usuario)
         return {"mensagem": f"Usuário atualizado com sucesso", "id": usuario.ID}
+    except HTTPException:
+        raise
     except Exception as exc:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar usuário: {str(exc)}")
 
 
 @auth_router.delete("/deletar_usuario/{usuario_id}")
-async def deletar_usuario(usuario_id: int, session: Session = Depends(pegar_sessao)):
+async def deletar_usuario(usuario_id: int, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Deleta um usuário do sistema
     """
-    usuario = session.query(Usuario).filter(Usuario.ID == usuario_id).first()
+    usuario = await session.scalar(select(Usuario).where(Usuario.ID == usuario_id))
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
     try:
         # Verifica se existe cliente associado
-        cliente = session.query(Cliente).filter(Cliente.ID_USUARIO == usuario_id).first()
+        cliente = await session.scalar(select(Cliente).where(Cliente.ID_USUARIO == usuario_id))
         if cliente:
-            session.delete(cliente)
+            await session.delete(cliente)
         
-        session.delete(usuario)
-        session.commit()
+        await session.delete(usuario)
+        await session.commit()
         return {"mensagem": f"Usuário deletado com sucesso", "id": usuario_id}
     except Exception as exc:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao deletar usuário: {str(exc)}")
@@ -0,0 +1,334 @@
+"""
+Benchmark da API inteira: dispara requisições contra o `main.app` no mesmo processo,
+pelo transporte ASGI do httpx (sem rede nem uvicorn), e mede latência (p50/p95/p99) e
+vazão por endpoint.
+
+O banco (SQLite temporário, não mexe no farmpet.db) é populado por tamanho com o
+gerador do `seed_brinquedos.py` (`gerar_dados`): para cada valor de `--linhas`,
+brinquedos, remédios, clientes e transações ficam com esse número de linhas (e as
+outras tabelas nas proporções de `quantidades_para`). Os tamanhos rodam em ordem
+crescente e cada um só insere o que falta, então `--linhas 10000 100000 1000000`
+carrega 1M de cada tabela uma vez só.
+
+Em cada tamanho, os cenários rodam um por vez: `--aquecimento` requisições descartadas
+e depois `--requisicoes` requisições com até `--concorrencia` ao mesmo tempo. Os
+cenários que devolvem uma tabela inteira (ou pagam um bcrypt) são "pesados" e usam
+`--requisicoes-pesadas`. As leituras rodam antes das escritas, para medir o catálogo
+estável (com o cache de respostas e o retrato colunar ativos, como em produção).
+
+Linhas de base: `--salvar base.json` grava os resultados; `--comparar base.json` roda
+de novo e mostra a diferença de cada endpoint, marcando como regressão o que piorou
+mais que `--tolerancia` (%) no p95 ou na vazão (sai com código 1 se houver alguma).
+Com dois arquivos (`--comparar base.json atual.json`) só compara, sem rodar nada.
+
+Execute: python bench_api.py [--linhas 10000 100000 1000000] [--requisicoes 200]
+         [--concorrencia 10] [--salvar base.json] [--comparar base.json]
+(precisa do httpx, que já vem com o TestClient do FastAPI)
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote_plus
+
+_pasta = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_pasta, 'bench.db')}"
+
+import httpx
+from sqlalchemy import func, insert, select
+
+from main import app
+from models import Base, Brinquedo, Remedio, Usuario, db, db_async
+from seed_brinquedos import SENHA_GERADA, gerar_dados, quantidades_para
+
+CATEGORIAS = ["Pelúcia", "Bola", "Interativo", "Mordedor"]
+PALAVRAS = ["bola", "pelucia", "resistente", "corda", "filhotes", "amoxicilina", "pipeta", "gatos"]
+
+PCT_REGRESSAO_PADRAO = 20.0  # abaixo disso é ruído comum entre duas rodadas na mesma máquina
+
+
+# ---------------------------------------------------------------- carga dos dados
+
+class Amostras:
+    """IDs e nomes reais do banco carregado, para sortear parâmetros que existem."""
+
+    def __init__(self, n, brinquedos, remedios, email):
+        self.n = n
+        self.brinquedos = brinquedos  # (ID, NOME) com estoque, para pedidos e busca por nome
+        self.remedios = remedios  # IDs com estoque, para compras
+        self.email = email  # usuário gerado para o login (senha seed_brinquedos.SENHA_GERADA)
+
+
+def popular(n, semente):
+    inicio = time.perf_counter()
+    with db.begin() as con:
+        gerar_dados(con, {**quantidades_para(n), "brinquedos": n, "remedios": n, "clientes": n, "transacoes": n}, semente)
+        # uma amostra espalhada pela tabela toda (ID múltiplo de um passo), sempre a mesma
+        passo = max(1, n // 5_000)
+        brinquedos = con.execute(
+            select(Brinquedo.ID, Brinquedo.NOME).where(Brinquedo.ESTOQUE >= 5, Brinquedo.ID % passo == 0)
+        ).all()
+        remedios = con.execute(select(Remedio.ID).where(Remedio.ESTOQUE >= 5, Remedio.ID % passo == 0)).scalars().all()
+        email = con.execute(select(Usuario.EMAIL).order_by(Usuario.ID).limit(1)).scalar()
+    return Amostras(n, brinquedos, remedios, email), time.perf_counter() - inicio
+
+
+# ---------------------------------------------------------------- cenários
+
+class Cenario:
+    def __init__(self, nome, metodo, caminho, corpo=None, pesado=False):
+        self.nome = nome
+        self.metodo = metodo
+        self.caminho = caminho  # função (rnd, amostras) -> URL
+        self.corpo = corpo  # função (rnd, amostras) -> JSON ou None
+        self.pesado = pesado
+
+
+_novos = itertools.count()
+
+CENARIOS = [
+    # leituras do catálogo
+    Cenario("brinquedos: primeira página", "GET", lambda r, a: "/brinquedos/"),
+    Cenario("brinquedos: categoria, mais caros", "GET", lambda r, a: "/brinquedos/?categoria=Bola&ordenar=-preco"),
+    Cenario("brinquedos: preço + estoque, offset", "GET",
+            lambda r, a: f"/brinquedos/?min_preco=50&max_preco=80&em_estoque=true&ordenar=estoque&offset={r.randrange(0, 1000, 50)}"),
+    Cenario("brinquedos: cursor", "GET", lambda r, a: f"/brinquedos/?after={r.randrange(a.n)}&limit=50"),
+    Cenario("brinquedos: colunar", "GET", lambda r, a: "/brinquedos/?formato=colunar&limit=200"),
+    Cenario("brinquedos: por ID", "GET", lambda r, a: f"/brinquedos/{r.randrange(1, a.n + 1)}"),
+    Cenario("brinquedos: por categoria", "GET", lambda r, a: f"/brinquedos/categoria/{r.choice(CATEGORIAS)}", pesado=True),
+    Cenario("brinquedos: estatísticas", "GET", lambda r, a: "/brinquedos/estatisticas/resumo"),
+    Cenario("busca", "GET", lambda r, a: f"/busca?q={r.choice(PALAVRAS)}"),
+    Cenario("busca: nome exato", "GET", lambda r, a: f"/busca?q={quote_plus(r.choice(a.brinquedos).NOME)}&tipo=BRINQUEDO"),
+    Cenario("remédios: lista", "GET", lambda r, a: "/remedios/", pesado=True),
+    # cadastros e compras
+    Cenario("clientes: lista", "GET", lambda r, a: "/cliente/", pesado=True),
+    Cenario("pets: lista", "GET", lambda r, a: "/pets/", pesado=True),
+    Cenario("colaboradores: lista", "GET", lambda r, a: "/colaboradores/"),
+    Cenario("compras: lista", "GET", lambda r, a: "/compras/", pesado=True),
+    Cenario("compras: export ndjson", "GET", lambda r, a: "/compras/export", pesado=True),
+    Cenario("vendas: por forma de pagamento", "GET", lambda r, a: "/vendas/resumo"),
+    Cenario("vendas: top remédios por unidades", "GET", lambda r, a: "/vendas/resumo?por=remedio&ordenar=unidades&limit=10"),
+    Cenario("vendas: clientes, página", "GET", lambda r, a: f"/vendas/resumo?por=cliente&offset={r.randrange(0, 1000, 50)}&limit=50"),
+    # monitoramento
+    Cenario("estatísticas do pool", "GET", lambda r, a: "/estatisticas/pool"),
+    Cenario("estatísticas do cache", "GET", lambda r, a: "/estatisticas/cache"),
+    Cenario("métricas Prometheus", "GET", lambda r, a: "/metrics"),
+    Cenario("métricas de senhas", "GET", lambda r, a: "/auth/senhas/metricas"),
+    # escritas (por último: mudam o catálogo)
+    Cenario("compra", "POST", lambda r, a: "/compras/criar",
+            lambda r, a: {"id_cliente": r.randrange(1, a.n + 1), "id_remedio": r.choice(a.remedios), "quantidade": 1,
+                          "forma_pagamento": "PIX"}),
+    Cenario("pedido", "POST", lambda r, a: "/compras/pedido",
+            lambda r, a: {"id_cliente": r.randrange(1, a.n + 1), "forma_pagamento": "PIX", "itens": [
+                {"tipo": "REMEDIO", "id_produto": r.choice(a.remedios), "quantidade": 1},
+                {"tipo": "BRINQUEDO", "id_produto": r.choice(a.brinquedos).ID, "quantidade": 1},
+            ]}),
+    Cenario("brinquedo: estoque", "PATCH", lambda r, a: f"/brinquedos/estoque/{r.randrange(1, a.n + 1)}?quantidade={r.randrange(100)}"),
+    Cenario("brinquedos: estoque em lote (100)", "PATCH", lambda r, a: "/brinquedos/estoque",
+            lambda r, a: {"itens": [
+                {"id": produto_id, "quantidade": r.randrange(100)} if produto_id % 2 else {"id": produto_id, "delta": 5}
+                for produto_id in r.sample(range(1, a.n + 1), min(100, a.n))
+            ]}),
+    Cenario("brinquedo: cadastro", "POST", lambda r, a: "/brinquedos/cadastrar",
+            lambda r, a: {"nome": f"Brinquedo novo {next(_novos)}", "categoria": r.choice(CATEGORIAS),
+                          "preco": 25.0, "estoque": 10, "descricao": "Cadastrado pelo benchmark"}),
+    Cenario("login", "POST", lambda r, a: "/auth/login",
+            lambda r, a: {"nome": "Bench", "email": a.email, "senha": SENHA_GERADA}, pesado=True),
+]
+
+
+# ---------------------------------------------------------------- medição
+
+def percentil(ordenados, p):
+    """Percentil pelo posto mais próximo (sem interpolar: é sempre uma latência medida)."""
+    if not ordenados:
+        return None
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+async def _requisitar(cliente, cenario, rnd, amostras):
+    corpo = cenario.corpo(rnd, amostras) if cenario.corpo else None
+    inicio = time.perf_counter()
+    resposta = await cliente.request(cenario.metodo, cenario.caminho(rnd, amostras), json=corpo)
+    await resposta.aread()
+    return time.perf_counter() - inicio, resposta.status_code
+
+
+async def medir_cenario(cliente, cenario, amostras, total, concorrencia, aquecimento, semente):
+    rnd = random.Random(f"{semente}:{cenario.nome}:{amostras.n}")
+    for _ in range(aquecimento):
+        await _requisitar(cliente, cenario, rnd, amostras)
+
+    latencias, erros, status = [], 0, {}
+    fila = iter(range(total))
+
+    async def trabalhador():
+        nonlocal erros
+        for _ in fila:
+            duracao, codigo = await _requisitar(cliente, cenario, rnd, amostras)
+            latencias.append(duracao)
+            status[codigo] = status.get(codigo, 0) + 1
+            if codigo >= 400:
+                erros += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(min(concorrencia, total))))
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "requisicoes": total,
+        "erros": erros,
+        "status": {str(codigo): vezes for codigo, vezes in sorted(status.items())},
+        "p50_ms": round(percentil(latencias, 50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 3),
+        "req_s": round(total / duracao, 2),
+    }
+
+
+def _imprimir_cabecalho():
+    print(f"{'endpoint':<40} | {'p50 ms':>9} | {'p95 ms':>9} | {'p99 ms':>9} | {'req/s':>9} | {'erros':>5}")
+    print("-" * 96)
+
+
+def _imprimir(nome, r):
+    print(f"{nome:<40} | {r['p50_ms']:>9.2f} | {r['p95_ms']:>9.2f} | {r['p99_ms']:>9.2f} | {r['req_s']:>9.1f} | {r['erros']:>5}")
+
+
+async def rodar(args):
+    Base.metadata.create_all(bind=db)
+    selecionados = [c for c in CENARIOS if not args.filtro or any(f.lower() in c.nome.lower() for f in args.filtro)]
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=None) as cliente:
+        for n in sorted(args.linhas):
+            amostras, carga = popular(n, args.semente)
+            print(f"\n{n} linhas por tabela (carga: {carga:.1f} s)")
+            _imprimir_cabecalho()
+            resultados[str(n)] = {}
+            for cenario in selecionados:
+                total = args.requisicoes_pesadas if cenario.pesado else args.requisicoes
+                if total <= 0:
+                    continue
+                r = await medir_cenario(cliente, cenario, amostras, total, args.concorrencia, args.aquecimento, args.semente)
+                resultados[str(n)][f"{cenario.metodo} {cenario.nome}"] = r
+                _imprimir(f"{cenario.metodo} {cenario.nome}", r)
+    await db_async.dispose()
+    return resultados
+
+
+# ---------------------------------------------------------------- linhas de base
+
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def montar_relatorio(args, resultados):
+    return {
+        "gerado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "ambiente": {
+            "commit": _commit_atual(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+        },
+        "parametros": {
+            "requisicoes": args.requisicoes,
+            "requisicoes_pesadas": args.requisicoes_pesadas,
+            "concorrencia": args.concorrencia,
+            "aquecimento": args.aquecimento,
+            "semente": args.semente,
+        },
+        "resultados": resultados,
+    }
+
+
+def _variacao(antes, depois):
+    return (depois - antes) / antes * 100 if antes else 0.0
+
+
+def comparar(base, atual, tolerancia):
+    """Imprime a diferença por endpoint e devolve quantas regressões passaram da tolerância."""
+    regressoes = 0
+    print(f"\nComparando com a base de {base['gerado_em']} (commit {base['ambiente'].get('commit')})")
+    if base.get("parametros") != atual.get("parametros"):
+        print(f"Atenção: parâmetros diferentes ({base.get('parametros')} x {atual.get('parametros')})")
+    for tamanho, endpoints in atual["resultados"].items():
+        anteriores = base["resultados"].get(tamanho)
+        if anteriores is None:
+            print(f"\n{tamanho} linhas: sem base para comparar")
+            continue
+        print(f"\n{tamanho} linhas por tabela")
+        print(f"{'endpoint':<40} | {'p50':>8} | {'p95':>8} | {'p99':>8} | {'req/s':>8} |")
+        print("-" * 92)
+        for nome, r in endpoints.items():
+            b = anteriores.get(nome)
+            if b is None:
+                print(f"{nome:<40} | (novo)")
+                continue
+            p95 = _variacao(b["p95_ms"], r["p95_ms"])
+            vazao = _variacao(b["req_s"], r["req_s"])
+            piorou = p95 > tolerancia or vazao < -tolerancia
+            regressoes += piorou
+            print(
+                f"{nome:<40} | {_variacao(b['p50_ms'], r['p50_ms']):>+7.1f}% | {p95:>+7.1f}% | "
+                f"{_variacao(b['p99_ms'], r['p99_ms']):>+7.1f}% | {vazao:>+7.1f}% | {'REGRESSÃO' if piorou else ''}"
+            )
+        for nome in sorted(anteriores.keys() - endpoints.keys()):
+            print(f"{nome:<40} | (só na base)")
+    print(f"\n{regressoes} regressão(ões) acima de {tolerancia:.0f}% no p95 ou na vazão")
+    return regressoes
+
+
+def _ler(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def main(args):
+    if args.comparar and len(args.comparar) == 2:
+        return 1 if comparar(_ler(args.comparar[0]), _ler(args.comparar[1]), args.tolerancia) else 0
+
+    relatorio = montar_relatorio(args, asyncio.run(rodar(args)))
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em {args.salvar}")
+    if args.comparar:
+        return 1 if comparar(_ler(args.comparar[0]), relatorio, args.tolerancia) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="linhas por tabela (brinquedos, remédios, clientes, transações)")
+    parser.add_argument("--requisicoes", type=int, default=200, help="requisições medidas por cenário")
+    parser.add_argument("--requisicoes-pesadas", type=int, default=5,
+                        help="requisições medidas nos cenários pesados (tabela inteira, bcrypt); 0 pula")
+    parser.add_argument("--concorrencia", type=int, default=10,
+                        help="requisições ao mesmo tempo (mantenha abaixo do pool: 5 + 10 de overflow)")
+    parser.add_argument("--aquecimento", type=int, default=2, help="requisições descartadas antes de medir")
+    parser.add_argument("--semente", type=int, default=42, help="semente dos dados gerados e dos parâmetros sorteados")
+    parser.add_argument("--filtro", nargs="+", help="só os cenários cujo nome contém algum destes textos")
+    parser.add_argument("--salvar", metavar="ARQUIVO", help="grava os resultados em JSON (linha de base)")
+    parser.add_argument("--comparar", metavar="ARQUIVO", nargs="+",
+                        help="base.json: roda e compara com a base; base.json atual.json: só compara")
+    parser.add_argument("--tolerancia", type=float, default=PCT_REGRESSAO_PADRAO,
+                        help="piora (%%) no p95 ou na vazão que conta como regressão")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,132 @@
+"""
+Benchmark da listagem de brinquedos (filtros + ordenação + uma página de 50) em três caminhos:
+- DataFrame por requisição: `pd.read_sql` da tabela inteira e filtros/ordenação no pandas
+  (como o `listar_brinquedos` fazia antes)
+- SQL: filtros e ORDER BY no banco (`brinquedo_routes._pagina_sql`, `CATALOGO_COLUNAR=0`)
+- retrato colunar: máscaras e argsort em NumPy + busca da página pelo ID
+  (`brinquedo_routes._pagina_colunar`, padrão)
+
+Também mede quanto custa reconstruir o retrato (o que a primeira listagem depois de uma
+alteração paga). Os tempos são a mediana de várias repetições, sem o cache de respostas.
+
+Usa um banco SQLite temporário, então não mexe no farmpet.db.
+Execute: python bench_catalogo_colunar.py [--linhas 100000 1000000] [--repeticoes 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_pasta = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_pasta, 'bench.db')}"
+
+import pandas as pd
+from sqlalchemy import delete, insert, select
+
+from brinquedo_routes import _pagina_colunar, _pagina_sql
+from catalogo_colunar import catalogo_colunar
+from models import Base, Brinquedo, SessionAsync, db, db_async, incrementar_versao_tabela
+
+CATEGORIAS = ["Pelúcia", "Bola", "Interativo", "Mordedor"]
+
+# (descrição, parâmetros da listagem)
+CONSULTAS = [
+    ("primeira página por ID", {}),
+    ("categoria", {"categoria": "Bola"}),
+    ("faixa de preço + estoque", {"min_preco": 50, "max_preco": 80, "em_estoque": True}),
+    ("categoria, mais caros", {"categoria": "Interativo", "ordenar": "-preco"}),
+    ("menor estoque, página 20", {"em_estoque": True, "ordenar": "estoque", "offset": 1000}),
+]
+
+PADRAO = {"categoria": None, "min_preco": None, "max_preco": None, "em_estoque": None,
+          "after": None, "ordenar": "id", "limit": 50, "offset": 0}
+
+_ORDENACAO_PANDAS = {"preco": ("PRECO", True), "-preco": ("PRECO", False),
+                     "estoque": ("ESTOQUE", True), "-estoque": ("ESTOQUE", False)}
+
+
+def popular(n, lote=50_000):
+    Base.metadata.create_all(bind=db)
+    with db.begin() as con:
+        con.execute(delete(Brinquedo))
+        for inicio in range(0, n, lote):
+            con.execute(insert(Brinquedo), [
+                {
+                    "NOME": f"Brinquedo {i}",
+                    "CATEGORIA": CATEGORIAS[i % 4],
+                    "PRECO": round(5 + (i * 7919 % 1000) * 0.1, 2),
+                    "ESTOQUE": i * 31 % 40,
+                    "DESCRICAO": "Brinquedo de teste",
+                }
+                for i in range(inicio, min(n, inicio + lote))
+            ])
+        incrementar_versao_tabela(con, "brinquedos")
+
+
+def caminho_dataframe(categoria, min_preco, max_preco, em_estoque, after, ordenar, limit, offset):
+    with db.connect() as con:
+        df = pd.read_sql(select(Brinquedo), con)
+    if categoria:
+        df = df[df["CATEGORIA"] == categoria]
+    if min_preco is not None:
+        df = df[df["PRECO"] >= min_preco]
+    if max_preco is not None:
+        df = df[df["PRECO"] <= max_preco]
+    if em_estoque:
+        df = df[df["ESTOQUE"] > 0]
+    if after is not None:
+        df = df[df["ID"] > after]
+    if ordenar in _ORDENACAO_PANDAS:
+        coluna, crescente = _ORDENACAO_PANDAS[ordenar]
+        df = df.sort_values([coluna, "ID"], ascending=[crescente, True], kind="stable")
+    else:
+        df = df.sort_values("ID")
+    return df.iloc[offset:offset + limit].to_dict(orient="records")
+
+
+async def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        await funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+async def medir(n, repeticoes):
+    popular(n)
+    async with SessionAsync() as session:
+        catalogo_colunar.limpar()
+        reconstrucao = await cronometrar(_reconstruir(session), 1)
+
+        print(f"\n{n} brinquedos | reconstrução do retrato: {reconstrucao:.0f} ms")
+        print(f"{'consulta':<28} | {'DataFrame (ms)':>14} | {'SQL (ms)':>9} | {'colunar (ms)':>12}")
+        print("-" * 74)
+        for descricao, parametros in CONSULTAS:
+            args = {**PADRAO, **parametros}
+            dataframe = await cronometrar(lambda: asyncio.to_thread(caminho_dataframe, **args), max(1, repeticoes // 2))
+            sql = await cronometrar(lambda: _pagina_sql(session, **args), repeticoes)
+            colunar = await cronometrar(lambda: _pagina_colunar(session, **args), repeticoes)
+            print(f"{descricao:<28} | {dataframe:>14.1f} | {sql:>9.2f} | {colunar:>12.2f}")
+
+
+def _reconstruir(session):
+    async def reconstruir():
+        catalogo_colunar.limpar()
+        await catalogo_colunar.obter(session)
+    return reconstruir
+
+
+async def main(args):
+    for n in args.linhas:
+        await medir(n, args.repeticoes)
+    await db_async.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
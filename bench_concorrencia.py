@@ -0,0 +1,142 @@
+"""
+Benchmark de concorrência: sessão síncrona dentro de rota `async def` (como era antes)
+contra AsyncSession (`pegar_sessao_async`).
+
+Monta dois apps mínimos com as mesmas consultas:
+- `/lenta`: agregação que percorre a tabela de brinquedos inteira
+- `/rapida/{id}`: busca por chave primária
+
+e dispara, ao mesmo tempo, várias requisições lentas e muitas rápidas pelo
+transporte ASGI do httpx (sem rede, tudo no mesmo event loop, como no uvicorn).
+Com a sessão síncrona cada consulta trava o event loop, então as rápidas esperam
+as lentas terminarem; com a AsyncSession elas seguem enquanto as lentas rodam.
+
+Mantenha a concorrência abaixo do tamanho do pool (5 + 10 de overflow): na versão
+síncrona, esperar por uma conexão livre também trava o event loop, e quem devolveria
+a conexão nunca roda (o teste fica parado até o timeout do pool).
+
+Usa um banco SQLite temporário, então não mexe no farmpet.db.
+Execute: python bench_concorrencia.py [--linhas 200000] [--lentas 8] [--rapidas 400] [--concorrencia 10]
+(precisa do httpx, que já vem com o TestClient do FastAPI)
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_pasta = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_pasta, 'bench.db')}"
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from dependencies import pegar_sessao, pegar_sessao_async
+from models import Base, Brinquedo, db, db_async
+
+CATEGORIAS = ["Pelúcia", "Bola", "Interativo", "Mordedor"]
+
+CONSULTA_LENTA = (
+    select(Brinquedo.CATEGORIA, func.count(), func.avg(Brinquedo.PRECO), func.sum(Brinquedo.ESTOQUE))
+    .where(Brinquedo.DESCRICAO.like("%especial%"))
+    .group_by(Brinquedo.CATEGORIA)
+)
+
+
+def popular(n):
+    Base.metadata.create_all(bind=db)
+    with db.begin() as con:
+        con.execute(insert(Brinquedo), [
+            {
+                "NOME": f"Brinquedo {i}",
+                "CATEGORIA": CATEGORIAS[i % 4],
+                "PRECO": round(5 + (i % 500) * 0.37, 2),
+                "ESTOQUE": i % 40,
+                "DESCRICAO": "Brinquedo especial" if i % 7 == 0 else "Brinquedo comum",
+            }
+            for i in range(n)
+        ])
+
+
+def app_sincrono():
+    app = FastAPI()
+
+    @app.get("/lenta")
+    async def lenta(session: Session = Depends(pegar_sessao)):
+        return [list(linha) for linha in session.execute(CONSULTA_LENTA)]
+
+    @app.get("/rapida/{brinquedo_id}")
+    async def rapida(brinquedo_id: int, session: Session = Depends(pegar_sessao)):
+        return session.scalar(select(Brinquedo.NOME).where(Brinquedo.ID == brinquedo_id))
+
+    return app
+
+
+def app_assincrono():
+    app = FastAPI()
+
+    @app.get("/lenta")
+    async def lenta(session: AsyncSession = Depends(pegar_sessao_async)):
+        return [list(linha) for linha in await session.execute(CONSULTA_LENTA)]
+
+    @app.get("/rapida/{brinquedo_id}")
+    async def rapida(brinquedo_id: int, session: AsyncSession = Depends(pegar_sessao_async)):
+        return await session.scalar(select(Brinquedo.NOME).where(Brinquedo.ID == brinquedo_id))
+
+    return app
+
+
+async def medir(app, linhas, lentas, rapidas, concorrencia):
+    limite = asyncio.Semaphore(concorrencia)
+    latencias = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as cliente:
+        async def chamar(url, registrar):
+            async with limite:
+                inicio = time.perf_counter()
+                resposta = await cliente.get(url)
+                resposta.raise_for_status()
+                if registrar:
+                    latencias.append(time.perf_counter() - inicio)
+
+        await chamar("/rapida/1", False)  # aquece conexões e rotas
+        inicio = time.perf_counter()
+        await asyncio.gather(
+            *(chamar("/lenta", False) for _ in range(lentas)),
+            *(chamar(f"/rapida/{1 + i * 7919 % linhas}", True) for i in range(rapidas)),
+        )
+        duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "duracao": duracao,
+        "req_s": (lentas + rapidas) / duracao,
+        "p50": statistics.median(latencias),
+        "p95": latencias[int(len(latencias) * 0.95) - 1],
+        "max": latencias[-1],
+    }
+
+
+async def main(args):
+    popular(args.linhas)
+    print(f"{args.linhas} brinquedos | {args.lentas} lentas + {args.rapidas} rápidas | concorrência {args.concorrencia}")
+    print(f"{'sessão':<12} | {'total (s)':>9} | {'req/s':>8} | {'rápidas p50 (ms)':>16} | {'p95 (ms)':>9} | {'máx (ms)':>9}")
+    print("-" * 78)
+    for nome, app in (("síncrona", app_sincrono()), ("AsyncSession", app_assincrono())):
+        r = await medir(app, args.linhas, args.lentas, args.rapidas, args.concorrencia)
+        print(f"{nome:<12} | {r['duracao']:>9.2f} | {r['req_s']:>8.0f} | {r['p50'] * 1000:>16.1f} | "
+              f"{r['p95'] * 1000:>9.1f} | {r['max'] * 1000:>9.1f}")
+    await db_async.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--lentas", type=int, default=8)
+    parser.add_argument("--rapidas", type=int, default=400)
+    parser.add_argument("--concorrencia", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+"""
+Benchmark do custo por linha das rotas de listagem: caminho antigo com pandas
+(`pd.read_sql` -> `to_dict` -> encoder padrão do FastAPI) contra o serializador
+compartilhado (`serializador.py`: cursor -> tuplas -> orjson).
+
+Usa um banco SQLite temporário, então não mexe no farmpet.db.
+Execute: python bench_serializador.py [linhas ...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+_pasta = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_pasta, 'bench.db')}"
+
+import orjson
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, insert, select
+
+from models import Base, Brinquedo, db
+from serializador import buscar_linhas, montar_dados
+
+CATEGORIAS = ["Pelúcia", "Bola", "Interativo", "Mordedor"]
+
+
+def popular(n):
+    Base.metadata.create_all(bind=db)
+    with db.begin() as con:
+        con.execute(delete(Brinquedo))
+        con.execute(insert(Brinquedo), [
+            {
+                "NOME": f"Brinquedo {i}",
+                "CATEGORIA": CATEGORIAS[i % 4],
+                "PRECO": round(5 + (i % 500) * 0.37, 2),
+                "ESTOQUE": i % 40,
+                "IMAGEM": None if i % 3 else f"/imagens/{i}.png",
+                "DESCRICAO": "Descrição de teste",
+            }
+            for i in range(n)
+        ])
+
+
+def caminho_pandas():
+    with db.connect() as con:
+        result = pd.read_sql(select(Brinquedo), con)
+        result = result.to_dict(orient="records")
+    conteudo = {"mensagem": "ok", "data": result}
+    # o que o FastAPI faz com um dict retornado pela rota
+    return json.dumps(jsonable_encoder(conteudo), ensure_ascii=False).encode("utf-8")
+
+
+def caminho_serializador(formato="registros"):
+    colunas, linhas = buscar_linhas(select(Brinquedo))
+    return orjson.dumps({"mensagem": "ok", "data": montar_dados(colunas, linhas, formato)})
+
+
+def medir(funcao, repeticoes, *args):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        corpo = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, len(corpo)
+
+
+def main(tamanhos):
+    print(f"{'linhas':>8} | {'caminho':<22} | {'total (ms)':>10} | {'µs/linha':>9} | {'bytes':>10}")
+    print("-" * 72)
+    for n in tamanhos:
+        popular(n)
+        repeticoes = 5 if n <= 20_000 else 2
+        casos = [
+            ("pandas + jsonable", caminho_pandas, ()),
+            ("serializador registros", caminho_serializador, ("registros",)),
+            ("serializador colunar", caminho_serializador, ("colunar",)),
+        ]
+        for nome, funcao, args in casos:
+            segundos, tamanho = medir(funcao, repeticoes, *args)
+            print(f"{n:>8} | {nome:<22} | {segundos * 1000:>10.1f} | {segundos / n * 1e6:>9.2f} | {tamanho:>10}")
+        print("-" * 72)
+
+
+if __name__ == "__main__":
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    main(tamanhos)
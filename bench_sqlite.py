@@ -0,0 +1,115 @@
+"""
+Benchmark do perfil de produção do SQLite (`models.PRAGMAS_SQLITE`) ligado e desligado.
+
+Para cada perfil cria um banco temporário com brinquedos e mede:
+- commits sequenciais: UPDATEs de uma linha, um commit cada (custo do fsync)
+- carga mista: threads leitoras (busca por ID) e escritoras (baixa/reposição de
+  estoque) ao mesmo tempo por alguns segundos, contando operações e erros
+  "database is locked"
+
+Não mexe no farmpet.db.
+Execute: python bench_sqlite.py [--linhas 20000] [--segundos 3] [--leitores 4] [--escritores 2]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.exc import OperationalError
+
+from models import Base, Brinquedo, aplicar_perfil_sqlite
+
+CATEGORIAS = ["Pelúcia", "Bola", "Interativo", "Mordedor"]
+
+
+def criar_engine(perfil):
+    caminho = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{caminho}", connect_args={"check_same_thread": False})
+    if perfil:
+        aplicar_perfil_sqlite(engine)
+    return engine
+
+
+def popular(engine, n):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as con:
+        con.execute(insert(Brinquedo), [
+            {"NOME": f"Brinquedo {i}", "CATEGORIA": CATEGORIAS[i % 4], "PRECO": 10.0, "ESTOQUE": 50}
+            for i in range(n)
+        ])
+
+
+def commits_sequenciais(engine, linhas, quantidade=1000):
+    inicio = time.perf_counter()
+    for i in range(quantidade):
+        with engine.begin() as con:
+            con.execute(update(Brinquedo).where(Brinquedo.ID == 1 + i % linhas).values(ESTOQUE=Brinquedo.ESTOQUE + 1))
+    return quantidade / (time.perf_counter() - inicio)
+
+
+def carga_mista(engine, linhas, segundos, leitores, escritores):
+    fim = time.perf_counter() + segundos
+    contagem = {"leituras": 0, "escritas": 0, "travado": 0}
+    trava = threading.Lock()
+
+    def somar(chave):
+        with trava:
+            contagem[chave] += 1
+
+    def leitor():
+        sorteio = random.Random()
+        while time.perf_counter() < fim:
+            try:
+                with engine.connect() as con:
+                    con.execute(select(Brinquedo.NOME, Brinquedo.ESTOQUE).where(Brinquedo.ID == sorteio.randint(1, linhas))).first()
+                somar("leituras")
+            except OperationalError:
+                somar("travado")
+
+    def escritor():
+        sorteio = random.Random()
+        while time.perf_counter() < fim:
+            delta = sorteio.choice((-1, 1))
+            try:
+                with engine.begin() as con:
+                    con.execute(
+                        update(Brinquedo)
+                        .where(Brinquedo.ID == sorteio.randint(1, linhas), Brinquedo.ESTOQUE + delta >= 0)
+                        .values(ESTOQUE=Brinquedo.ESTOQUE + delta)
+                    )
+                somar("escritas")
+            except OperationalError:
+                somar("travado")
+
+    threads = [threading.Thread(target=leitor) for _ in range(leitores)]
+    threads += [threading.Thread(target=escritor) for _ in range(escritores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {chave: valor / segundos if chave != "travado" else valor for chave, valor in contagem.items()}
+
+
+def main(args):
+    print(f"{args.linhas} brinquedos | carga mista: {args.leitores} leitores + {args.escritores} escritores por {args.segundos}s")
+    print(f"{'perfil':<10} | {'commits/s':>10} | {'leituras/s':>11} | {'escritas/s':>11} | {'travado':>8}")
+    print("-" * 62)
+    for nome, perfil in (("padrão", False), ("produção", True)):
+        engine = criar_engine(perfil)
+        popular(engine, args.linhas)
+        commits = commits_sequenciais(engine, args.linhas)
+        mista = carga_mista(engine, args.linhas, args.segundos, args.leitores, args.escritores)
+        engine.dispose()
+        print(f"{nome:<10} | {commits:>10.0f} | {mista['leituras']:>11.0f} | {mista['escritas']:>11.0f} | {mista['travado']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, default=20_000)
+    parser.add_argument("--segundos", type=float, default=3)
+    parser.add_argument("--leitores", type=int, default=4)
+    parser.add_argument("--escritores", type=int, default=2)
+    main(parser.parse_args())
@@ -1,104 +1,222 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from models import Brinquedo, db
-from dependencies import pegar_sessao
-from schemas import BrinquedoSchema, CategoriaBrinquedo
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from typing import Optional, List
-import pandas as pd
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from models import Brinquedo, BrinquedoEstatistica, versao_incerta
+from dependencies import pegar_sessao_async, pegar_sessao_leitura
+from schemas import AjusteEstoqueLote, BrinquedoSchema, CategoriaBrinquedo, ConflitoImportacao, OrdenacaoBrinquedos
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from typing import Literal, Optional, List
+from urllib.parse import urlencode
+from serializador import FormatoLista, buscar_linhas_async, montar_dados
+from cache_catalogo import resposta_catalogo
+from catalogo_colunar import CATALOGO_COLUNAR, catalogo_colunar
+from importacao_catalogo import CORPO_OPENAPI, importar_catalogo
+from estoque import ajustar_estoque_em_lote
+import orjson
 
 brinquedo_router = APIRouter(prefix="/brinquedos", tags=["Brinquedos"])
 
 
 @brinquedo_router.get("/", summary="Listar todos os brinquedos")
 async def listar_brinquedos(
+    request: Request,
     categoria: Optional[CategoriaBrinquedo] = Query(None, description="Filtrar por categoria"),
     min_preco: Optional[float] = Query(None, ge=0, description="Preço mínimo"),
     max_preco: Optional[float] = Query(None, ge=0, description="Preço máximo"),
-    em_estoque: Optional[bool] = Query(None, description="Apenas produtos em estoque")
+    em_estoque: Optional[bool] = Query(None, description="Apenas produtos em estoque"),
+    limit: int = Query(50, ge=1, le=500, description="Quantidade máxima de itens por página"),
+    after: Optional[int] = Query(None, ge=0, description="Cursor: ID do último item da página anterior"),
+    ordenar: OrdenacaoBrinquedos = Query("id", description="id, preco, -preco, estoque ou -estoque (- = decrescente)"),
+    offset: int = Query(0, ge=0, description="Itens a pular (paginação das ordenações que não são por id)"),
+    formato: FormatoLista = Query("registros", description="registros ou colunar"),
+    session: AsyncSession = Depends(pegar_sessao_leitura)
 ):
     """
-    Lista todos os brinquedos disponíveis com filtros opcionais.
+    Lista os brinquedos disponíveis com filtros opcionais e paginação por cursor.
     
     **Filtros disponíveis:**
     - `categoria`: Pelúcia, Bola, Interativo, Mordedor
     - `min_preco`: Preço mínimo
     - `max_preco`: Preço máximo
     - `em_estoque`: true para mostrar apenas itens com estoque
+    
+    **Ordenação:** `ordenar=preco`, `-preco`, `estoque` ou `-estoque` (empates por ID);
+    o padrão é por ID.
+
+    **Paginação:**
+    - `limit`: tamanho da página (padrão 50, máximo 500). Sem `limit` a resposta traz
+      só os 50 primeiros, não a lista inteira
+    - `after`: envie o `proximo_cursor` da resposta anterior para buscar a próxima página
+      (só na ordenação por ID; com outra ordenação a resposta é 400)
+    - `offset`: nas outras ordenações, envie o `proximo_offset` da resposta anterior
+    - Enquanto houver mais itens, a resposta traz o cabeçalho
+      `Link: </brinquedos/?...>; rel="next"` com a URL da próxima página
+
+    Cada combinação de filtros/página fica no cache do catálogo até o próximo cadastro,
+    alteração ou venda de brinquedo. A resposta traz `ETag`; reenviando-o em
+    `If-None-Match` o cliente recebe 304 enquanto nada mudar.
     """
-    conn = db.connect()
-    with conn as con:
-        query = select(Brinquedo)
-        result = pd.read_sql(query, con)
-        
-        # Aplicar filtros
-        if categoria:
-            result = result[result['CATEGORIA'] == categoria]
-        if min_preco is not None:
-            result = result[result['PRECO'] >= min_preco]
-        if max_preco is not None:
-            result = result[result['PRECO'] <= max_preco]
-        if em_estoque:
-            result = result[result['ESTOQUE'] > 0]
-        
-        result = result.to_dict(orient='records')
+    if after is not None and ordenar != "id":
+        # o cursor é um ID: nas outras ordenações ele cortaria itens que ainda não saíram
+        raise HTTPException(
+            status_code=400,
+            detail="O cursor 'after' só vale com ordenar=id; nas outras ordenações use offset (proximo_offset)"
+        )
 
-    return {
+    filtros = (categoria, min_preco, max_preco, em_estoque, after, ordenar, limit, offset)
+
+    async def carregar():
+        corpo, proxima = await _pagina_brinquedos(session, *filtros, formato)
+        return corpo, ({"Link": _link_proxima(request, proxima)} if proxima else None)
+
+    return await resposta_catalogo(request, session, "brinquedos", ("lista", *filtros, formato), carregar)
+
+
+def _link_proxima(request: Request, proxima):
+    """Cabeçalho Link (RFC 8288) da próxima página: a URL pedida com o cursor/offset trocado.
+
+    `proxima` mapeia parâmetro -> valor novo (None tira o parâmetro da URL).
+    """
+    parametros = [(nome, valor) for nome, valor in request.query_params.multi_items() if nome not in proxima]
+    parametros += [(nome, str(valor)) for nome, valor in proxima.items() if valor is not None]
+    return f'<{request.url.path}?{urlencode(parametros)}>; rel="next"'
+
+
+async def _pagina_brinquedos(session, categoria, min_preco, max_preco, em_estoque, after, ordenar, limit, offset, formato):
+    # o retrato é da versão gravada: se ela estiver atrasada, filtra em SQL
+    if CATALOGO_COLUNAR and not versao_incerta("brinquedos"):
+        colunas, linhas, tem_mais = await _pagina_colunar(
+            session, categoria, min_preco, max_preco, em_estoque, after, ordenar, limit, offset
+        )
+    else:
+        colunas, linhas, tem_mais = await _pagina_sql(
+            session, categoria, min_preco, max_preco, em_estoque, after, ordenar, limit, offset
+        )
+
+    proximo_cursor = None
+    proximo_offset = None
+    proxima = None  # parâmetros que levam à próxima página (cabeçalho Link)
+    if tem_mais:
+        proximo_offset = offset + limit
+        if ordenar == "id":
+            proximo_cursor = linhas[-1][colunas.index('ID')]
+            proxima = {"after": proximo_cursor, "offset": None}  # o cursor já marca a posição
+        else:
+            proxima = {"offset": proximo_offset}
+
+    return orjson.dumps({
         "mensagem": "Lista de brinquedos recuperada com sucesso",
-        "total": len(result),
-        "data": result
-    }
+        "total": len(linhas),
+        "proximo_cursor": proximo_cursor,
+        "proximo_offset": proximo_offset,
+        "data": montar_dados(colunas, linhas, formato)
+    }), proxima
+
+
+async def _pagina_colunar(session, categoria, min_preco, max_preco, em_estoque, after, ordenar, limit, offset):
+    """Filtra e ordena no retrato em NumPy; do banco só vêm as linhas da página, pelo ID.
+
+    Sem retrato atual (sendo refeito, ou refeito há pouco), filtra em SQL.
+    """
+    retrato = await catalogo_colunar.obter(session)
+    if retrato is None:
+        return await _pagina_sql(session, categoria, min_preco, max_preco, em_estoque, after, ordenar, limit, offset)
+    ids, tem_mais = retrato.consultar(categoria, min_preco, max_preco, em_estoque, after, ordenar, limit, offset)
+    ids = ids.tolist()
+    if not ids:
+        return [c.name for c in Brinquedo.__table__.columns], [], False
+
+    colunas, linhas = await buscar_linhas_async(session, select(Brinquedo).where(Brinquedo.ID.in_(ids)))
+    posicao_id = colunas.index('ID')
+    por_id = {linha[posicao_id]: linha for linha in linhas}
+    return colunas, [por_id[i] for i in ids if i in por_id], tem_mais
+
+
+async def _pagina_sql(session, categoria, min_preco, max_preco, em_estoque, after, ordenar, limit, offset):
+    query = select(Brinquedo)
+
+    # Aplicar filtros direto no WHERE
+    if categoria:
+        query = query.where(Brinquedo.CATEGORIA == categoria)
+    if min_preco is not None:
+        query = query.where(Brinquedo.PRECO >= min_preco)
+    if max_preco is not None:
+        query = query.where(Brinquedo.PRECO <= max_preco)
+    if em_estoque:
+        query = query.where(Brinquedo.ESTOQUE > 0)
+    if after is not None:
+        query = query.where(Brinquedo.ID > after)
+
+    # mesma ordem do retrato colunar: NULL por último e empates por ID
+    if ordenar in ("preco", "-preco"):
+        query = query.order_by(Brinquedo.PRECO.desc().nulls_last() if ordenar == "-preco" else Brinquedo.PRECO.asc().nulls_last())
+    elif ordenar in ("estoque", "-estoque"):
+        estoque = func.coalesce(Brinquedo.ESTOQUE, 0)
+        query = query.order_by(estoque.desc() if ordenar == "-estoque" else estoque.asc())
+
+    # Busca um item a mais para saber se existe próxima página
+    query = query.order_by(Brinquedo.ID).offset(offset).limit(limit + 1)
+
+    colunas, linhas = await buscar_linhas_async(session, query)
+    tem_mais = len(linhas) > limit
+    return colunas, linhas[:limit], tem_mais
 
 
 @brinquedo_router.get("/{brinquedo_id}", summary="Buscar brinquedo por ID")
-async def buscar_brinquedo(brinquedo_id: int, session: Session = Depends(pegar_sessao)):
+async def buscar_brinquedo(brinquedo_id: int, request: Request, session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
     Busca um brinquedo específico pelo ID.
     """
-    brinquedo = session.query(Brinquedo).filter(Brinquedo.ID == brinquedo_id).first()
-    if not brinquedo:
+    async def carregar():
+        brinquedo = await session.scalar(select(Brinquedo).where(Brinquedo.ID == brinquedo_id))
+        if not brinquedo:
+            return None
+        return orjson.dumps({
+            "mensagem": "Brinquedo encontrado",
+            "data": {
+                "id": brinquedo.ID,
+                "nome": brinquedo.NOME,
+                "categoria": brinquedo.CATEGORIA,
+                "preco": brinquedo.PRECO,
+                "estoque": brinquedo.ESTOQUE,
+                "imagem": brinquedo.IMAGEM,
+                "descricao": brinquedo.DESCRICAO
+            }
+        })
+
+    resposta = await resposta_catalogo(request, session, "brinquedos", ("id", brinquedo_id), carregar)
+    if resposta is None:
         raise HTTPException(status_code=404, detail="Brinquedo não encontrado")
-    
-    return {
-        "mensagem": "Brinquedo encontrado",
-        "data": {
-            "id": brinquedo.ID,
-            "nome": brinquedo.NOME,
-            "categoria": brinquedo.CATEGORIA,
-            "preco": brinquedo.PRECO,
-            "estoque": brinquedo.ESTOQUE,
-            "imagem": brinquedo.IMAGEM,
-            "descricao": brinquedo.DESCRICAO
-        }
-    }
+    return resposta
 
 
 @brinquedo_router.get("/categoria/{categoria}", summary="Listar brinquedos por categoria")
-async def listar_por_categoria(categoria: CategoriaBrinquedo, session: Session = Depends(pegar_sessao)):
+async def listar_por_categoria(categoria: CategoriaBrinquedo, request: Request, session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
     Lista todos os brinquedos de uma categoria específica.
     
     **Categorias disponíveis:** Pelúcia, Bola, Interativo, Mordedor
     """
-    brinquedos = session.query(Brinquedo).filter(Brinquedo.CATEGORIA == categoria).all()
-    
-    return {
-        "mensagem": f"Brinquedos da categoria {categoria}",
-        "total": len(brinquedos),
-        "data": [{
-            "id": b.ID,
-            "nome": b.NOME,
-            "categoria": b.CATEGORIA,
-            "preco": b.PRECO,
-            "estoque": b.ESTOQUE,
-            "imagem": b.IMAGEM,
-            "descricao": b.DESCRICAO
-        } for b in brinquedos]
-    }
+    async def carregar():
+        brinquedos = (await session.scalars(select(Brinquedo).where(Brinquedo.CATEGORIA == categoria))).all()
+        return orjson.dumps({
+            "mensagem": f"Brinquedos da categoria {categoria}",
+            "total": len(brinquedos),
+            "data": [{
+                "id": b.ID,
+                "nome": b.NOME,
+                "categoria": b.CATEGORIA,
+                "preco": b.PRECO,
+                "estoque": b.ESTOQUE,
+                "imagem": b.IMAGEM,
+                "descricao": b.DESCRICAO
+            } for b in brinquedos]
+        })
+
+    return await resposta_catalogo(request, session, "brinquedos", ("categoria", categoria), carregar)
 
 
 @brinquedo_router.post("/cadastrar", status_code=201, summary="Cadastrar novo brinquedo")
-async def criar_brinquedo(brinquedo: BrinquedoSchema, session: Session = Depends(pegar_sessao)):
+async def criar_brinquedo(brinquedo: BrinquedoSchema, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Cadastra um novo brinquedo no sistema.
     
@@ -113,7 +231,7 @@ async def criar_brinquedo(brinquedo: BrinquedoSchema, session: Session = Depends
     - descricao: Descrição detalhada do produto
     """
     # Verifica se já existe um brinquedo com esse nome
-    existente = session.query(Brinquedo).filter(Brinquedo.NOME == brinquedo.nome).first()
+    existente = await session.scalar(select(Brinquedo).where(Brinquedo.NOME == brinquedo.nome))
     if existente:
         raise HTTPException(
             status_code=400, 
@@ -138,8 +256,8 @@ async def criar_brinquedo(brinquedo: BrinquedoSchema, session: Session = Depends
             descricao=brinquedo.descricao
         )
         session.add(novo_brinquedo)
-        session.commit()
-        session.refresh(novo_brinquedo)
+        await session.commit()
+        await session.refresh(novo_brinquedo)
         
         return {
             "mensagem": f"Brinquedo '{novo_brinquedo.NOME}' cadastrado com sucesso",
@@ -155,15 +273,33 @@ async def criar_brinquedo(brinquedo: BrinquedoSchema, session: Session = Depends
             }
         }
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao cadastrar brinquedo: {str(e)}")
 
 
+@brinquedo_router.post("/importar", summary="Importar brinquedos em massa (CSV ou NDJSON)", openapi_extra=CORPO_OPENAPI)
+async def importar_brinquedos(
+    request: Request,
+    formato: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson ou csv"),
+    conflito: ConflitoImportacao = Query("atualizar", description="nome já cadastrado: atualizar, ignorar ou erro"),
+    session: AsyncSession = Depends(pegar_sessao_async),
+):
+    """
+    Cadastra/atualiza vários brinquedos de uma vez a partir do arquivo enviado no corpo
+    (`curl --data-binary @catalogo.csv ".../brinquedos/importar?format=csv"`).
+
+    Cada registro tem os campos do cadastro (nome, categoria, preco, estoque, imagem,
+    descricao). O arquivo é lido em streaming e gravado em lotes; a resposta traz
+    quantos foram inseridos/atualizados/ignorados e os erros de cada linha.
+    """
+    return await importar_catalogo(request.stream(), session, Brinquedo, BrinquedoSchema, formato, conflito)
+
+
 @brinquedo_router.put("/atualizar/{brinquedo_id}", summary="Atualizar brinquedo")
 async def atualizar_brinquedo(
     brinquedo_id: int, 
     brinquedo: BrinquedoSchema, 
-    session: Session = Depends(pegar_sessao)
+    session: AsyncSession = Depends(pegar_sessao_async)
 ):
     """
     Atualiza os dados de um brinquedo existente.
@@ -177,16 +313,16 @@ async def atualizar_brinquedo(
     - Valida se o novo nome não está sendo usado por outro brinquedo
     - Valida categoria
     """
-    brinquedo_existente = session.query(Brinquedo).filter(Brinquedo.ID == brinquedo_id).first()
+    brinquedo_existente = await session.scalar(select(Brinquedo).where(Brinquedo.ID == brinquedo_id))
     if not brinquedo_existente:
         raise HTTPException(status_code=404, detail="Brinquedo não encontrado")
     
     # Verifica se o nome já está sendo usado por outro brinquedo
     if brinquedo.nome != brinquedo_existente.NOME:
-        nome_existe = session.query(Brinquedo).filter(
+        nome_existe = await session.scalar(select(Brinquedo).where(
             Brinquedo.NOME == brinquedo.nome,
             Brinquedo.ID != brinquedo_id
-        ).first()
+        ))
         if nome_existe:
             raise HTTPException(
                 status_code=400, 
@@ -209,8 +345,8 @@ async def atualizar_brinquedo(
         brinquedo_existente.IMAGEM = brinquedo.imagem
         brinquedo_existente.DESCRICAO = brinquedo.descricao
         
-        session.commit()
-        session.refresh(brinquedo_existente)
+        await session.commit()
+        await session.refresh(brinquedo_existente)
         
         return {
             "mensagem": "Brinquedo atualizado com sucesso",
@@ -226,15 +362,47 @@ async def atualizar_brinquedo(
             }
         }
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar brinquedo: {str(e)}")
 
 
+@brinquedo_router.patch("/estoque", summary="Ajustar estoque de vários brinquedos")
+async def ajustar_estoque_lote(lote: AjusteEstoqueLote, session: AsyncSession = Depends(pegar_sessao_async)):
+    """
+    Ajusta o estoque de vários brinquedos numa única transação (ex.: chegada de mercadoria).
+
+    Cada item leva o `id` e **ou** `quantidade` (novo estoque) **ou** `delta` (quanto
+    somar; negativo tira). Tudo é aplicado com um único UPDATE; se algum ID não existir
+    ou algum estoque ficar negativo, nada é gravado.
+
+    **Resposta:** estoque anterior e atual de cada item.
+    """
+    ajustes = [(item.id, item.quantidade, item.delta) for item in lote.itens]
+    try:
+        itens = await ajustar_estoque_em_lote(session, Brinquedo, ajustes)
+        faltando = {produto_id for produto_id, _, _ in ajustes} - {item["id"] for item in itens}
+        if faltando:
+            await session.rollback()
+            raise HTTPException(status_code=404, detail=f"Brinquedo não encontrado: {sorted(faltando)}")
+        negativos = [item["id"] for item in itens if item["estoque_atual"] < 0]
+        if negativos:
+            await session.rollback()
+            raise HTTPException(status_code=400, detail=f"Estoque ficaria negativo para os brinquedos {negativos}")
+        await session.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro ao ajustar estoque: {str(e)}")
+
+    return {"mensagem": "Estoque atualizado com sucesso", "itens": itens}
+
+
 @brinquedo_router.patch("/estoque/{brinquedo_id}", summary="Atualizar estoque")
 async def atualizar_estoque(
     brinquedo_id: int,
     quantidade: int = Query(..., description="Nova quantidade em estoque"),
-    session: Session = Depends(pegar_sessao)
+    session: AsyncSession = Depends(pegar_sessao_async)
 ):
     """
     Atualiza apenas o estoque de um brinquedo.
@@ -244,7 +412,7 @@ async def atualizar_estoque(
     - Ajustes de inventário
     - Correções
     """
-    brinquedo = session.query(Brinquedo).filter(Brinquedo.ID == brinquedo_id).first()
+    brinquedo = await session.scalar(select(Brinquedo).where(Brinquedo.ID == brinquedo_id))
     if not brinquedo:
         raise HTTPException(status_code=404, detail="Brinquedo não encontrado")
     
@@ -254,8 +422,8 @@ async def atualizar_estoque(
     try:
         estoque_anterior = brinquedo.ESTOQUE
         brinquedo.ESTOQUE = quantidade
-        session.commit()
-        session.refresh(brinquedo)
+        await session.commit()
+        await session.refresh(brinquedo)
         
         return {
             "mensagem": "Estoque atualizado com sucesso",
@@ -265,12 +433,12 @@ async def atualizar_estoque(
             "diferenca": quantidade - estoque_anterior
         }
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar estoque: {str(e)}")
 
 
 @brinquedo_router.delete("/deletar/{brinquedo_id}", summary="Deletar brinquedo")
-async def deletar_brinquedo(brinquedo_id: int, session: Session = Depends(pegar_sessao)):
+async def deletar_brinquedo(brinquedo_id: int, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Remove um brinquedo do sistema.
     
@@ -279,26 +447,26 @@ async def deletar_brinquedo(brinquedo_id: int, session: Session = Depends(pegar_
     **Parâmetros:**
     - brinquedo_id: ID do brinquedo a ser deletado
     """
-    brinquedo = session.query(Brinquedo).filter(Brinquedo.ID == brinquedo_id).first()
+    brinquedo = await session.scalar(select(Brinquedo).where(Brinquedo.ID == brinquedo_id))
     if not brinquedo:
         raise HTTPException(status_code=404, detail="Brinquedo não encontrado")
     
     try:
         nome_deletado = brinquedo.NOME
-        session.delete(brinquedo)
-        session.commit()
+        await session.delete(brinquedo)
+        await session.commit()
         
         return {
             "mensagem": f"Brinquedo '{nome_deletado}' deletado com sucesso",
             "id": brinquedo_id
         }
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao deletar brinquedo: {str(e)}")
 
 
 @brinquedo_router.get("/estatisticas/resumo", summary="Estatísticas gerais")
-async def estatisticas_brinquedos(session: Session = Depends(pegar_sessao)):
+async def estatisticas_brinquedos(session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
     Retorna estatísticas gerais sobre os brinquedos cadastrados.
     
@@ -308,20 +476,21 @@ async def estatisticas_brinquedos(session: Session = Depends(pegar_sessao)):
     - Valor total do estoque
     - Produtos por categoria
     - Produtos em falta (estoque = 0)
+    
+    Os totais vêm da tabela `brinquedos_estatisticas` (uma linha por categoria),
+    atualizada a cada cadastro/alteração/exclusão, então não percorre o catálogo.
     """
-    brinquedos = session.query(Brinquedo).all()
+    estatisticas = (await session.scalars(select(BrinquedoEstatistica))).all()
     
-    total_brinquedos = len(brinquedos)
-    total_estoque = sum(b.ESTOQUE for b in brinquedos)
-    valor_total_estoque = sum(b.PRECO * b.ESTOQUE for b in brinquedos)
+    total_brinquedos = sum(e.TOTAL_PRODUTOS for e in estatisticas)
+    total_estoque = sum(e.TOTAL_UNIDADES for e in estatisticas)
+    valor_total_estoque = sum(e.VALOR_ESTOQUE for e in estatisticas)
     
     # Contar por categoria
-    categorias = {}
-    for b in brinquedos:
-        categorias[b.CATEGORIA] = categorias.get(b.CATEGORIA, 0) + 1
+    categorias = {e.CATEGORIA: e.TOTAL_PRODUTOS for e in estatisticas if e.TOTAL_PRODUTOS > 0}
     
-    # Produtos em falta
-    produtos_em_falta = [b.NOME for b in brinquedos if b.ESTOQUE == 0]
+    # Produtos em falta (busca pelo índice de ESTOQUE)
+    produtos_em_falta = (await session.scalars(select(Brinquedo.NOME).where(Brinquedo.ESTOQUE == 0))).all()
     
     return {
         "mensagem": "Estatísticas recuperadas com sucesso",
@@ -331,7 +500,7 @@ async def estatisticas_brinquedos(session: Session = Depends(pegar_sessao)):
             "valor_total_estoque": round(valor_total_estoque, 2),
             "produtos_por_categoria": categorias,
             "produtos_em_falta": {
-                "quantidade": len(produtos_em_falta),
+                "quantidade": sum(e.EM_FALTA for e in estatisticas),
                 "lista": produtos_em_falta
             }
         }
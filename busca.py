@@ -0,0 +1,193 @@
+"""
+Busca textual em brinquedos e remédios (`GET /busca?q=`), por NOME e DESCRICAO.
+
+SQLite: tabela virtual FTS5 `busca_catalogo` (tokenizador unicode61 sem acentos, então
+"pelucia" acha "Pelúcia"), mantida por triggers nas tabelas `brinquedos` e `remedios`.
+Como são triggers, qualquer escrita entra no índice, inclusive por SQL direto. O rowid
+de cada linha é `ID * 2` para brinquedos e `ID * 2 + 1` para remédios, o que permite
+apagar/atualizar pelo rowid sem varrer o índice. Mudanças só de preço/estoque (como a
+baixa das compras) não mexem no índice.
+
+PostgreSQL: índice GIN sobre `to_tsvector('portuguese', ...)` em cada tabela; o próprio
+banco mantém o índice, sem triggers.
+
+A relevância pesa mais o NOME do que a DESCRICAO. Cada palavra da busca vira um termo
+com prefixo ("bol" acha "Bola") e todos precisam aparecer.
+
+O índice é criado junto com as tabelas (`create_all`, evento `after_create` do
+metadata) ou pela migração do Alembic, que guarda uma cópia literal deste DDL: mudanças
+aqui pedem uma migração nova. Para um banco antigo ou para reconstruir: `python busca.py`.
+"""
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event, text
+
+from models import Base, db
+
+PESO_NOME = 10.0
+PESO_DESCRICAO = 1.0
+
+_TABELAS = (("BRINQUEDO", "brinquedos", 0), ("REMEDIO", "remedios", 1))
+
+_DDL_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS busca_catalogo USING fts5("
+    "TIPO UNINDEXED, NOME, DESCRICAO, tokenize = 'unicode61 remove_diacritics 2')",
+]
+_TRIGGERS_INSERCAO = {}  # tabela -> DDL do trigger de INSERT (ver carga_em_massa)
+for _tipo, _tabela, _paridade in _TABELAS:
+    _linha = f"new.\"ID\" * 2 + {_paridade}, '{_tipo}', new.\"NOME\", new.\"DESCRICAO\""
+    _TRIGGERS_INSERCAO[_tabela] = (
+        f"CREATE TRIGGER IF NOT EXISTS busca_{_tabela}_ai AFTER INSERT ON {_tabela} BEGIN "
+        f"INSERT INTO busca_catalogo(rowid, TIPO, NOME, DESCRICAO) VALUES ({_linha}); END"
+    )
+    _DDL_SQLITE += [
+        _TRIGGERS_INSERCAO[_tabela],
+        f"CREATE TRIGGER IF NOT EXISTS busca_{_tabela}_ad AFTER DELETE ON {_tabela} BEGIN "
+        f"DELETE FROM busca_catalogo WHERE rowid = old.\"ID\" * 2 + {_paridade}; END",
+        f"CREATE TRIGGER IF NOT EXISTS busca_{_tabela}_au AFTER UPDATE OF \"ID\", \"NOME\", \"DESCRICAO\" ON {_tabela} BEGIN "
+        f"DELETE FROM busca_catalogo WHERE rowid = old.\"ID\" * 2 + {_paridade}; "
+        f"INSERT INTO busca_catalogo(rowid, TIPO, NOME, DESCRICAO) VALUES ({_linha}); END",
+    ]
+
+
+def _documento_postgres(tabela):
+    # a mesma expressão no índice e na consulta, senão o Postgres não usa o índice
+    return (
+        f"setweight(to_tsvector('portuguese', coalesce({tabela}.\"NOME\", '')), 'A') || "
+        f"setweight(to_tsvector('portuguese', coalesce({tabela}.\"DESCRICAO\", '')), 'B')"
+    )
+
+
+def criar_indice_busca(connection):
+    """Cria o índice de busca se ainda não existir (idempotente)."""
+    if connection.dialect.name == "sqlite":
+        for comando in _DDL_SQLITE:
+            connection.execute(text(comando))
+    elif connection.dialect.name == "postgresql":
+        for _, tabela, _ in _TABELAS:
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{tabela}_busca ON {tabela} USING GIN (({_documento_postgres(tabela)}))"
+            ))
+
+
+def remover_indice_busca(connection):
+    if connection.dialect.name == "sqlite":
+        for _, tabela, _ in _TABELAS:
+            for sufixo in ("ai", "ad", "au"):
+                connection.execute(text(f"DROP TRIGGER IF EXISTS busca_{tabela}_{sufixo}"))
+        connection.execute(text("DROP TABLE IF EXISTS busca_catalogo"))
+    elif connection.dialect.name == "postgresql":
+        for _, tabela, _ in _TABELAS:
+            connection.execute(text(f"DROP INDEX IF EXISTS ix_{tabela}_busca"))
+
+
+def _indexar(connection, tipo, tabela, paridade, acima_de=None):
+    filtro = f" WHERE \"ID\" > {int(acima_de)}" if acima_de is not None else ""
+    connection.execute(text(
+        f"INSERT INTO busca_catalogo(rowid, TIPO, NOME, DESCRICAO) "
+        f"SELECT \"ID\" * 2 + {paridade}, '{tipo}', \"NOME\", \"DESCRICAO\" FROM {tabela}{filtro}"
+    ))
+
+
+@contextmanager
+def carga_em_massa(connection, tabela):
+    """Para INSERTs em lote em `tabela`: indexa as linhas novas de uma vez no fim.
+
+    O trigger de INSERT custa uma escrita no FTS5 por linha (numa carga de 1M de
+    brinquedos, mais que o próprio INSERT); um único INSERT ... SELECT das linhas com ID
+    acima do maior anterior é várias vezes mais rápido. O trigger é removido e recriado
+    na transação de `connection`: se a carga falhar, o rollback devolve tudo como era.
+    Só vale para inserções; UPDATE/DELETE no meio da carga continuam nos seus triggers.
+    """
+    if connection.dialect.name != "sqlite" or not connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :nome"), {"nome": f"busca_{tabela}_ai"}
+    ).first():
+        yield
+        return
+    tipo, _, paridade = next(t for t in _TABELAS if t[1] == tabela)
+    maior_id = connection.execute(text(f"SELECT coalesce(max(\"ID\"), 0) FROM {tabela}")).scalar()
+    connection.execute(text(f"DROP TRIGGER busca_{tabela}_ai"))
+    yield
+    _indexar(connection, tipo, tabela, paridade, acima_de=maior_id)
+    connection.execute(text(_TRIGGERS_INSERCAO[tabela]))
+
+
+def reconstruir_indice_busca(connection):
+    """Recarrega o índice FTS5 a partir das tabelas (no Postgres o índice já acompanha os dados)."""
+    if connection.dialect.name != "sqlite":
+        return
+    connection.execute(text("DELETE FROM busca_catalogo"))
+    for tipo, tabela, paridade in _TABELAS:
+        _indexar(connection, tipo, tabela, paridade)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _criar_com_as_tabelas(target, connection, **kw):
+    criar_indice_busca(connection)
+
+
+def termos_da_busca(q: str):
+    """Palavras da busca, sem pontuação/operadores (o usuário não escreve sintaxe de FTS)."""
+    return re.findall(r"\w+", q.lower())
+
+
+def _consulta_sqlite(tipo):
+    filtro_tipo = "AND f.TIPO = :tipo" if tipo else ""
+    return text(f"""
+        SELECT f.TIPO AS tipo, f.rowid / 2 AS id, f.NOME AS nome, f.DESCRICAO AS descricao,
+               coalesce(b."PRECO", r."PRECO") AS preco, coalesce(b."ESTOQUE", r."ESTOQUE") AS estoque,
+               -bm25(busca_catalogo, 0.0, {PESO_NOME}, {PESO_DESCRICAO}) AS relevancia
+        FROM busca_catalogo f
+        LEFT JOIN brinquedos b ON f.TIPO = 'BRINQUEDO' AND b."ID" = f.rowid / 2
+        LEFT JOIN remedios r ON f.TIPO = 'REMEDIO' AND r."ID" = f.rowid / 2
+        WHERE busca_catalogo MATCH :consulta {filtro_tipo}
+        ORDER BY bm25(busca_catalogo, 0.0, {PESO_NOME}, {PESO_DESCRICAO}), f.rowid
+        LIMIT :limite OFFSET :deslocamento
+    """)
+
+
+def _consulta_postgres(tipo):
+    partes = []
+    for nome_tipo, tabela, _ in _TABELAS:
+        if tipo and tipo != nome_tipo:
+            continue
+        documento = _documento_postgres(tabela)
+        partes.append(f"""
+            SELECT '{nome_tipo}' AS tipo, {tabela}."ID" AS id, {tabela}."NOME" AS nome,
+                   {tabela}."DESCRICAO" AS descricao, {tabela}."PRECO" AS preco, {tabela}."ESTOQUE" AS estoque,
+                   ts_rank({documento}, to_tsquery('portuguese', :consulta)) AS relevancia
+            FROM {tabela}
+            WHERE {documento} @@ to_tsquery('portuguese', :consulta)
+        """)
+    return text(" UNION ALL ".join(partes) + " ORDER BY relevancia DESC, tipo, id LIMIT :limite OFFSET :deslocamento")
+
+
+async def buscar_catalogo(session, q: str, tipo=None, limite=20, deslocamento=0):
+    """Devolve (colunas, linhas) da página pedida, da mais para a menos relevante.
+
+    Busca `limite + 1` linhas para a rota saber se há próxima página.
+    """
+    termos = termos_da_busca(q)
+    if not termos:
+        return [], []
+    con = await session.connection()
+    if con.dialect.name == "postgresql":
+        query = _consulta_postgres(tipo)
+        consulta = " & ".join(f"{termo}:*" for termo in termos)
+    else:
+        query = _consulta_sqlite(tipo)
+        consulta = " ".join(f'"{termo}"*' for termo in termos)
+    result = await con.execute(query, {
+        "consulta": consulta, "tipo": tipo, "limite": limite + 1, "deslocamento": deslocamento,
+    })
+    colunas = list(result.keys())
+    linhas = [tuple(linha) for linha in result]
+    return colunas, linhas
+
+
+if __name__ == "__main__":
+    with db.begin() as con:
+        criar_indice_busca(con)
+        reconstruir_indice_busca(con)
+    print("Índice de busca criado/reconstruído.")
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Query
+from dependencies import pegar_sessao_leitura
+from schemas import TipoProduto
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from serializador import FormatoLista, montar_dados, resposta_json
+from busca import buscar_catalogo
+
+busca_router = APIRouter(prefix="/busca", tags=["Busca"])
+
+
+@busca_router.get("", summary="Buscar brinquedos e remédios por texto")
+async def buscar(
+    q: str = Query(..., min_length=1, max_length=200, description="Palavras procuradas no nome e na descrição"),
+    tipo: Optional[TipoProduto] = Query(None, description="Restringir a BRINQUEDO ou REMEDIO"),
+    limit: int = Query(20, ge=1, le=100, description="Quantidade máxima de resultados por página"),
+    offset: int = Query(0, ge=0, le=10_000, description="Resultados a pular (use o `proximo_offset` da resposta anterior)"),
+    formato: FormatoLista = Query("registros", description="registros ou colunar"),
+    session: AsyncSession = Depends(pegar_sessao_leitura)
+):
+    """
+    Busca textual em brinquedos e remédios, do mais para o menos relevante.
+
+    - Maiúsculas são ignoradas, e no SQLite também os acentos ("pelucia" acha "Pelúcia")
+    - Cada palavra vale como prefixo ("bol" acha "Bola") e todas precisam aparecer
+    - Palavras no nome pesam mais do que na descrição
+    """
+    colunas, linhas = await buscar_catalogo(session, q, tipo, limit, offset)
+
+    proximo_offset = None
+    if len(linhas) > limit:
+        linhas = linhas[:limit]
+        proximo_offset = offset + limit
+
+    return resposta_json({
+        "mensagem": f"Resultados para '{q}'",
+        "total": len(linhas),
+        "proximo_offset": proximo_offset,
+        "data": montar_dados(colunas, linhas, formato)
+    })
@@ -0,0 +1,178 @@
+"""
+Cache em memória do catálogo (brinquedos e remédios).
+
+Cada tabela tem uma versão que só cresce. Toda entrada guarda a versão da tabela no
+momento em que foi lida; quando a tabela muda a versão sobe e as entradas antigas
+deixam de valer, sem precisar varrer nada. Além disso:
+- TTL (`CACHE_CATALOGO_TTL_S`, padrão 30 s): limita quanto tempo outro processo do
+  uvicorn pode servir dado velho, já que a invalidação é local a cada processo
+- tamanho máximo (`CACHE_CATALOGO_MAX_ITENS`, padrão 1024): despeja a entrada usada
+  há mais tempo (LRU)
+
+A invalidação acontece no commit: os eventos da Session em models.py anotam quais
+tabelas do catálogo foram alteradas (flush do ORM e UPDATE/DELETE em massa, como a
+baixa de estoque das compras) e, em `after_commit`, avisam este módulo, que sobe a
+versão delas no cache. Assim as rotas de
+cadastro, atualização, estoque e exclusão invalidam o cache sem chamada explícita,
+e um rollback não invalida nada.
+
+GET condicional: `resposta_catalogo` lê a versão gravada no banco
+(`models.VersaoTabela`, a mesma em todos os processos, que sobe logo depois do commit)
+e monta um ETag forte com
+ela e os parâmetros da rota. Se o `If-None-Match` do cliente bate, responde 304 sem
+consultar as linhas. A versão também entra na chave do cache em memória, então um
+processo nunca serve, com o ETag novo, uma resposta guardada antes da alteração.
+Entre o commit e a versão subir (ou se a subida falhar, até a próxima dar certo) a
+tabela responde sem ETag e sem cache, para um 304 nunca confirmar dado velho.
+"""
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+from sqlalchemy import select
+
+from models import AO_CONFIRMAR_CATALOGO, TABELAS_VERSIONADAS as TABELAS_CATALOGO, VersaoTabela, versao_incerta
+from serializador import resposta_json
+
+# max-age 0: o navegador guarda a resposta, mas revalida (If-None-Match) a cada uso
+CACHE_CONTROL_CATALOGO = f"public, max-age={int(os.getenv('CATALOGO_MAX_AGE_S', 0))}, must-revalidate"
+
+
+class CacheCatalogo:
+    def __init__(self, ttl, max_itens):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self.versoes = {tabela: 0 for tabela in TABELAS_CATALOGO.values()}
+        self._itens = OrderedDict()  # (tabela, chave) -> (versao, expira_em, valor)
+        self.hits = 0
+        self.misses = 0
+        self.despejados = 0
+
+    def versao(self, tabela):
+        return self.versoes[tabela]
+
+    def invalidar(self, tabela):
+        self.versoes[tabela] += 1
+
+    def obter(self, tabela, chave):
+        item = self._itens.get((tabela, chave))
+        if item is not None:
+            versao, expira_em, valor = item
+            if versao == self.versoes[tabela] and expira_em > time.monotonic():
+                self._itens.move_to_end((tabela, chave))
+                self.hits += 1
+                return valor
+            del self._itens[(tabela, chave)]
+        self.misses += 1
+        return None
+
+    def guardar(self, tabela, chave, valor, versao):
+        # se a tabela mudou enquanto a consulta rodava, o valor já nasceu velho
+        if versao != self.versoes[tabela]:
+            return
+        self._itens[(tabela, chave)] = (versao, time.monotonic() + self.ttl, valor)
+        self._itens.move_to_end((tabela, chave))
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+            self.despejados += 1
+
+    async def buscar(self, tabela, chave, carregar):
+        """Devolve o valor em cache ou chama `await carregar()` e guarda o resultado."""
+        valor = self.obter(tabela, chave)
+        if valor is None:
+            versao = self.versoes[tabela]
+            valor = await carregar()
+            if valor is not None:
+                self.guardar(tabela, chave, valor, versao)
+        return valor
+
+    def limpar(self):
+        self._itens.clear()
+
+    def metricas(self):
+        consultas = self.hits + self.misses
+        return {
+            "itens": len(self._itens),
+            "max_itens": self.max_itens,
+            "ttl_s": self.ttl,
+            "versoes": dict(self.versoes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": round(self.hits / consultas, 3) if consultas else None,
+            "despejados": self.despejados,
+        }
+
+
+cache_catalogo = CacheCatalogo(
+    ttl=float(os.getenv("CACHE_CATALOGO_TTL_S", 30)),
+    max_itens=int(os.getenv("CACHE_CATALOGO_MAX_ITENS", 1024)),
+)
+
+
+def _invalidar_tabelas(tabelas):
+    for tabela in tabelas:
+        cache_catalogo.invalidar(tabela)
+
+
+# as tabelas alteradas são anotadas pelos eventos da Session em models.py (os mesmos do
+# versionamento); aqui só recebemos a lista depois de cada commit
+AO_CONFIRMAR_CATALOGO.append(_invalidar_tabelas)
+
+
+async def versao_persistida(session, tabela) -> int:
+    """Versão da tabela gravada no banco (0 se ela nunca foi alterada)."""
+    versao = await session.scalar(select(VersaoTabela.VERSAO).where(VersaoTabela.TABELA == tabela))
+    return versao or 0
+
+
+def etag_catalogo(tabela, versao, chave) -> str:
+    """ETag forte: versão da tabela + resumo dos parâmetros que definem o corpo."""
+    resumo = hashlib.blake2b(repr(chave).encode(), digest_size=8).hexdigest()
+    return f'"{tabela}-{versao}-{resumo}"'
+
+
+def nao_modificado(request: Request, etag: str) -> bool:
+    """True se algum ETag do If-None-Match bate com o atual (comparação fraca, como pede a RFC 9110)."""
+    cabecalho = request.headers.get("if-none-match")
+    if not cabecalho:
+        return False
+    if cabecalho.strip() == "*":
+        return True
+    return any(candidato.strip().removeprefix("W/") == etag for candidato in cabecalho.split(","))
+
+
+async def resposta_catalogo(request: Request, session, tabela, chave, carregar):
+    """Responde uma rota GET do catálogo com ETag, 304 e o cache em memória.
+
+    `carregar` é chamado só quando a resposta não está no cache e deve devolver os
+    bytes JSON do corpo, ou (corpo, cabeçalhos extras), que ficam no cache junto com o
+    corpo (ex.: `Link` da próxima página); ou None quando o recurso não existe (aí a
+    função devolve None e a rota decide o 404).
+    """
+    if versao_incerta(tabela):
+        # versão gravada atrasada em relação ao conteúdo: sem ETag nem cache até ela subir
+        carregado = await carregar()
+        if carregado is None:
+            return None
+        return _montar_resposta(carregado, {"Cache-Control": "no-store"})
+
+    versao = await versao_persistida(session, tabela)
+    cabecalhos = {"ETag": etag_catalogo(tabela, versao, chave), "Cache-Control": CACHE_CONTROL_CATALOGO}
+    if nao_modificado(request, cabecalhos["ETag"]):
+        return Response(status_code=304, headers=cabecalhos)
+
+    carregado = await cache_catalogo.buscar(tabela, (versao, *chave), carregar)
+    if carregado is None:
+        return None
+    return _montar_resposta(carregado, cabecalhos)
+
+
+def _montar_resposta(carregado, cabecalhos):
+    corpo, extras = carregado if isinstance(carregado, tuple) else (carregado, None)
+    resposta = resposta_json(corpo)
+    if extras:
+        resposta.headers.update(extras)
+    resposta.headers.update(cabecalhos)
+    return resposta
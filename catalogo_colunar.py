@@ -0,0 +1,194 @@
+"""
+Retrato colunar do catálogo de brinquedos em arrays do NumPy.
+
+Guarda só as colunas usadas para filtrar e ordenar (ID, PRECO, ESTOQUE e o código da
+CATEGORIA), uma posição por brinquedo, em ordem de ID. A listagem resolve categoria,
+faixa de preço, estoque, cursor e ordenação com máscaras e `argsort` sobre esses
+arrays e só depois busca no banco as linhas da página (no máximo `limit`, pela chave
+primária).
+
+Desligado por padrão (`CATALOGO_COLUNAR=1` liga). Há um retrato por engine (principal
+e cada réplica), refeito quando a versão persistida da tabela (`models.VersaoTabela`, a
+mesma dos ETags) muda. Como toda venda ou ajuste de estoque de brinquedo sobe essa
+versão, a releitura (~2 s com 1M de brinquedos) acontece no máximo uma vez a cada
+`CATALOGO_COLUNAR_INTERVALO_S` segundos (padrão 5) por engine; com o retrato velho e a
+última releitura mais recente que isso, ou outra requisição refazendo o retrato, a
+listagem filtra em SQL. Vale para catálogos grandes com poucas escritas.
+
+O NumPy só é importado no primeiro uso, para não pesar na inicialização
+(ver `diag_import.py`).
+"""
+import asyncio
+import os
+import time
+import weakref
+
+from sqlalchemy import func, select
+
+from cache_catalogo import versao_persistida
+from models import Brinquedo
+
+CATALOGO_COLUNAR = os.getenv("CATALOGO_COLUNAR", "0") == "1"
+
+_COLUNAS_RETRATO = (
+    select(Brinquedo.ID, Brinquedo.PRECO, func.coalesce(Brinquedo.ESTOQUE, 0), Brinquedo.CATEGORIA)
+    .order_by(Brinquedo.ID)
+)
+
+# nome do parâmetro `ordenar` -> (coluna do retrato, decrescente)
+ORDENACOES = {
+    "id": (None, False),
+    "preco": ("precos", False),
+    "-preco": ("precos", True),
+    "estoque": ("estoques", False),
+    "-estoque": ("estoques", True),
+}
+
+
+class RetratoBrinquedos:
+    """Arrays paralelos (mesmo índice = mesmo brinquedo), ordenados por ID."""
+
+    def __init__(self, versao, ids, precos, estoques, categorias, codigos):
+        self.versao = versao
+        self.ids = ids
+        self.precos = precos
+        self.estoques = estoques
+        self.categorias = categorias
+        self.codigos = codigos  # nome da categoria -> código em `categorias`
+
+    @classmethod
+    def montar(cls, versao, linhas):
+        """`linhas`: tuplas (ID, PRECO, ESTOQUE, CATEGORIA) em ordem de ID."""
+        import numpy as np
+
+        n = len(linhas)
+        codigos = {}
+        return cls(
+            versao,
+            ids=np.fromiter((linha[0] for linha in linhas), dtype=np.int64, count=n),
+            precos=np.fromiter((linha[1] for linha in linhas), dtype=np.float64, count=n),
+            estoques=np.fromiter((linha[2] for linha in linhas), dtype=np.int64, count=n),
+            categorias=np.fromiter((codigos.setdefault(linha[3], len(codigos)) for linha in linhas), dtype=np.int16, count=n),
+            codigos=codigos,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def consultar(self, categoria=None, min_preco=None, max_preco=None, em_estoque=None,
+                  after=None, ordenar="id", limit=50, offset=0):
+        """Devolve (IDs da página na ordem pedida, se existe próxima página)."""
+        import numpy as np
+
+        # os IDs estão em ordem: o cursor vira o começo de um slice, sem máscara
+        inicio = int(np.searchsorted(self.ids, after, side="right")) if after is not None else 0
+        mascara = None
+
+        def e(condicao):
+            return condicao if mascara is None else mascara & condicao
+
+        if categoria:
+            codigo = self.codigos.get(categoria)
+            if codigo is None:
+                return self.ids[:0], False
+            mascara = e(self.categorias[inicio:] == codigo)
+        if min_preco is not None:
+            mascara = e(self.precos[inicio:] >= min_preco)
+        if max_preco is not None:
+            mascara = e(self.precos[inicio:] <= max_preco)
+        if em_estoque:
+            mascara = e(self.estoques[inicio:] > 0)
+
+        posicoes = np.arange(inicio, len(self.ids)) if mascara is None else np.flatnonzero(mascara) + inicio
+
+        coluna, decrescente = ORDENACOES[ordenar]
+        if coluna is not None:
+            valores = getattr(self, coluna)[posicoes]
+            # estável: empates continuam em ordem de ID, como no ORDER BY ..., ID
+            posicoes = posicoes[np.argsort(-valores if decrescente else valores, kind="stable")]
+
+        pagina = posicoes[offset:offset + limit + 1]
+        return self.ids[pagina[:limit]], len(pagina) > limit
+
+
+def _ler_colunas(session):
+    """Lê as colunas do retrato pelo cursor do driver, na transação da sessão.
+
+    Sem os objetos Row do SQLAlchemy: com 1M de brinquedos eles custam mais que a
+    própria leitura.
+    """
+    conexao = session.connection()
+    sql = str(_COLUNAS_RETRATO.compile(dialect=conexao.dialect, compile_kwargs={"literal_binds": True}))
+    cursor = conexao.connection.cursor()
+    try:
+        cursor.execute(sql)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class _RetratoDoBanco:
+    """Retrato, trava e hora da última reconstrução de um engine (principal ou réplica)."""
+
+    def __init__(self):
+        self.retrato = None
+        self.trava = asyncio.Lock()
+        self.reconstruido_em = None
+
+
+class CatalogoColunar:
+    """Mantém um retrato por engine e conta quantas vezes eles foram refeitos.
+
+    Réplicas em versões diferentes não derrubam o retrato umas das outras. Um retrato
+    desatualizado é refeito no máximo uma vez a cada `intervalo` segundos, e nunca duas
+    vezes ao mesmo tempo; fora disso `obter` devolve None e a listagem filtra em SQL, em
+    vez de enfileirar releituras a cada venda.
+    """
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self._bancos = weakref.WeakKeyDictionary()  # Engine -> _RetratoDoBanco
+        self.reconstrucoes = 0
+        self.adiadas = 0
+        self.ultima_reconstrucao_ms = None
+
+    async def obter(self, session):
+        """Retrato da versão atual do banco da sessão, ou None (use o SQL)."""
+        banco = self._bancos.setdefault(session.get_bind(), _RetratoDoBanco())
+        versao = await versao_persistida(session, "brinquedos")
+        if banco.retrato is not None and banco.retrato.versao == versao:
+            return banco.retrato
+        recente = banco.reconstruido_em is not None and time.monotonic() - banco.reconstruido_em < self.intervalo
+        if recente or banco.trava.locked():
+            self.adiadas += 1
+            return None
+        async with banco.trava:
+            inicio = time.perf_counter()
+            linhas = await session.run_sync(_ler_colunas)
+            # a conversão para arrays é CPU pura: fora do event loop
+            banco.retrato = await asyncio.to_thread(RetratoBrinquedos.montar, versao, linhas)
+            banco.reconstruido_em = time.monotonic()
+            self.reconstrucoes += 1
+            self.ultima_reconstrucao_ms = round((time.perf_counter() - inicio) * 1000, 2)
+        return banco.retrato
+
+    def limpar(self):
+        self._bancos.clear()
+
+    def metricas(self):
+        return {
+            "ativo": CATALOGO_COLUNAR,
+            "intervalo_minimo_s": self.intervalo,
+            "retratos": [
+                {"banco": engine.url.render_as_string(hide_password=True), "versao": banco.retrato.versao,
+                 "brinquedos": len(banco.retrato)}
+                for engine, banco in list(self._bancos.items()) if banco.retrato is not None
+            ],
+            "reconstrucoes": self.reconstrucoes,
+            "adiadas": self.adiadas,
+            "ultima_reconstrucao_ms": self.ultima_reconstrucao_ms,
+        }
+
+
+catalogo_colunar = CatalogoColunar(intervalo=float(os.getenv("CATALOGO_COLUNAR_INTERVALO_S", 5)))
+
@@ -0,0 +1,79 @@
+"""
+Confere se as consultas mais usadas pelas rotas usam índice.
+
+Roda `EXPLAIN QUERY PLAN` em cada consulta e falha (código de saída 1) se alguma
+fizer varredura completa (SCAN) na tabela que deveria ser buscada por índice.
+
+Por padrão cria um banco SQLite em memória a partir de `models.py` (valida os
+índices declarados). Use --banco-atual para checar o banco do DATABASE_URL,
+por exemplo depois de `alembic upgrade head`.
+
+Execute: python check_indices.py [--banco-atual]
+"""
+import sys
+
+from sqlalchemy import create_engine, select, text
+
+from models import Base, Brinquedo, Cliente, Pet, Transacao, db
+
+# (descrição, consulta igual à da rota, tabela que não pode ter SCAN)
+CONSULTAS = [
+    ("deletar_usuario: cliente do usuário",
+     select(Cliente).where(Cliente.ID_USUARIO == 1), "clientes"),
+    ("criar_pet: pet duplicado do cliente",
+     select(Pet).where(Pet.NOME == "Rex", Pet.ID_CLIENTE == 1), "pets"),
+    ("listar_por_categoria",
+     select(Brinquedo).where(Brinquedo.CATEGORIA == "Bola"), "brinquedos"),
+    ("listar_brinquedos: categoria + faixa de preço",
+     select(Brinquedo)
+     .where(Brinquedo.CATEGORIA == "Bola", Brinquedo.PRECO >= 10, Brinquedo.PRECO <= 50)
+     .order_by(Brinquedo.ID).limit(51), "brinquedos"),
+    ("listar_brinquedos: próxima página (cursor)",
+     select(Brinquedo).where(Brinquedo.ID > 100).order_by(Brinquedo.ID).limit(51), "brinquedos"),
+    ("listar_compras: join com clientes",
+     select(Transacao, Cliente).join(Cliente, Cliente.ID == Transacao.ID_CLIENTE), "clientes"),
+    ("compras do cliente",
+     select(Transacao).where(Transacao.ID_CLIENTE == 1), "transacoes"),
+    ("compras do remédio",
+     select(Transacao).where(Transacao.ID_REMEDIO == 1), "transacoes"),
+    ("compras do pet",
+     select(Transacao).where(Transacao.ID_PET == 1), "transacoes"),
+]
+
+
+def plano(con, consulta):
+    sql = str(consulta.compile(dialect=con.dialect, compile_kwargs={"literal_binds": True}))
+    return [linha[-1] for linha in con.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def main():
+    if "--banco-atual" in sys.argv:
+        engine = db
+    else:
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+
+    if engine.dialect.name != "sqlite":
+        print(f"EXPLAIN QUERY PLAN é específico do SQLite (banco atual: {engine.dialect.name})")
+        return 1
+
+    falhas = 0
+    with engine.connect() as con:
+        for descricao, consulta, tabela in CONSULTAS:
+            detalhes = plano(con, consulta)
+            varredura = [d for d in detalhes if d.startswith(f"SCAN {tabela}")]
+            status = "FALHA" if varredura else "OK"
+            falhas += bool(varredura)
+            print(f"[{status}] {descricao}")
+            for detalhe in detalhes:
+                print(f"        {detalhe}")
+
+    if falhas:
+        print(f"\n{falhas} consulta(s) fazendo varredura completa")
+        return 1
+    print("\nTodas as consultas usam índice")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
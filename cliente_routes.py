@@ -1,27 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from models import Usuario, db,Cliente
-from dependencies import pegar_sessao
-from security import bcrypt_context
+from fastapi import APIRouter, Depends, HTTPException, Query
+from models import Usuario, Cliente
+from dependencies import pegar_sessao_async, pegar_sessao_leitura
+from security import servico_senhas
 from schemas import UsuarioSchema
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import pandas as pd
+from serializador import FormatoLista, resposta_lista
 
 
 cliente_router = APIRouter(prefix="/cliente",tags=["cliente"])
 
 @cliente_router.get("/")
-async def autenticar():
-    conn=db.connect()
-    with conn as con:
-        query= select(Cliente)
-        result= pd.read_sql(query,con)
-        result=result.to_dict(orient='records')
-
+async def autenticar(formato: FormatoLista = Query("registros", description="registros ou colunar"), session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
     Essa é a rota padrão de autenticação
     """
-    return {"mensagem": "Você acaba de acessar a rota de autenticação, meus parabéns!","data":result}
+    return await resposta_lista(session, "Você acaba de acessar a rota de autenticação, meus parabéns!", select(Cliente), formato)
 
 
 
@@ -32,22 +26,22 @@ async def autenticar():
 # Alterar senha 
 
 @cliente_router.patch("/alterar_senha")
-async def alterar_senha(usuarioschema:UsuarioSchema,session: Session=Depends(pegar_sessao)):
+async def alterar_senha(usuarioschema:UsuarioSchema,session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Essa é a rota para alterar a senha do usuário
     """
-    usuario = session.query(Usuario).filter(Usuario.EMAIL==usuarioschema.email).first()
+    usuario = await session.scalar(select(Usuario).where(Usuario.EMAIL==usuarioschema.email))
     if not usuario:
         raise HTTPException(status_code=404,detail="Email do usuário não cadastrado")
-    senha_criptografada = bcrypt_context.hash(usuarioschema.senha)
+    senha_criptografada = await servico_senhas.hash(usuarioschema.senha)
     usuario.SENHA = senha_criptografada
     session.add(usuario)
-    session.commit()
+    await session.commit()
     return {"mensagem": f"Senha alterada com sucesso {usuarioschema.email}"}
 
 
 @cliente_router.put("/atualizar_cliente/{cliente_id}")
-async def atualizar_cliente(cliente_id: int, session: Session = Depends(pegar_sessao), 
+async def atualizar_cliente(cliente_id: int, session: AsyncSession = Depends(pegar_sessao_async), 
                            nome: str = None, rua: str = None, numero: str = None,
                            bairro: str = None, complemento: str = None, 
                            telefone: str = None, cpf: str = None):
@@ -56,13 +50,13 @@ async def atualizar_cliente(cliente_id: int, session: Session = Depends(pegar_se
     """
     from models import Cliente
     
-    cliente = session.query(Cliente).filter(Cliente.ID == cliente_id).first()
+    cliente = await session.scalar(select(Cliente).where(Cliente.ID == cliente_id))
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
     # Verifica se CPF já está sendo usado por outro cliente
     if cpf and cpf != cliente.CPF:
-        cpf_existe = session.query(Cliente).filter(Cliente.CPF == cpf).first()
+        cpf_existe = await session.scalar(select(Cliente).where(Cliente.CPF == cpf))
         if cpf_existe:
             raise HTTPException(status_code=400, detail="CPF já está sendo usado por outro cliente")
     
@@ -82,29 +76,29 @@ async def atualizar_cliente(cliente_id: int, session: Session = Depends(pegar_se
         if cpf:
             cliente.CPF = cpf
         
-        session.commit()
-        session.refresh(cliente)
+        await session.commit()
+        await session.refresh(cliente)
         return {"mensagem": "Cliente atualizado com sucesso", "id": cliente.ID}
     except Exception as exc:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar cliente: {str(exc)}")
 
 
 @cliente_router.delete("/deletar_cliente/{cliente_id}")
-async def deletar_cliente(cliente_id: int, session: Session = Depends(pegar_sessao)):
+async def deletar_cliente(cliente_id: int, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Deleta um cliente do sistema
     """
     from models import Cliente
     
-    cliente = session.query(Cliente).filter(Cliente.ID == cliente_id).first()
+    cliente = await session.scalar(select(Cliente).where(Cliente.ID == cliente_id))
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
     try:
-        session.delete(cliente)
-        session.commit()
+        await session.delete(cliente)
+        await session.commit()
         return {"mensagem": "Cliente deletado com sucesso", "id": cliente_id}
     except Exception as exc:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao deletar cliente: {str(exc)}")
\ No newline at end of file
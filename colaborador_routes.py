@@ -1,31 +1,25 @@
 
-from fastapi import APIRouter, Depends, HTTPException
-from models import Colaborador, db
-from dependencies import pegar_sessao
+from fastapi import APIRouter, Depends, HTTPException, Query
+from models import Colaborador
+from dependencies import pegar_sessao_async, pegar_sessao_leitura
 from security import bcrypt_context
 from schemas import Colaboradorchema
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import pandas as pd
+from serializador import FormatoLista, resposta_lista
 from sqlalchemy.exc import IntegrityError
 colaborador_router = APIRouter(prefix="/colaboradores", tags=["Colaboradores"])
 
 @colaborador_router.get("/")
-async def listar_colaboradores():
-    conn = db.connect()
-    with conn as con:
-        query = select(Colaborador)
-        result = pd.read_sql(query, con)
-        result = result.to_dict(orient='records')
-
+async def listar_colaboradores(formato: FormatoLista = Query("registros", description="registros ou colunar"), session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
     Essa é a rota para listar todos os colaboradores
     """
-    return {"mensagem": "Lista de colaboradores acessada com sucesso!", "data": result}
+    return await resposta_lista(session, "Lista de colaboradores acessada com sucesso!", select(Colaborador), formato)
 
 
 @colaborador_router.post("/Cadastrar_Colaborador", status_code=201)
-async def criar_colaborador(colaborador: Colaboradorchema, session: Session = Depends(pegar_sessao)):
+async def criar_colaborador(colaborador: Colaboradorchema, session: AsyncSession = Depends(pegar_sessao_async)):
     # Normaliza CPF (remove pontuação) e trim nos campos
     cpf_recebido = (colaborador.cpf or "").strip()
     cpf_normalizado = "".join(ch for ch in cpf_recebido if ch.isdigit())
@@ -39,7 +33,7 @@ async def criar_colaborador(colaborador: Colaboradorchema, session: Session = De
     print(f"[DEBUG] CPF recebido: {cpf_recebido} -> normalizado: {cpf_normalizado}")
     print(f"[DEBUG] Telefone recebido: {telefone_normalizado}")
 
-    existente = session.query(Colaborador).filter(Colaborador.CPF == cpf_normalizado).first()
+    existente = await session.scalar(select(Colaborador).where(Colaborador.CPF == cpf_normalizado))
     if existente:
         raise HTTPException(status_code=400, detail=f"CPF já cadastrado no sistema: {existente.CPF}")
 
@@ -52,23 +46,23 @@ async def criar_colaborador(colaborador: Colaboradorchema, session: Session = De
             cargo=colaborador.cargo
         )
         session.add(novo_colaborador)
-        session.commit()
-        session.refresh(novo_colaborador)  # Garante que ID está disponível
+        await session.commit()
+        await session.refresh(novo_colaborador)  # Garante que ID está disponível
         return {"mensagem": f"Colaborador cadastrado com sucesso: {novo_colaborador.NOME}", "id": novo_colaborador.ID}
     except IntegrityError:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=400, detail="CPF já cadastrado")
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @colaborador_router.put("/atualizar_colaborador/{colaborador_id}")
-async def atualizar_colaborador(colaborador_id: int, colaborador: Colaboradorchema, session: Session = Depends(pegar_sessao)):
+async def atualizar_colaborador(colaborador_id: int, colaborador: Colaboradorchema, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Atualiza os dados de um colaborador existente
     """
-    colab_existente = session.query(Colaborador).filter(Colaborador.ID == colaborador_id).first()
+    colab_existente = await session.scalar(select(Colaborador).where(Colaborador.ID == colaborador_id))
     if not colab_existente:
         raise HTTPException(status_code=404, detail="Colaborador não encontrado")
     
@@ -77,7 +71,7 @@ async def atualizar_colaborador(colaborador_id: int, colaborador: Colaboradorche
     
     # Verifica se CPF já está sendo usado por outro colaborador
     if cpf_normalizado and cpf_normalizado != colab_existente.CPF:
-        cpf_existe = session.query(Colaborador).filter(Colaborador.CPF == cpf_normalizado).first()
+        cpf_existe = await session.scalar(select(Colaborador).where(Colaborador.CPF == cpf_normalizado))
         if cpf_existe:
             raise HTTPException(status_code=400, detail="CPF já está sendo usado por outro colaborador")
     
@@ -87,27 +81,27 @@ async def atualizar_colaborador(colaborador_id: int, colaborador: Colaboradorche
         colab_existente.TELEFONE = (colaborador.telefone or "").strip()
         colab_existente.CARGO = colaborador.cargo
         
-        session.commit()
-        session.refresh(colab_existente)
+        await session.commit()
+        await session.refresh(colab_existente)
         return {"mensagem": "Colaborador atualizado com sucesso", "id": colab_existente.ID}
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar colaborador: {str(e)}")
 
 
 @colaborador_router.delete("/deletar_colaborador/{colaborador_id}")
-async def deletar_colaborador(colaborador_id: int, session: Session = Depends(pegar_sessao)):
+async def deletar_colaborador(colaborador_id: int, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Deleta um colaborador do sistema
     """
-    colaborador = session.query(Colaborador).filter(Colaborador.ID == colaborador_id).first()
+    colaborador = await session.scalar(select(Colaborador).where(Colaborador.ID == colaborador_id))
     if not colaborador:
         raise HTTPException(status_code=404, detail="Colaborador não encontrado")
     
     try:
-        session.delete(colaborador)
-        session.commit()
+        await session.delete(colaborador)
+        await session.commit()
         return {"mensagem": "Colaborador deletado com sucesso", "id": colaborador_id}
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao deletar colaborador: {str(e)}")
\ No newline at end of file
@@ -1,28 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
-from models import Pet, Remedio, Cliente, Transacao, db
-from dependencies import pegar_sessao
-from schemas import CompraCreate
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from models import Pet, Remedio, Brinquedo, Cliente, Transacao, Pedido, ItemPedido
+from dependencies import escolher_fabrica_leitura, pegar_sessao_async, pegar_sessao_leitura
+from schemas import CompraCreate, PedidoCreate
+from estoque import baixar_estoque, repor_estoque
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-import pandas as pd
+from typing import Literal
+from serializador import FormatoLista, registros_ndjson, resposta_lista
+import csv
+import io
 
 
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Cliente
-from dependencies import pegar_sessao
+from dependencies import pegar_sessao_async
 from schemas import EnderecoUpdateSchema
 
 compra_router = APIRouter(prefix="/compras", tags=["Compras"])
 
+# Quantidade de linhas lidas do cursor por vez durante a exportação
+TAMANHO_LOTE_EXPORTACAO = 1000
+
 @compra_router.put("/enderecos/{cliente_id}", status_code=200)
-async def atualizar_endereco_cliente(cliente_id: int, endereco: EnderecoUpdateSchema, session: Session = Depends(pegar_sessao)):
+async def atualizar_endereco_cliente(cliente_id: int, endereco: EnderecoUpdateSchema, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Atualiza os dados de endereço para um cliente específico
     """
-    cliente = session.get(Cliente, cliente_id)
+    cliente = await session.get(Cliente, cliente_id)
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
 
@@ -37,49 +45,95 @@ async def atualizar_endereco_cliente(cliente_id: int, endereco: EnderecoUpdateSc
         cliente.COMPLEMENTO = endereco.complemento
 
     session.add(cliente)
-    session.commit()
-    session.refresh(cliente)
+    await session.commit()
+    await session.refresh(cliente)
 
     return {"mensagem": "Endereço do cliente atualizado com sucesso", "cliente_id": cliente.ID}
 
 
+def _query_compras():
+    # Colunas da transação + dados do cliente (sem repetir o ID do cliente, que já vem em ID_CLIENTE)
+    colunas_cliente = [coluna for coluna in Cliente.__table__.c if coluna.name != "ID"]
+    return (
+        select(*Transacao.__table__.c, *colunas_cliente)
+        .join(Cliente, Cliente.ID == Transacao.ID_CLIENTE)
+        .order_by(Transacao.ID)
+    )
+
+
 @compra_router.get("/")
-async def listar_compras():
-    conn = db.connect()
-    with conn as con:
-        query = select(Transacao,Cliente).join(Cliente, Cliente.ID == Transacao.ID_CLIENTE)
-        result = pd.read_sql(query, con)
-        result = result.to_dict(orient='records')
+async def listar_compras(formato: FormatoLista = Query("registros", description="registros ou colunar"), session: AsyncSession = Depends(pegar_sessao_leitura)):
+    return await resposta_lista(session, "Lista de compras acessada com sucesso!", _query_compras(), formato)
+
+
+async def _gerar_exportacao_compras(formato: str, fabrica_sessao):
+    """Lê as compras em lotes do cursor e devolve cada lote já serializado.
+
+    Abre a própria sessão (mesma fábrica das rotas de leitura): a da dependência é
+    fechada antes de o corpo da resposta terminar de ser enviado.
+    """
+    async with fabrica_sessao() as session:
+        result = await session.stream(_query_compras())
+        colunas = list(result.keys())
+
+        if formato == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(colunas)
+            async for lote in result.partitions(TAMANHO_LOTE_EXPORTACAO):
+                writer.writerows(lote)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+            yield buffer.getvalue()
+        else:
+            async for lote in result.partitions(TAMANHO_LOTE_EXPORTACAO):
+                yield registros_ndjson(colunas, lote)
 
-    return {"mensagem": "Lista de compras acessada com sucesso!", "data": result}
+
+@compra_router.get("/export")
+async def exportar_compras(
+    request: Request,
+    formato: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson ou csv")
+):
+    """
+    Exporta todas as compras (transação + cliente) em streaming.
+
+    As linhas são lidas do banco em lotes e enviadas conforme são lidas,
+    então o uso de memória não cresce com o tamanho da tabela.
+    """
+    media_type = "text/csv" if formato == "csv" else "application/x-ndjson"
+    fabrica_sessao, _ = escolher_fabrica_leitura(request)
+    return StreamingResponse(
+        _gerar_exportacao_compras(formato, fabrica_sessao),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=compras.{formato}"},
+    )
 
 
 @compra_router.post("/criar", status_code=201)
-async def criar_compra(compra: CompraCreate, session: Session = Depends(pegar_sessao)):
+async def criar_compra(compra: CompraCreate, session: AsyncSession = Depends(pegar_sessao_async)):
     # Valida se cliente existe
-    cliente = session.get(Cliente, compra.id_cliente)
+    cliente = await session.get(Cliente, compra.id_cliente)
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
 
     # Valida se remedio existe
-    remedio = session.get(Remedio, compra.id_remedio)
+    remedio = await session.get(Remedio, compra.id_remedio)
     if not remedio:
         raise HTTPException(status_code=404, detail="Remédio não encontrado")
 
     # Se forneceu pet, valida
     if compra.id_pet is not None:
-        pet_obj = session.get(Pet, compra.id_pet)
+        pet_obj = await session.get(Pet, compra.id_pet)
         if not pet_obj:
             raise HTTPException(status_code=404, detail="Pet não encontrado")
 
-    # Verifica estoque
-    if remedio.ESTOQUE < compra.quantidade:
-        raise HTTPException(status_code=400, detail="Estoque insuficiente")
-
     try:
-        # Atualiza estoque
-        remedio.ESTOQUE = remedio.ESTOQUE - compra.quantidade
-        session.add(remedio)
+        # Baixa o estoque só se houver saldo (UPDATE condicional, sem ler e regravar)
+        if await baixar_estoque(session, Remedio, compra.id_remedio, compra.quantidade) is None:
+            await session.rollback()
+            raise HTTPException(status_code=400, detail="Estoque insuficiente")
 
         nova_transacao = Transacao(
             id_cliente=compra.id_cliente,
@@ -92,64 +146,155 @@ async def criar_compra(compra: CompraCreate, session: Session = Depends(pegar_se
             parcelas=compra.parcelas
         )
         session.add(nova_transacao)
-        session.commit()
-        session.refresh(nova_transacao)
+        await session.commit()
+        await session.refresh(nova_transacao)
 
         return {"mensagem": "Compra registrada com sucesso", "id": nova_transacao.ID}
+    except HTTPException:
+        raise
     except IntegrityError as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        session.rollback()
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@compra_router.post("/pedido", status_code=201)
+async def criar_pedido(pedido: PedidoCreate, session: AsyncSession = Depends(pegar_sessao_async)):
+    """
+    Registra um pedido com vários itens (remédios e/ou brinquedos) em uma única transação.
+
+    - Cliente, pets, remédios e brinquedos são validados com uma consulta `IN` por tipo
+    - O estoque de cada produto é baixado com UPDATE condicional, em ordem de (tipo, ID);
+      se algum item não tiver estoque, nada do pedido é gravado
+    - Pedidos não entram no resumo de `/vendas`, que cobre só as transações (`/compras`)
+    """
+    cliente = await session.get(Cliente, pedido.id_cliente)
+    if not cliente:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+
+    ids_pets = {item.id_pet for item in pedido.itens if item.id_pet is not None}
+    ids_remedios = {item.id_produto for item in pedido.itens if item.tipo == "REMEDIO"}
+    ids_brinquedos = {item.id_produto for item in pedido.itens if item.tipo == "BRINQUEDO"}
+
+    if ids_pets:
+        pets_encontrados = set(await session.scalars(select(Pet.ID).where(Pet.ID.in_(ids_pets))))
+        faltando = ids_pets - pets_encontrados
+        if faltando:
+            raise HTTPException(status_code=404, detail=f"Pet não encontrado: {sorted(faltando)}")
+
+    precos = {}
+    for tipo, modelo, ids, nome in (
+        ("REMEDIO", Remedio, ids_remedios, "Remédio"),
+        ("BRINQUEDO", Brinquedo, ids_brinquedos, "Brinquedo"),
+    ):
+        if not ids:
+            continue
+        encontrados = dict((await session.execute(select(modelo.ID, modelo.PRECO).where(modelo.ID.in_(ids)))).all())
+        faltando = ids - encontrados.keys()
+        if faltando:
+            raise HTTPException(status_code=404, detail=f"{nome} não encontrado: {sorted(faltando)}")
+        precos.update({(tipo, produto_id): preco for produto_id, preco in encontrados.items()})
+
+    # Soma as quantidades do mesmo produto (o carrinho pode repetir itens)
+    quantidades = {}
+    for item in pedido.itens:
+        chave = (item.tipo, item.id_produto)
+        quantidades[chave] = quantidades.get(chave, 0) + item.quantidade
+
+    try:
+        # Sempre na mesma ordem (tipo, ID): dois pedidos com os mesmos produtos travam as
+        # linhas na mesma sequência e um espera o outro, em vez de um deadlock no Postgres
+        for (tipo, produto_id), quantidade in sorted(quantidades.items()):
+            modelo = Remedio if tipo == "REMEDIO" else Brinquedo
+            if await baixar_estoque(session, modelo, produto_id, quantidade) is None:
+                await session.rollback()
+                nome = "remédio" if tipo == "REMEDIO" else "brinquedo"
+                raise HTTPException(status_code=400, detail=f"Estoque insuficiente para o {nome} {produto_id}")
+
+        itens = []
+        for item in pedido.itens:
+            preco = precos[(item.tipo, item.id_produto)] or 0
+            itens.append(ItemPedido(
+                ID_REMEDIO=item.id_produto if item.tipo == "REMEDIO" else None,
+                ID_BRINQUEDO=item.id_produto if item.tipo == "BRINQUEDO" else None,
+                ID_PET=item.id_pet,
+                QUANTIDADE=item.quantidade,
+                PRECO_UNITARIO=preco,
+                VALOR_TOTAL=preco * item.quantidade,
+            ))
+
+        subtotal = sum(item.VALOR_TOTAL for item in itens)
+        novo_pedido = Pedido(
+            ID_CLIENTE=pedido.id_cliente,
+            VALOR_DESCONTO=pedido.valor_desconto or 0,
+            VALOR_FRETE=pedido.valor_frete or 0,
+            VALOR_TOTAL=subtotal - (pedido.valor_desconto or 0) + (pedido.valor_frete or 0),
+            FORMA_PAGAMENTO=pedido.forma_pagamento,
+            PARCELAS=pedido.parcelas,
+            itens=itens,
+        )
+        session.add(novo_pedido)
+        await session.commit()
+
+        return {
+            "mensagem": "Pedido registrado com sucesso",
+            "id": novo_pedido.ID,
+            "itens": len(itens),
+            "valor_total": novo_pedido.VALOR_TOTAL,
+        }
+    except HTTPException:
+        raise
+    except IntegrityError as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        await session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @compra_router.put("/atualizar_compra/{transacao_id}")
-async def atualizar_compra(transacao_id: int, compra: CompraCreate, session: Session = Depends(pegar_sessao)):
+async def atualizar_compra(transacao_id: int, compra: CompraCreate, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Atualiza os dados de uma transação/compra existente
     """
-    transacao = session.get(Transacao, transacao_id)
+    transacao = await session.get(Transacao, transacao_id)
     if not transacao:
         raise HTTPException(status_code=404, detail="Transação não encontrada")
     
     # Valida se cliente existe
-    cliente = session.get(Cliente, compra.id_cliente)
+    cliente = await session.get(Cliente, compra.id_cliente)
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     
     # Valida se remedio existe
-    remedio = session.get(Remedio, compra.id_remedio)
+    remedio = await session.get(Remedio, compra.id_remedio)
     if not remedio:
         raise HTTPException(status_code=404, detail="Remédio não encontrado")
     
     # Se forneceu pet, valida
     if compra.id_pet is not None:
-        pet_obj = session.get(Pet, compra.id_pet)
+        pet_obj = await session.get(Pet, compra.id_pet)
         if not pet_obj:
             raise HTTPException(status_code=404, detail="Pet não encontrado")
     
     try:
-        # Restaura estoque do remédio anterior se mudou
         if transacao.ID_REMEDIO != compra.id_remedio:
-            remedio_anterior = session.get(Remedio, transacao.ID_REMEDIO)
-            if remedio_anterior:
-                remedio_anterior.ESTOQUE += transacao.QUANTIDADE
-                session.add(remedio_anterior)
+            # Devolve o estoque do remédio anterior e baixa do novo
+            await repor_estoque(session, Remedio, transacao.ID_REMEDIO, transacao.QUANTIDADE)
+            if await baixar_estoque(session, Remedio, compra.id_remedio, compra.quantidade) is None:
+                await session.rollback()
+                raise HTTPException(status_code=400, detail="Estoque insuficiente")
         elif transacao.QUANTIDADE != compra.quantidade:
             # Ajusta estoque se mudou a quantidade do mesmo remédio
             diferenca = compra.quantidade - transacao.QUANTIDADE
-            if remedio.ESTOQUE < diferenca:
-                raise HTTPException(status_code=400, detail="Estoque insuficiente")
-            remedio.ESTOQUE -= diferenca
-        
-        # Verifica estoque do novo remédio
-        if transacao.ID_REMEDIO != compra.id_remedio:
-            if remedio.ESTOQUE < compra.quantidade:
-                raise HTTPException(status_code=400, detail="Estoque insuficiente")
-            remedio.ESTOQUE -= compra.quantidade
-        
-        session.add(remedio)
+            if diferenca > 0:
+                if await baixar_estoque(session, Remedio, compra.id_remedio, diferenca) is None:
+                    await session.rollback()
+                    raise HTTPException(status_code=400, detail="Estoque insuficiente")
+            else:
+                await repor_estoque(session, Remedio, compra.id_remedio, -diferenca)
         
         # Atualiza a transação
         transacao.ID_CLIENTE = compra.id_cliente
@@ -161,35 +306,32 @@ async def atualizar_compra(transacao_id: int, compra: CompraCreate, session: Ses
         transacao.FORMA_PAGAMENTO = compra.forma_pagamento
         transacao.PARCELAS = compra.parcelas
         
-        session.commit()
-        session.refresh(transacao)
+        await session.commit()
+        await session.refresh(transacao)
         return {"mensagem": "Compra atualizada com sucesso", "id": transacao.ID}
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar compra: {str(e)}")
 
 
 @compra_router.delete("/deletar_compra/{transacao_id}")
-async def deletar_compra(transacao_id: int, session: Session = Depends(pegar_sessao)):
+async def deletar_compra(transacao_id: int, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Deleta uma transação/compra do sistema e restaura o estoque
     """
-    transacao = session.get(Transacao, transacao_id)
+    transacao = await session.get(Transacao, transacao_id)
     if not transacao:
         raise HTTPException(status_code=404, detail="Transação não encontrada")
     
     try:
         # Restaura o estoque do remédio
-        remedio = session.get(Remedio, transacao.ID_REMEDIO)
-        if remedio:
-            remedio.ESTOQUE += transacao.QUANTIDADE
-            session.add(remedio)
+        await repor_estoque(session, Remedio, transacao.ID_REMEDIO, transacao.QUANTIDADE)
         
-        session.delete(transacao)
-        session.commit()
+        await session.delete(transacao)
+        await session.commit()
         return {"mensagem": "Compra deletada com sucesso e estoque restaurado", "id": transacao_id}
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao deletar compra: {str(e)}")
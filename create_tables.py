@@ -4,6 +4,7 @@ Use este script em desenvolvimento para criar as tabelas definidas em `models.py
 Em produção, prefira usar Alembic (`alembic upgrade head`).
 """
 from models import Base, db
+import busca  # noqa: F401 (cria o índice de busca junto com as tabelas)
 
 
 def main():
@@ -1,10 +1,125 @@
-from sqlalchemy.orm import sessionmaker
-from models import db
+"""
+Caminho único para pegar conexões do banco.
+
+As rotas recebem a sessão por `pegar_sessao_async` (ou `pegar_sessao` no código
+síncrono); as duas usam as fábricas criadas uma vez em `models` (`SessionAsync` /
+`SessionLocal`), nunca um `sessionmaker` novo por requisição.
+
+As rotas GET de catálogo/listagem usam `pegar_sessao_leitura`, que reveza entre as
+réplicas de `DATABASE_URLS_LEITURA`. Sem réplicas, ou logo depois de o cliente fazer
+uma escrita (cookie marcado pelo middleware do `main.py`, para ele ler o que acabou
+de gravar), a leitura vai para o primário.
+
+Cada engine tem um `EstatisticasPool` que conta conexões abertas, checkouts e o tempo
+que a requisição esperou por uma conexão livre (visível em `GET /estatisticas/pool`).
+"""
+import itertools
+import os
+import time
+
+from fastapi import Request
+from sqlalchemy import event
+
+from models import SessionAsync, SessionLocal, SessionsLeitura, db, db_async, dbs_leitura
+
+# Por quantos segundos depois de uma escrita o cliente continua lendo do primário
+# (cubra o atraso da cópia para as réplicas)
+JANELA_PRIMARIO_S = float(os.getenv("LEITURA_PRIMARIO_APOS_ESCRITA_S", 5))
+COOKIE_ESCRITA = "farmpet_escrita"
+
+
+class EstatisticasPool:
+    """Contadores do pool de um engine e tempo de espera por conexão."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.conexoes_abertas = 0
+        self.checkouts = 0
+        self.esperas = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        event.listen(engine, "connect", self._conectou)
+        event.listen(engine, "checkout", self._checkout)
+
+    def _conectou(self, dbapi_connection, connection_record):
+        self.conexoes_abertas += 1
+
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+
+    def registrar_espera(self, segundos):
+        self.esperas += 1
+        self.espera_total += segundos
+        self.espera_max = max(self.espera_max, segundos)
+
+    def retrato(self):
+        pool = self.engine.pool
+        return {
+            "pool": type(pool).__name__,
+            "tamanho": pool.size() if hasattr(pool, "size") else None,
+            "em_uso": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "livres": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "conexoes_abertas": self.conexoes_abertas,
+            "checkouts": self.checkouts,
+            "espera_media_ms": round(self.espera_total / (self.esperas or 1) * 1000, 2),
+            "espera_max_ms": round(self.espera_max * 1000, 2),
+        }
+
+
+estatisticas_pool = {
+    "assincrono": EstatisticasPool(db_async.sync_engine),
+    "sincrono": EstatisticasPool(db),
+}
+for _numero, _engine in enumerate(dbs_leitura, start=1):
+    estatisticas_pool[f"leitura_{_numero}"] = EstatisticasPool(_engine.sync_engine)
+
+_rodizio_leitura = itertools.cycle(range(len(SessionsLeitura)))
+
+
+def escreveu_recentemente(request: Request) -> bool:
+    """True se o cliente fez uma escrita há menos de JANELA_PRIMARIO_S ou pediu leitura no primário."""
+    if request.headers.get("X-Consistencia", "").lower() == "primario":
+        return True
+    try:
+        return time.time() - float(request.cookies.get(COOKIE_ESCRITA, 0)) < JANELA_PRIMARIO_S
+    except ValueError:
+        return False
+
+
+def escolher_fabrica_leitura(request: Request = None):
+    """Devolve (fábrica de sessão, nome nas estatísticas) para uma leitura."""
+    if not SessionsLeitura or (request is not None and escreveu_recentemente(request)):
+        return SessionAsync, "assincrono"
+    indice = next(_rodizio_leitura)
+    return SessionsLeitura[indice], f"leitura_{indice + 1}"
+
 
 def pegar_sessao():
+    session = SessionLocal()
     try:
-        Session = sessionmaker(bind=db)
-        session = Session()
+        inicio = time.perf_counter()
+        session.connection()
+        estatisticas_pool["sincrono"].registrar_espera(time.perf_counter() - inicio)
         yield session
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+
+async def pegar_sessao_async():
+    """Sessão assíncrona (AsyncSession) usada pelas rotas."""
+    async with SessionAsync() as session:
+        inicio = time.perf_counter()
+        await session.connection()
+        estatisticas_pool["assincrono"].registrar_espera(time.perf_counter() - inicio)
+        yield session
+
+
+async def pegar_sessao_leitura(request: Request):
+    """AsyncSession para rotas só de leitura: réplica da vez ou o primário (ver escolher_fabrica_leitura)."""
+    fabrica, nome = escolher_fabrica_leitura(request)
+    async with fabrica() as session:
+        inicio = time.perf_counter()
+        await session.connection()
+        estatisticas_pool[nome].registrar_espera(time.perf_counter() - inicio)
+        yield session
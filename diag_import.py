@@ -1,7 +1,74 @@
+"""
+Diagnóstico de importação do app.
+
+- Confere se `main` importa e se o OpenAPI é gerado (como antes)
+- Mede o tempo de importação com `python -X importtime` em um processo limpo:
+  total do `import main`, custo de cada roteador, dos módulos do projeto e das
+  bibliotecas pesadas
+- Falha (código de saída 1) se o total passar do orçamento ou se algum módulo
+  proibido (pandas, numpy) for carregado na inicialização
+
+Execute: python diag_import.py [--orcamento-ms 900] [--proibidos pandas,numpy]
+O orçamento também pode vir da variável ORCAMENTO_IMPORT_MS.
+"""
+import argparse
+import os
+import subprocess
+import sys
 import traceback
 
 logfile = 'diag_import.log'
-with open(logfile, 'w', encoding='utf-8') as f:
+PASTA_PROJETO = os.path.dirname(os.path.abspath(__file__))
+MODULOS_PROJETO = {
+    nome[:-3] for nome in os.listdir(PASTA_PROJETO)
+    if nome.endswith('.py') and not nome.startswith('diag_')
+}
+BIBLIOTECAS = ['fastapi', 'starlette', 'pydantic', 'sqlalchemy', 'dotenv', 'orjson', 'passlib', 'bcrypt', 'pandas', 'numpy']
+
+
+def medir_importacao(modulo='main'):
+    """Importa `modulo` em um processo novo com -X importtime e devolve as linhas medidas.
+
+    Cada item é (nivel, nome, proprio_us, acumulado_us). O nível 0 é o próprio módulo,
+    o nível 1 são os imports feitos diretamente por ele, e assim por diante.
+    """
+    saida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=PASTA_PROJETO, capture_output=True, text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    if saida.returncode != 0:
+        raise RuntimeError(f'falha ao importar {modulo}:\n{saida.stderr}')
+
+    medicoes = []
+    for linha in saida.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, acumulado, nome = linha[len('import time:'):].split('|')
+        proprio, acumulado = int(proprio), int(acumulado)
+        nome = nome[1:]  # espaço depois do separador
+        nivel = (len(nome) - len(nome.lstrip())) // 2
+        medicoes.append((nivel, nome.strip(), proprio, acumulado))
+    return medicoes
+
+
+def relatorio(medicoes, modulo='main'):
+    """Agrupa as medições em: total, roteadores, módulos do projeto e bibliotecas."""
+    total = next(acumulado for nivel, nome, _, acumulado in medicoes if nivel == 0 and nome == modulo)
+    roteadores = [(nome, acumulado) for nivel, nome, _, acumulado in medicoes
+                  if nivel == 1 and nome.endswith('_routes')]
+    projeto = [(nome, proprio, acumulado) for _, nome, proprio, acumulado in medicoes
+               if nome in MODULOS_PROJETO]
+    bibliotecas = {}
+    for _, nome, _, acumulado in medicoes:
+        # só a primeira vez que o pacote raiz aparece conta (é quando ele é carregado de fato)
+        if nome in BIBLIOTECAS and nome not in bibliotecas:
+            bibliotecas[nome] = acumulado
+    carregados = {nome.split('.')[0] for _, nome, _, _ in medicoes}
+    return total, roteadores, projeto, bibliotecas, carregados
+
+
+def verificar_app(f):
     try:
         import main
         f.write('import main: OK\n')
@@ -20,4 +87,44 @@ with open(logfile, 'w', encoding='utf-8') as f:
     except Exception:
         f.write('ERROR importing main:\n')
         traceback.print_exc(file=f)
-print('Wrote', logfile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de importação do app por módulo e por roteador')
+    parser.add_argument('--orcamento-ms', type=float, default=float(os.getenv('ORCAMENTO_IMPORT_MS', 0)) or None,
+                        help='falha se o import main passar desse tempo (ms)')
+    parser.add_argument('--proibidos', default='pandas,numpy',
+                        help='módulos que não podem ser carregados na inicialização (separados por vírgula)')
+    args = parser.parse_args()
+
+    falhas = []
+    with open(logfile, 'w', encoding='utf-8') as f:
+        verificar_app(f)
+
+        total, roteadores, projeto, bibliotecas, carregados = relatorio(medir_importacao('main'))
+        linhas = [f'\nimport main: {total / 1000:.1f} ms', '\nroteadores (custo incremental dentro do main):']
+        linhas += [f'  {nome:<24} {acumulado / 1000:>8.1f} ms' for nome, acumulado in roteadores]
+        linhas.append('\nmódulos do projeto (próprio / acumulado):')
+        linhas += [f'  {nome:<24} {proprio / 1000:>8.1f} ms {acumulado / 1000:>8.1f} ms'
+                   for nome, proprio, acumulado in sorted(projeto, key=lambda item: -item[2])]
+        linhas.append('\nbibliotecas (acumulado na primeira importação):')
+        linhas += [f'  {nome:<24} {acumulado / 1000:>8.1f} ms'
+                   for nome, acumulado in sorted(bibliotecas.items(), key=lambda item: -item[1])]
+
+        for modulo in [m.strip() for m in args.proibidos.split(',') if m.strip()]:
+            if modulo in carregados:
+                falhas.append(f'módulo proibido carregado na inicialização: {modulo}')
+        if args.orcamento_ms and total / 1000 > args.orcamento_ms:
+            falhas.append(f'import main levou {total / 1000:.1f} ms (orçamento: {args.orcamento_ms:.0f} ms)')
+
+        linhas += ['', *(f'FALHA: {falha}' for falha in falhas)] if falhas else ['', 'OK: dentro do orçamento']
+        texto = '\n'.join(linhas) + '\n'
+        f.write(texto)
+        print(texto)
+
+    print('Wrote', logfile)
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Contagem e tempo das consultas SQL de cada requisição, com alerta de N+1.
+
+Os eventos `before_cursor_execute`/`after_cursor_execute` valem para todos os engines
+(síncrono, assíncrono e réplicas) e somam cada consulta no `ContadorSql` da requisição
+atual, guardado numa ContextVar pelo `MiddlewareDiagnosticoSql`. Fora de uma requisição
+(scripts, Alembic) a ContextVar está vazia e nada é contado.
+
+No fim da requisição, o mesmo SQL executado `SQL_LIMIAR_REPETIDAS` vezes ou mais (padrão
+3, mudando só os parâmetros) vira um aviso no log `farmpet.sql`: quase sempre é um laço
+fazendo uma consulta por item (N+1) que caberia em um `IN (...)` ou em um JOIN.
+
+Com `SQL_DIAGNOSTICO=1` (desligado por padrão) cada resposta também traz os cabeçalhos
+`X-SQL-Consultas`, `X-SQL-Tempo-ms` e `X-SQL-Repetidas`, e cada requisição gera uma
+linha de resumo no log. Os cabeçalhos contam o que rodou até a resposta começar (numa
+resposta em streaming, o resto aparece só no log).
+"""
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_DIAGNOSTICO = os.getenv("SQL_DIAGNOSTICO", "0") == "1"
+SQL_LIMIAR_REPETIDAS = int(os.getenv("SQL_LIMIAR_REPETIDAS", 3))
+
+logger = logging.getLogger("farmpet.sql")
+if SQL_DIAGNOSTICO:
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        _saida = logging.StreamHandler()
+        _saida.setFormatter(logging.Formatter("%(levelname)s:     %(name)s - %(message)s"))
+        logger.addHandler(_saida)
+
+_contador_atual = ContextVar("contador_sql", default=None)
+
+
+class ContadorSql:
+    __slots__ = ("consultas", "tempo", "por_comando")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo = 0.0
+        self.por_comando = {}  # texto do SQL -> vezes executado
+
+    def registrar(self, comando, duracao):
+        self.consultas += 1
+        self.tempo += duracao
+        self.por_comando[comando] = self.por_comando.get(comando, 0) + 1
+
+    def repetidas(self, limiar=SQL_LIMIAR_REPETIDAS):
+        """Comandos executados `limiar` vezes ou mais, do mais repetido para o menos."""
+        return sorted(
+            ((vezes, comando) for comando, vezes in self.por_comando.items() if vezes >= limiar),
+            reverse=True,
+        )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if _contador_atual.get() is not None:
+        conn.info.setdefault("diagnostico_inicio", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    contador = _contador_atual.get()
+    if contador is not None and conn.info.get("diagnostico_inicio"):
+        contador.registrar(statement, time.perf_counter() - conn.info["diagnostico_inicio"].pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _erro(contexto):
+    # consulta que falhou não passa pelo after_cursor_execute: descarta o início dela
+    if contexto.connection is not None and contexto.connection.info.get("diagnostico_inicio"):
+        contexto.connection.info["diagnostico_inicio"].pop()
+
+
+def _descrever(scope):
+    rota = scope.get("route")
+    return f'{scope.get("method")} {rota.path if rota is not None else scope.get("path")}'
+
+
+class MiddlewareDiagnosticoSql:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        contador = ContadorSql()
+        token = _contador_atual.set(contador)
+
+        if SQL_DIAGNOSTICO:
+            async def enviar(mensagem):
+                if mensagem["type"] == "http.response.start":
+                    mensagem["headers"] = [
+                        *mensagem.get("headers", ()),
+                        (b"x-sql-consultas", str(contador.consultas).encode()),
+                        (b"x-sql-tempo-ms", f"{contador.tempo * 1000:.2f}".encode()),
+                        (b"x-sql-repetidas", str(len(contador.repetidas())).encode()),
+                    ]
+                await send(mensagem)
+        else:
+            enviar = send
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _contador_atual.reset(token)
+            self._registrar_no_log(scope, contador)
+
+    @staticmethod
+    def _registrar_no_log(scope, contador):
+        if contador.consultas == 0:
+            return
+        for vezes, comando in contador.repetidas():
+            logger.warning(
+                "%s: o mesmo SQL rodou %d vezes (possível N+1): %s",
+                _descrever(scope), vezes, " ".join(comando.split())[:300],
+            )
+        if SQL_DIAGNOSTICO:
+            logger.info(
+                "%s: %d consultas SQL em %.2f ms",
+                _descrever(scope), contador.consultas, contador.tempo * 1000,
+            )
@@ -0,0 +1,167 @@
+"""
+Baixa e reposição de estoque de remédios e brinquedos.
+
+Cada alteração é um único UPDATE condicional
+(`SET ESTOQUE = ESTOQUE - :q WHERE ID = :id AND ESTOQUE >= :q`), então duas compras
+simultâneas nunca vendem a mesma unidade: a que perder a corrida não altera nenhuma
+linha e recebe None. Não há leitura prévia do estoque em Python.
+
+Para brinquedos, as estatísticas por categoria (`brinquedos_estatisticas`) são
+ajustadas na mesma transação, já que esse caminho não passa pelos eventos do ORM.
+
+O ajuste em lote (`ajustar_estoque_em_lote`) muda o estoque de vários produtos com um
+único UPDATE (`SET ESTOQUE = CASE ID WHEN ... END WHERE ID IN (...)`), cada item com um
+valor absoluto ou um delta. Com valores absolutos há antes um UPDATE que só trava as
+linhas e lê o estoque anterior delas.
+
+As funções públicas recebem a AsyncSession das rotas e rodam o UPDATE na sessão
+síncrona interna dela (`run_sync`).
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Integer, bindparam, case, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from models import Brinquedo, ajustar_estatisticas_brinquedos, ajustar_estatisticas_brinquedos_em_lote
+
+
+def _alterar_estoque(session: Session, modelo, produto_id: int, delta: int, condicao=None):
+    query = update(modelo).where(modelo.ID == produto_id)
+    if condicao is not None:
+        query = query.where(condicao)
+    query = query.values(ESTOQUE=func.coalesce(modelo.ESTOQUE, 0) + delta)
+
+    # se o produto já estiver carregado na sessão, o ESTOQUE dele é relido no próximo acesso
+    carregado = session.identity_map.get(identity_key(modelo, produto_id))
+    if carregado is not None:
+        session.expire(carregado, ["ESTOQUE"])
+
+    if modelo is Brinquedo:
+        linha = session.execute(
+            query.returning(Brinquedo.ESTOQUE, Brinquedo.CATEGORIA, Brinquedo.PRECO),
+            execution_options={"synchronize_session": False},
+        ).first()
+        if linha is None:
+            return None
+        estoque_novo, categoria, preco = linha
+        estoque_anterior = estoque_novo - delta
+        ajustar_estatisticas_brinquedos(
+            session.connection(),
+            categoria,
+            unidades=delta,
+            valor=(preco or 0) * delta,
+            em_falta=(estoque_novo == 0) - (estoque_anterior == 0),
+        )
+        return estoque_novo
+
+    return session.execute(
+        query.returning(modelo.ESTOQUE),
+        execution_options={"synchronize_session": False},
+    ).scalar_one_or_none()
+
+
+async def baixar_estoque(session: AsyncSession, modelo, produto_id: int, quantidade: int) -> Optional[int]:
+    """Tira `quantidade` do estoque se houver saldo. Devolve o estoque novo ou None se não havia."""
+    return await session.run_sync(_alterar_estoque, modelo, produto_id, -quantidade, modelo.ESTOQUE >= quantidade)
+
+
+async def repor_estoque(session: AsyncSession, modelo, produto_id: int, quantidade: int) -> Optional[int]:
+    """Devolve `quantidade` ao estoque. Devolve o estoque novo ou None se o produto não existe."""
+    return await session.run_sync(_alterar_estoque, modelo, produto_id, quantidade)
+
+
+@lru_cache(maxsize=64)
+def _update_em_lote(modelo, tamanho):
+    """UPDATE de `tamanho` itens com parâmetros id_i, absoluto_i (ou None) e delta_i.
+
+    A mesma expressão vale para valor absoluto e delta, então o comando só depende do
+    tamanho do lote: montado uma vez, ele reaproveita a chave de cache e o SQL compilado.
+    """
+    estoque = func.coalesce(modelo.ESTOQUE, 0)
+    ids = [bindparam(f"id_{i}", type_=Integer) for i in range(tamanho)]
+    novo = case(
+        {
+            ids[i]: func.coalesce(bindparam(f"absoluto_{i}", type_=Integer), estoque + bindparam(f"delta_{i}", type_=Integer))
+            for i in range(tamanho)
+        },
+        value=modelo.ID,
+    )
+    colunas = [modelo.ID, modelo.NOME, modelo.ESTOQUE]
+    if modelo is Brinquedo:
+        colunas += [Brinquedo.CATEGORIA, Brinquedo.PRECO]
+    return update(modelo).where(modelo.ID.in_(ids)).values(ESTOQUE=novo).returning(*colunas)
+
+
+def _ajustar_em_lote(session: Session, modelo, ajustes):
+    estoque = func.coalesce(modelo.ESTOQUE, 0)
+    ids = [produto_id for produto_id, _, _ in ajustes]
+
+    # o estoque anterior de quem recebe valor absoluto precisa ser lido antes (o RETURNING
+    # só enxerga o valor novo). A leitura é um UPDATE que não muda nada: ele trava as
+    # linhas até o commit (o SQLite nem abre transação num SELECT), então o valor lido é o
+    # mesmo que o UPDATE de verdade vai substituir
+    absolutos = [produto_id for produto_id, quantidade, _ in ajustes if quantidade is not None]
+    anteriores = {}
+    if absolutos:
+        anteriores = dict(session.execute(
+            update(modelo).where(modelo.ID.in_(absolutos)).values(ESTOQUE=modelo.ESTOQUE)
+            .returning(modelo.ID, estoque),
+            execution_options={"synchronize_session": False},
+        ).all())
+
+    for produto_id in ids:
+        carregado = session.identity_map.get(identity_key(modelo, produto_id))
+        if carregado is not None:
+            session.expire(carregado, ["ESTOQUE"])
+
+    linhas = {
+        linha.ID: linha
+        for linha in session.execute(
+            _update_em_lote(modelo, len(ajustes)),
+            {
+                f"{chave}_{i}": valor
+                for i, (produto_id, quantidade, delta) in enumerate(ajustes)
+                for chave, valor in (("id", produto_id), ("absoluto", quantidade), ("delta", delta or 0))
+            },
+            execution_options={"synchronize_session": False},
+        )
+    }
+
+    itens = []
+    estatisticas = {}  # categoria -> deltas (só brinquedos)
+    for produto_id, quantidade, delta in ajustes:
+        linha = linhas.get(produto_id)
+        if linha is None:
+            continue
+        # com delta o anterior sai do próprio UPDATE, mesmo que outra transação tenha mexido antes
+        anterior = anteriores[produto_id] if quantidade is not None else linha.ESTOQUE - delta
+        itens.append({
+            "id": produto_id,
+            "nome": linha.NOME,
+            "estoque_anterior": anterior,
+            "estoque_atual": linha.ESTOQUE,
+            "diferenca": linha.ESTOQUE - anterior,
+        })
+        if modelo is Brinquedo:
+            deltas = estatisticas.setdefault(linha.CATEGORIA, {"unidades": 0, "valor": 0.0, "em_falta": 0})
+            deltas["unidades"] += linha.ESTOQUE - anterior
+            deltas["valor"] += (linha.PRECO or 0) * (linha.ESTOQUE - anterior)
+            deltas["em_falta"] += (linha.ESTOQUE == 0) - (anterior == 0)
+
+    ajustar_estatisticas_brinquedos_em_lote(session.connection(), estatisticas)
+    return itens
+
+
+async def ajustar_estoque_em_lote(
+    session: AsyncSession, modelo, ajustes: List[Tuple[int, Optional[int], Optional[int]]]
+) -> List[dict]:
+    """Aplica `ajustes` [(id, quantidade absoluta ou None, delta ou None)] com um único UPDATE.
+
+    Devolve, na ordem dos ajustes, id, nome, estoque anterior e atual de cada produto
+    encontrado (IDs inexistentes ficam de fora). Não confirma nem valida o resultado:
+    a rota decide se faz commit ou rollback (ex.: algum estoque ficou negativo).
+    """
+    return await session.run_sync(_ajustar_em_lote, modelo, ajustes)
@@ -0,0 +1,293 @@
+"""
+Importação em massa do catálogo (brinquedos e remédios) a partir de um arquivo CSV ou NDJSON.
+
+O arquivo vem no corpo da requisição e é lido em streaming: os registros são separados
+conforme os bytes chegam e processados em lotes de `IMPORTACAO_LOTE` (padrão 1000),
+então a memória não cresce com o tamanho do arquivo. Cada lote:
+- valida os registros com o schema da rota de cadastro (`BrinquedoSchema`/`RemedioSchema`);
+- resolve os nomes já cadastrados com um único `SELECT ... WHERE NOME IN (...)`;
+- grava com um INSERT e um UPDATE em lote (executemany), na sessão da rota;
+- é confirmado (commit) sozinho: um lote que o banco recusar volta atrás sem desfazer
+  os anteriores, e o arquivo segue.
+
+Nome já cadastrado (`conflito`): "atualizar" (padrão) grava por cima só os campos que
+vieram no registro, "ignorar" pula o registro, "erro" o coloca no relatório. Se o mesmo
+nome aparece mais de uma vez no arquivo, vale o último.
+
+No CSV a primeira linha é o cabeçalho com os nomes dos campos do schema (nome, preco,
+...); células vazias contam como campo ausente. No NDJSON cada linha é um objeto JSON.
+
+Como o INSERT/UPDATE em lote não passa pelos eventos de cada objeto, as estatísticas de
+brinquedos são ajustadas aqui (`ajustar_estatisticas_brinquedos_em_lote`), uma vez por
+lote. A versão do catálogo (ETag/cache) sobe pelos eventos da Session, e o índice
+de busca acompanha pelos triggers.
+"""
+import codecs
+import csv
+import io
+import os
+
+import orjson
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from models import Brinquedo, Remedio, _contribuicao_brinquedo, ajustar_estatisticas_brinquedos_em_lote
+
+IMPORTACAO_LOTE = int(os.getenv("IMPORTACAO_LOTE", 1000))
+LIMITE_ERROS_RELATORIO = 1000  # além disso o relatório só conta (erros_omitidos)
+
+# corpo da requisição na documentação (/docs): o arquivo vai cru, sem multipart
+CORPO_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "text/csv": {"schema": {"type": "string", "format": "binary"}},
+            "application/x-ndjson": {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+
+# ---------------------------------------------------------------- leitura do arquivo
+
+async def _textos(stream):
+    """Texto decodificado (UTF-8, com ou sem BOM) conforme os bytes chegam."""
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+    async for pedaco in stream:
+        texto = decodificador.decode(pedaco)
+        if texto:
+            yield texto
+    final = decodificador.decode(b"", final=True)
+    if final:
+        yield final
+
+
+async def _registros_ndjson(stream):
+    """(linha, dict) por linha não vazia; (linha, mensagem) se a linha não for um objeto JSON."""
+    pendente = ""
+    numero = 0
+    async for texto in _textos(stream):
+        pendente += texto
+        *completas, pendente = pendente.split("\n")
+        for linha in completas:
+            numero += 1
+            if linha.strip():
+                yield numero, _objeto_json(linha)
+    if pendente.strip():
+        yield numero + 1, _objeto_json(pendente)
+
+
+def _objeto_json(linha):
+    try:
+        valor = orjson.loads(linha)
+    except orjson.JSONDecodeError as e:
+        return f"JSON inválido: {e}"
+    return valor if isinstance(valor, dict) else "cada linha precisa ser um objeto JSON"
+
+
+async def _registros_csv(stream):
+    """(linha, dict) por registro, com a linha em que ele começa (o cabeçalho é a linha 1).
+
+    Um campo entre aspas pode ter quebras de linha, então só vão para o leitor de CSV os
+    trechos que terminam numa quebra de linha fora de aspas (número par de aspas).
+    """
+    pendente = ""
+    cabecalho = None
+    numero = 0
+
+    def registros(trecho):
+        nonlocal cabecalho, numero
+        leitor = csv.reader(io.StringIO(trecho))
+        lidas = 0  # linhas do trecho já consumidas pelo leitor
+        for campos in leitor:
+            linha, lidas = numero + lidas + 1, leitor.line_num
+            if cabecalho is None:
+                cabecalho = [campo.strip().lower() for campo in campos]
+                continue
+            if not any(campo.strip() for campo in campos):
+                continue
+            # célula vazia = campo ausente (no UPDATE não apaga o valor atual)
+            yield linha, {chave: valor for chave, valor in zip(cabecalho, campos) if valor.strip() != ""}
+        numero += lidas
+
+    async for texto in _textos(stream):
+        pendente += texto
+        corte = pendente.rfind("\n") + 1
+        while corte and pendente.count('"', 0, corte) % 2:
+            corte = pendente.rfind("\n", 0, corte - 1) + 1
+        if corte:
+            trecho, pendente = pendente[:corte], pendente[corte:]
+            for registro in registros(trecho):
+                yield registro
+    if pendente.strip():
+        for registro in registros(pendente):
+            yield registro
+    if cabecalho is None:
+        raise HTTPException(status_code=400, detail="Arquivo CSV vazio: falta o cabeçalho")
+
+
+# ---------------------------------------------------------------- gravação dos lotes
+
+def _colunas_brinquedo(dados):
+    return {"NOME": dados.nome, "CATEGORIA": dados.categoria, "PRECO": dados.preco, "ESTOQUE": dados.estoque,
+            "IMAGEM": dados.imagem, "DESCRICAO": dados.descricao}
+
+
+def _colunas_remedio(dados):
+    # o modelo guarda RECEITA como texto, como na rota de cadastro
+    return {"NOME": dados.nome, "DESCRICAO": dados.descricao, "PRECO": dados.preco, "ESTOQUE": dados.estoque,
+            "RECEITA": str(dados.receita) if dados.receita is not None else None}
+
+
+_CAMPOS_COLUNAS = {
+    Brinquedo: ({"nome": "NOME", "categoria": "CATEGORIA", "preco": "PRECO", "estoque": "ESTOQUE",
+                 "imagem": "IMAGEM", "descricao": "DESCRICAO"}, _colunas_brinquedo),
+    Remedio: ({"nome": "NOME", "descricao": "DESCRICAO", "preco": "PRECO", "estoque": "ESTOQUE",
+               "receita": "RECEITA"}, _colunas_remedio),
+}
+
+
+class RelatorioImportacao:
+    def __init__(self):
+        self.linhas = 0
+        self.inseridos = 0
+        self.atualizados = 0
+        self.ignorados = 0
+        self.com_erro = 0
+        self.erros = []
+        self.erros_omitidos = 0
+
+    def erro(self, linha, nome, erros):
+        self.com_erro += 1
+        if len(self.erros) < LIMITE_ERROS_RELATORIO:
+            self.erros.append({"linha": linha, "nome": nome, "erros": erros})
+        else:
+            self.erros_omitidos += 1
+
+    def resposta(self):
+        return {
+            "mensagem": "Importação concluída" if not self.com_erro else "Importação concluída com erros",
+            "linhas": self.linhas,
+            "inseridos": self.inseridos,
+            "atualizados": self.atualizados,
+            "ignorados": self.ignorados,
+            "com_erro": self.com_erro,
+            "erros": self.erros,
+            "erros_omitidos": self.erros_omitidos,
+        }
+
+
+def _validar(schema, linha, registro, relatorio):
+    """Registro validado pelo schema, ou None (com o erro no relatório)."""
+    if isinstance(registro, str):
+        relatorio.erro(linha, None, [{"campo": None, "mensagem": registro}])
+        return None
+    try:
+        return schema.model_validate(registro)
+    except ValidationError as e:
+        relatorio.erro(linha, registro.get("nome"), [
+            {"campo": ".".join(str(parte) for parte in erro["loc"]) or None, "mensagem": erro["msg"]}
+            for erro in e.errors()
+        ])
+        return None
+
+
+def _gravar_lote(session: Session, modelo, validos, conflito):
+    """Grava um lote de (linha, dados validados) e devolve (inseridos, atualizados, ignorados, conflitos).
+
+    `conflitos` são as linhas recusadas com `conflito="erro"`.
+    """
+    campos_colunas, colunas_de = _CAMPOS_COLUNAS[modelo]
+
+    # o mesmo nome repetido no lote: vale o último (os anteriores contam como atualização)
+    por_nome = {}
+    repetidos = 0
+    for linha, dados in validos:
+        repetidos += dados.nome in por_nome
+        por_nome[dados.nome] = (linha, dados)
+
+    colunas_atuais = [modelo.ID, modelo.NOME]
+    if modelo is Brinquedo:
+        colunas_atuais += [Brinquedo.CATEGORIA, Brinquedo.PRECO, Brinquedo.ESTOQUE]
+    existentes = {
+        linha.NOME: linha
+        for linha in session.execute(select(*colunas_atuais).where(modelo.NOME.in_(list(por_nome))))
+    }
+
+    novos, alterados, conflitos = [], [], []
+    estatisticas = {}  # categoria -> deltas (só brinquedos)
+
+    def somar(contribuicao):
+        deltas = estatisticas.setdefault(contribuicao.pop("categoria"), {"produtos": 0, "unidades": 0, "valor": 0.0, "em_falta": 0})
+        for chave, valor in contribuicao.items():
+            deltas[chave] += valor
+
+    for nome, (linha, dados) in por_nome.items():
+        atual = existentes.get(nome)
+        if atual is None:
+            colunas = colunas_de(dados)
+            novos.append(colunas)
+            if modelo is Brinquedo:
+                somar(_contribuicao_brinquedo(colunas["CATEGORIA"], colunas["PRECO"], colunas["ESTOQUE"]))
+            continue
+        if conflito == "ignorar":
+            continue
+        if conflito == "erro":
+            conflitos.append((linha, nome))
+            continue
+        # só os campos que vieram no registro; o resto continua como está
+        colunas = colunas_de(dados)
+        alteracao = {"ID": atual.ID, **{campos_colunas[campo]: colunas[campos_colunas[campo]] for campo in dados.model_fields_set}}
+        alterados.append(alteracao)
+        if modelo is Brinquedo:
+            somar(_contribuicao_brinquedo(atual.CATEGORIA, atual.PRECO, atual.ESTOQUE, sinal=-1))
+            somar(_contribuicao_brinquedo(
+                alteracao.get("CATEGORIA", atual.CATEGORIA), alteracao.get("PRECO", atual.PRECO),
+                alteracao.get("ESTOQUE", atual.ESTOQUE),
+            ))
+
+    if novos:
+        session.execute(insert(modelo), novos)
+    if alterados:
+        # UPDATE em lote pela chave primária (um executemany por conjunto de colunas)
+        session.execute(update(modelo), alterados)
+    ajustar_estatisticas_brinquedos_em_lote(session.connection(), estatisticas)
+
+    ignorados = len(por_nome) - len(novos) - len(alterados) - len(conflitos)
+    return len(novos), len(alterados) + repetidos, ignorados, conflitos
+
+
+async def _processar_lote(session, modelo, lote, conflito, relatorio):
+    try:
+        inseridos, atualizados, ignorados, conflitos = await session.run_sync(_gravar_lote, modelo, lote, conflito)
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        for linha, dados in lote:
+            relatorio.erro(linha, dados.nome, [{"campo": None, "mensagem": f"lote recusado pelo banco: {e}"}])
+        return
+    relatorio.inseridos += inseridos
+    relatorio.atualizados += atualizados
+    relatorio.ignorados += ignorados
+    for linha, nome in conflitos:
+        relatorio.erro(linha, nome, [{"campo": "nome", "mensagem": "nome já cadastrado"}])
+
+
+async def importar_catalogo(stream, session, modelo, schema, formato, conflito="atualizar"):
+    """Lê `stream` (bytes do corpo da requisição) e importa em lotes. Devolve o relatório (dict)."""
+    relatorio = RelatorioImportacao()
+    registros = _registros_csv(stream) if formato == "csv" else _registros_ndjson(stream)
+    lote = []
+    async for linha, registro in registros:
+        relatorio.linhas += 1
+        dados = _validar(schema, linha, registro, relatorio)
+        if dados is not None:
+            lote.append((linha, dados))
+        if len(lote) >= IMPORTACAO_LOTE:
+            await _processar_lote(session, modelo, lote, conflito, relatorio)
+            lote = []
+    if lote:
+        await _processar_lote(session, modelo, lote, conflito, relatorio)
+    return relatorio.resposta()
@@ -1,12 +1,29 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 import os
+import time
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+import diagnostico_sql
+import metricas
 
 load_dotenv()  # Carregar variáveis de ambiente do arquivo .env
 SECRET_KEY = os.getenv("SECRET_KEY")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # Fecha as conexões dos pools ao desligar (as threads do aiosqlite seguram o processo)
+    from models import db, db_async, dbs_leitura
+    await db_async.dispose()
+    for engine in dbs_leitura:
+        await engine.dispose()
+    db.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Configuração do CORS
 app.add_middleware(
@@ -15,8 +32,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # o frontend lê o ETag para mandar no If-None-Match
 )
 
+# Latência, status e requisições em andamento por rota, para o GET /metrics
+app.add_middleware(metricas.MiddlewareMetricas)
+# Contagem/tempo de SQL por requisição e alerta de N+1 (cabeçalhos X-SQL-* com SQL_DIAGNOSTICO=1)
+app.add_middleware(diagnostico_sql.MiddlewareDiagnosticoSql)
+
 # importar as rotas
 from auth_routes import auth_router
 from cliente_routes import cliente_router
@@ -25,6 +48,13 @@ from pet_routes import pet_router
 from colaborador_routes import colaborador_router
 from compra_routes import compra_router
 from brinquedo_routes import brinquedo_router
+from busca_routes import busca_router
+from vendas_routes import vendas_router
+from dependencies import COOKIE_ESCRITA, JANELA_PRIMARIO_S, estatisticas_pool
+from cache_catalogo import cache_catalogo
+from catalogo_colunar import catalogo_colunar
+from security import servico_senhas
+from models import dbs_leitura
 # incluir as rotas ao app
 app.include_router(colaborador_router)
 app.include_router(auth_router)
@@ -32,4 +62,44 @@ app.include_router(cliente_router)
 app.include_router(remedios_router)
 app.include_router(pet_router)
 app.include_router(compra_router)
-app.include_router(brinquedo_router)
\ No newline at end of file
+app.include_router(brinquedo_router)
+app.include_router(busca_router)
+app.include_router(vendas_router)
+
+
+if dbs_leitura:
+    @app.middleware("http")
+    async def marcar_escrita(request: Request, call_next):
+        """Depois de uma escrita, marca o cliente para ler do primário por JANELA_PRIMARIO_S (ver dependencies)."""
+        resposta = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and resposta.status_code < 400:
+            resposta.set_cookie(COOKIE_ESCRITA, str(time.time()), max_age=int(JANELA_PRIMARIO_S) + 1, httponly=True)
+        return resposta
+
+
+@app.get("/estatisticas/pool", tags=["Monitoramento"])
+async def estatisticas_do_pool():
+    """
+    Situação dos pools de conexão (em uso, livres, overflow) e tempo de espera por conexão
+    """
+    return {nome: estatisticas.retrato() for nome, estatisticas in estatisticas_pool.items()}
+
+
+@app.get("/estatisticas/cache", tags=["Monitoramento"])
+async def estatisticas_do_cache():
+    """
+    Cache do catálogo: itens, versões por tabela, hits/misses e despejos, e o retrato
+    colunar dos brinquedos (versão, tamanho e custo da última reconstrução)
+    """
+    return {**cache_catalogo.metricas(), "retrato_colunar": catalogo_colunar.metricas()}
+
+
+@app.get("/metrics", tags=["Monitoramento"], response_class=PlainTextResponse)
+async def metricas_prometheus():
+    """
+    Métricas no formato do Prometheus: latência/status/em andamento por rota, pool de conexões e bcrypt
+    """
+    return PlainTextResponse(
+        metricas.exportar(estatisticas_pool, servico_senhas),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,196 @@
+"""
+Métricas do processo no formato texto do Prometheus (`GET /metrics`).
+
+`MiddlewareMetricas` é um middleware ASGI puro (sem BaseHTTPMiddleware) que mede cada
+requisição HTTP por rota, usando o molde do caminho (`/brinquedos/{brinquedo_id}`),
+não a URL: histograma de latência, contagem por status e requisições em andamento.
+
+Custo por requisição: dois `perf_counter`, um `bisect` e alguns inteiros somados. Nada
+de lock: tudo roda no event loop, e entre ler e somar um contador não há `await`. As
+rotas de cada requisição só são lidas na coleta: o FastAPI grava a rota em
+`scope["route"]` ao rotear, e `/metrics` conta as requisições em andamento olhando o
+scope de cada uma.
+
+Também exporta o pool de conexões (`dependencies.estatisticas_pool`) e o tempo do
+bcrypt (`security.servico_senhas`).
+
+Os contadores são do processo: com vários workers do uvicorn, cada coleta mostra o
+worker que atendeu (o rótulo `pid` de `farmpet_processo_info` diz qual).
+"""
+import os
+import time
+from bisect import bisect_left
+
+# limites dos buckets (segundos); o último bucket (+Inf) fica implícito
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_SENHAS = (0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0, 5.0)
+
+SEM_ROTA = 'metodo="",rota="(sem rota)"'
+
+
+class Histograma:
+    """Histograma de buckets fixos: uma lista de inteiros, soma e total."""
+
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def exportar(self, nome, rotulos=""):
+        separador = "," if rotulos else ""
+        acumulado = 0
+        linhas = []
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            linhas.append(f'{nome}_bucket{{{rotulos}{separador}le="{limite}"}} {acumulado}')
+        linhas.append(f'{nome}_bucket{{{rotulos}{separador}le="+Inf"}} {self.total}')
+        chaves = f"{{{rotulos}}}" if rotulos else ""
+        linhas.append(f"{nome}_sum{chaves} {self.soma}")
+        linhas.append(f"{nome}_count{chaves} {self.total}")
+        return linhas
+
+
+class MetricasRota:
+    __slots__ = ("rotulos", "latencia", "status")
+
+    def __init__(self, rotulos):
+        self.rotulos = rotulos
+        self.latencia = Histograma(LIMITES_LATENCIA)
+        self.status = {}
+
+
+def _rotulos_rota(rota):
+    if rota is None:
+        return SEM_ROTA
+    metodos = ",".join(sorted(getattr(rota, "methods", None) or ()))
+    return f'metodo="{metodos}",rota="{rota.path}"'
+
+
+class RegistroHttp:
+    def __init__(self):
+        self.por_rota = {}  # id da rota (as rotas vivem o processo todo) -> MetricasRota
+        self.em_andamento = {}  # id(scope) -> scope
+
+    def observar(self, rota, status, duracao):
+        metricas = self.por_rota.get(id(rota))
+        if metricas is None:
+            metricas = self.por_rota[id(rota)] = MetricasRota(_rotulos_rota(rota))
+        metricas.latencia.observar(duracao)
+        metricas.status[status] = metricas.status.get(status, 0) + 1
+
+
+registro_http = RegistroHttp()
+
+
+class MiddlewareMetricas:
+    def __init__(self, app, registro=registro_http):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status = 500  # se a aplicação falhar antes de responder
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        chave = id(scope)
+        self.registro.em_andamento[chave] = scope
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            del self.registro.em_andamento[chave]
+            self.registro.observar(scope.get("route"), status, time.perf_counter() - inicio)
+
+
+def _cabecalho(nome, tipo, ajuda):
+    return [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+
+
+def exportar_http(registro=registro_http):
+    linhas = _cabecalho("farmpet_http_duracao_segundos", "histogram", "Latência das requisições HTTP por rota")
+    for metricas in registro.por_rota.values():
+        linhas += metricas.latencia.exportar("farmpet_http_duracao_segundos", metricas.rotulos)
+
+    linhas += _cabecalho("farmpet_http_respostas_total", "counter", "Respostas HTTP por rota e status")
+    for metricas in registro.por_rota.values():
+        for status, total in metricas.status.items():
+            linhas.append(f'farmpet_http_respostas_total{{{metricas.rotulos},status="{status}"}} {total}')
+
+    em_andamento = {}
+    for scope in list(registro.em_andamento.values()):
+        rotulos = _rotulos_rota(scope.get("route"))
+        em_andamento[rotulos] = em_andamento.get(rotulos, 0) + 1
+    for metricas in registro.por_rota.values():
+        em_andamento.setdefault(metricas.rotulos, 0)
+    linhas += _cabecalho("farmpet_http_em_andamento", "gauge", "Requisições HTTP em andamento por rota")
+    for rotulos, total in em_andamento.items():
+        linhas.append(f"farmpet_http_em_andamento{{{rotulos}}} {total}")
+    return linhas
+
+
+def exportar_pool(estatisticas_pool):
+    gauges = (
+        ("farmpet_db_pool_em_uso", "em_uso", "Conexões emprestadas agora"),
+        ("farmpet_db_pool_livres", "livres", "Conexões ociosas no pool"),
+        ("farmpet_db_pool_overflow", "overflow", "Conexões além do pool_size"),
+        ("farmpet_db_pool_tamanho", "tamanho", "pool_size configurado"),
+    )
+    retratos = {nome: estatisticas.retrato() for nome, estatisticas in estatisticas_pool.items()}
+    linhas = []
+    for metrica, chave, ajuda in gauges:
+        linhas += _cabecalho(metrica, "gauge", ajuda)
+        for nome, retrato in retratos.items():
+            if retrato[chave] is not None:
+                linhas.append(f'{metrica}{{engine="{nome}"}} {retrato[chave]}')
+
+    linhas += _cabecalho("farmpet_db_pool_checkouts_total", "counter", "Conexões retiradas do pool")
+    linhas += [f'farmpet_db_pool_checkouts_total{{engine="{nome}"}} {e.checkouts}' for nome, e in estatisticas_pool.items()]
+    linhas += _cabecalho("farmpet_db_pool_conexoes_abertas_total", "counter", "Conexões novas abertas no banco")
+    linhas += [f'farmpet_db_pool_conexoes_abertas_total{{engine="{nome}"}} {e.conexoes_abertas}' for nome, e in estatisticas_pool.items()]
+    linhas += _cabecalho("farmpet_db_pool_espera_segundos", "summary", "Tempo esperando uma conexão livre")
+    for nome, e in estatisticas_pool.items():
+        linhas.append(f'farmpet_db_pool_espera_segundos_sum{{engine="{nome}"}} {e.espera_total}')
+        linhas.append(f'farmpet_db_pool_espera_segundos_count{{engine="{nome}"}} {e.esperas}')
+    return linhas
+
+
+def exportar_senhas(servico):
+    metricas = servico.metricas()
+    linhas = _cabecalho("farmpet_senhas_execucao_segundos", "histogram", "Tempo de CPU de cada hash/verify do bcrypt")
+    linhas += servico.histograma_execucao.exportar("farmpet_senhas_execucao_segundos")
+    linhas += _cabecalho("farmpet_senhas_espera_segundos", "histogram", "Tempo na fila do pool de senhas")
+    linhas += servico.histograma_espera.exportar("farmpet_senhas_espera_segundos")
+    for nome, chave, tipo, ajuda in (
+        ("farmpet_senhas_em_execucao", "em_execucao", "gauge", "Hashes rodando agora"),
+        ("farmpet_senhas_na_fila", "na_fila", "gauge", "Hashes esperando um trabalhador"),
+        ("farmpet_senhas_rejeitadas_total", "rejeitadas", "counter", "Pedidos recusados com 503 (pool e fila cheios)"),
+    ):
+        linhas += _cabecalho(nome, tipo, ajuda)
+        linhas.append(f"{nome} {metricas[chave]}")
+    return linhas
+
+
+def exportar(estatisticas_pool, servico_senhas):
+    """Texto completo do /metrics."""
+    linhas = _cabecalho("farmpet_processo_info", "gauge", "Processo (worker) que respondeu a coleta")
+    linhas.append(f'farmpet_processo_info{{pid="{os.getpid()}"}} 1')
+    linhas += exportar_http()
+    linhas += exportar_pool(estatisticas_pool)
+    linhas += exportar_senhas(servico_senhas)
+    return "\n".join(linhas) + "\n"
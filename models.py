@@ -1,17 +1,113 @@
+import logging
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, Float, ForeignKey, event
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy import create_engine, Column, Integer, String, Boolean, Float, ForeignKey, Index, delete, event, inspect, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, relationship, sessionmaker
+from sqlalchemy.orm.util import identity_key
+
+logger = logging.getLogger("farmpet.models")
 
 # usar URL do .env; fallback para sqlite local
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./farmpet.db")
 
+
+def opcoes_pool(url):
+    """Configuração do pool de conexões vinda do ambiente (DB_POOL_*).
+
+    - DB_POOL_SIZE: conexões mantidas abertas (padrão 5)
+    - DB_MAX_OVERFLOW: conexões extras sob pico (padrão 10)
+    - DB_POOL_TIMEOUT: segundos esperando uma conexão livre antes de erro (padrão 30)
+    - DB_POOL_RECYCLE: segundos até reabrir uma conexão; -1 desliga (padrão -1)
+    - DB_POOL_PRE_PING: 1 testa a conexão antes de usar (padrão 1 fora do SQLite)
+    """
+    if ":memory:" in url:
+        # SQLite em memória usa um pool próprio, sem tamanho nem overflow
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", -1)),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "0" if url.startswith("sqlite") else "1") == "1",
+    }
+
+
 # engine: passar connect_args para sqlite
 if DATABASE_URL.startswith("sqlite"):
-    db = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, echo=False)
+    db = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, echo=False, **opcoes_pool(DATABASE_URL))
 else:
-    db = create_engine(DATABASE_URL, echo=False)
+    db = create_engine(DATABASE_URL, echo=False, **opcoes_pool(DATABASE_URL))
 
 SessionLocal = sessionmaker(bind=db, expire_on_commit=False)
+
+
+# Perfil de produção do SQLite, aplicado em cada conexão nova (SQLITE_PERFIL_PRODUCAO=0 desliga):
+# - WAL: leitores não bloqueiam o escritor e vice-versa (o journal padrão serializa os dois)
+# - busy_timeout: quem encontra o banco travado espera em vez de falhar com "database is locked"
+# - synchronous=NORMAL: seguro com WAL, sem fsync a cada commit
+# - mmap/cache/temp_store: leituras pela memória em vez de read() no arquivo
+SQLITE_PERFIL_PRODUCAO = os.getenv("SQLITE_PERFIL_PRODUCAO", "1") != "0"
+PRAGMAS_SQLITE = {
+    "journal_mode": "WAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # negativo = em KiB (64 MiB)
+}
+
+
+def configurar_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, valor in PRAGMAS_SQLITE.items():
+        cursor.execute(f"PRAGMA {pragma}={valor}")
+    cursor.close()
+
+
+def aplicar_perfil_sqlite(engine):
+    """Registra os PRAGMAs de produção no evento `connect` do engine (síncrono)."""
+    if ":memory:" not in str(engine.url):
+        event.listen(engine, "connect", configurar_sqlite)
+
+
+if DATABASE_URL.startswith("sqlite") and SQLITE_PERFIL_PRODUCAO:
+    aplicar_perfil_sqlite(db)
+
+
+def url_assincrona(url):
+    """Troca o driver da URL pelo equivalente assíncrono (aiosqlite / asyncpg)."""
+    esquema, separador, resto = url.partition("://")
+    if "+" in esquema:
+        return url
+    if esquema == "sqlite":
+        return f"sqlite+aiosqlite{separador}{resto}"
+    if esquema in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg{separador}{resto}"
+    return url
+
+
+# engine assíncrono usado pelas rotas (não bloqueia o event loop do uvicorn).
+# DATABASE_URL_ASYNC permite informar a URL assíncrona direto (ex.: parâmetros do asyncpg)
+DATABASE_URL_ASYNC = os.getenv("DATABASE_URL_ASYNC") or url_assincrona(DATABASE_URL)
+db_async = create_async_engine(DATABASE_URL_ASYNC, echo=False, **opcoes_pool(DATABASE_URL_ASYNC))
+if DATABASE_URL_ASYNC.startswith("sqlite") and SQLITE_PERFIL_PRODUCAO:
+    aplicar_perfil_sqlite(db_async.sync_engine)
+
+# expire_on_commit=False: depois do commit os atributos continuam acessíveis sem nova
+# consulta (carregamento implícito não é permitido com AsyncSession)
+SessionAsync = async_sessionmaker(bind=db_async, expire_on_commit=False)
+
+# Réplicas de leitura (opcional): DATABASE_URLS_LEITURA=url1,url2 (mesmo formato do DATABASE_URL).
+# As rotas GET de catálogo/listagem leem delas; escritas sempre vão para o db_async.
+URLS_LEITURA = [url.strip() for url in os.getenv("DATABASE_URLS_LEITURA", "").split(",") if url.strip()]
+dbs_leitura = []
+for _url in URLS_LEITURA:
+    _engine = create_async_engine(url_assincrona(_url), echo=False, **opcoes_pool(_url))
+    if _url.startswith("sqlite") and SQLITE_PERFIL_PRODUCAO:
+        aplicar_perfil_sqlite(_engine.sync_engine)
+    dbs_leitura.append(_engine)
+SessionsLeitura = [async_sessionmaker(bind=engine, expire_on_commit=False) for engine in dbs_leitura]
 Base = declarative_base()
 
 # Usuários
@@ -46,6 +142,11 @@ class Cliente(Base):
 
     usuario = relationship("Usuario", foreign_keys=[ID_USUARIO])
 
+    __table_args__ = (
+        # deletar_usuario busca o cliente pelo usuário
+        Index("ix_clientes_id_usuario", "ID_USUARIO"),
+    )
+
 # Colaboradores
 class Colaborador(Base):
     __tablename__ = "colaboradores"
@@ -69,6 +170,11 @@ class Pet(Base):
     ID_CLIENTE = Column(Integer, ForeignKey("clientes.ID"), nullable=True)
     cliente = relationship("Cliente", foreign_keys=[ID_CLIENTE])
 
+    __table_args__ = (
+        # cobre a checagem de pet duplicado por cliente em criar_pet (ID vem junto por ser rowid)
+        Index("ix_pets_id_cliente_nome", "ID_CLIENTE", "NOME"),
+    )
+
 # Remédios
 class Remedio(Base):
     __tablename__ = "remedios"
@@ -97,6 +203,15 @@ class Brinquedo(Base):
     ESTOQUE = Column(Integer, default=0)
     DESCRICAO = Column(String, nullable=True)
 
+    __table_args__ = (
+        # listagem por categoria, com ou sem faixa de preço
+        Index("ix_brinquedos_categoria_preco", "CATEGORIA", "PRECO"),
+        # faixa de preço sem categoria
+        Index("ix_brinquedos_preco", "PRECO"),
+        # lista de produtos em falta (ESTOQUE = 0) nas estatísticas
+        Index("ix_brinquedos_estoque", "ESTOQUE"),
+    )
+
     def __init__(self, nome, categoria, preco, estoque=0, imagem=None, descricao=None):
         self.NOME = nome
         self.CATEGORIA = categoria
@@ -105,6 +220,43 @@ class Brinquedo(Base):
         self.IMAGEM = imagem
         self.DESCRICAO = descricao
 
+# Estatísticas de brinquedos por categoria, mantidas incrementalmente pelos eventos
+# de Brinquedo (ver atualizar_estatisticas_brinquedos). Recalcular do zero com
+# `python reconstruir_estatisticas.py`.
+class BrinquedoEstatistica(Base):
+    __tablename__ = "brinquedos_estatisticas"
+    CATEGORIA = Column(String, primary_key=True)
+    TOTAL_PRODUTOS = Column(Integer, nullable=False, default=0)
+    TOTAL_UNIDADES = Column(Integer, nullable=False, default=0)
+    VALOR_ESTOQUE = Column(Float, nullable=False, default=0.0)
+    EM_FALTA = Column(Integer, nullable=False, default=0)
+
+# Resumo das vendas (transações; pedidos de vários itens ficam de fora): uma linha por
+# forma de pagamento, remédio, cliente e pet (o total geral é a soma das linhas REMEDIO).
+# Mantido pelos eventos da Session (ver registrar_vendas) e recalculado por
+# reconstruir_estatisticas.reconstruir_vendas; é a base das rotas /vendas.
+class VendaResumo(Base):
+    __tablename__ = "vendas_resumo"
+    DIMENSAO = Column(String, primary_key=True)  # FORMA_PAGAMENTO, REMEDIO, CLIENTE ou PET
+    CHAVE = Column(String, primary_key=True)  # forma de pagamento ou ID (como texto)
+    TRANSACOES = Column(Integer, nullable=False, default=0)
+    UNIDADES = Column(Integer, nullable=False, default=0)
+    RECEITA = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        Index("ix_vendas_resumo_receita", "DIMENSAO", "RECEITA"),
+        Index("ix_vendas_resumo_unidades", "DIMENSAO", "UNIDADES"),
+        Index("ix_vendas_resumo_transacoes", "DIMENSAO", "TRANSACOES"),
+    )
+
+# Versão de cada tabela do catálogo: sobe uma vez por transação que altere a tabela
+# (ver registrar_alteracao_catalogo). Gravada no banco para valer igual em todos os
+# processos e sobreviver a reinícios; é a base dos ETags das rotas de catálogo.
+class VersaoTabela(Base):
+    __tablename__ = "versoes_tabelas"
+    TABELA = Column(String, primary_key=True)
+    VERSAO = Column(Integer, nullable=False, default=0)
+
 # Transações / Compras
 class Transacao(Base):
     __tablename__ = "transacoes"
@@ -118,13 +270,20 @@ class Transacao(Base):
     VALOR_FRETE = Column(Float, default=0.0)
     FORMA_PAGAMENTO = Column(String, nullable=True)  # DINHEIRO, PIX, BOLETO, CARTAO_CREDITO, CARTAO_DEBITO
     PARCELAS = Column(Integer, nullable=True)
+    PRECO_UNITARIO = Column(Float, nullable=True)  # preço do remédio no momento da venda
     
 
     remedio = relationship("Remedio", foreign_keys=[ID_REMEDIO])
     cliente = relationship("Cliente", foreign_keys=[ID_CLIENTE])
     pet = relationship("Pet", foreign_keys=[ID_PET])
 
-    def __init__(self, id_cliente, id_remedio, id_pet, quantidade, valor_desconto=0, valor_frete=0, forma_pagamento="DINHEIRO", parcelas=None):
+    __table_args__ = (
+        Index("ix_transacoes_id_cliente", "ID_CLIENTE"),
+        Index("ix_transacoes_id_remedio", "ID_REMEDIO"),
+        Index("ix_transacoes_id_pet", "ID_PET"),
+    )
+
+    def __init__(self, id_cliente, id_remedio, id_pet, quantidade, valor_desconto=0, valor_frete=0, forma_pagamento="DINHEIRO", parcelas=None, preco_unitario=None):
         self.ID_CLIENTE = id_cliente
         self.ID_REMEDIO = id_remedio
         self.ID_PET = id_pet
@@ -133,18 +292,85 @@ class Transacao(Base):
         self.VALOR_FRETE = valor_frete
         self.FORMA_PAGAMENTO = forma_pagamento
         self.PARCELAS = parcelas
+        self.PRECO_UNITARIO = preco_unitario
 
-# Normaliza parcelas e calcula valor total antes de persistir
-@event.listens_for(Transacao, "before_insert")
-@event.listens_for(Transacao, "before_update")
-def calcular_valor_total(mapper, connection, target):
-    from sqlalchemy.orm import Session
-    session = Session(bind=connection)
-    remedio = session.get(Remedio, target.ID_REMEDIO)
-    if remedio:
-        preco_total = (remedio.PRECO or 0) * (target.QUANTIDADE or 0)
-        target.VALOR_TOTAL = preco_total - (target.VALOR_DESCONTO or 0) + (target.VALOR_FRETE or 0)
+# Pedidos: carrinho com vários itens (remédios e/ou brinquedos) gravado de uma vez
+class Pedido(Base):
+    __tablename__ = "pedidos"
+    ID = Column(Integer, primary_key=True, autoincrement=True)
+    ID_CLIENTE = Column(Integer, ForeignKey("clientes.ID"), nullable=False)
+    VALOR_DESCONTO = Column(Float, default=0.0)
+    VALOR_FRETE = Column(Float, default=0.0)
+    VALOR_TOTAL = Column(Float, nullable=True)
+    FORMA_PAGAMENTO = Column(String, nullable=True)  # DINHEIRO, PIX, BOLETO, CARTAO_CREDITO, CARTAO_DEBITO
+    PARCELAS = Column(Integer, nullable=True)
+
+    cliente = relationship("Cliente", foreign_keys=[ID_CLIENTE])
+    itens = relationship("ItemPedido", back_populates="pedido", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_pedidos_id_cliente", "ID_CLIENTE"),
+    )
+
+# Itens do pedido: cada linha aponta para um remédio OU um brinquedo
+class ItemPedido(Base):
+    __tablename__ = "itens_pedido"
+    ID = Column(Integer, primary_key=True, autoincrement=True)
+    ID_PEDIDO = Column(Integer, ForeignKey("pedidos.ID"), nullable=False)
+    ID_REMEDIO = Column(Integer, ForeignKey("remedios.ID"), nullable=True)
+    ID_BRINQUEDO = Column(Integer, ForeignKey("brinquedos.ID"), nullable=True)
+    ID_PET = Column(Integer, ForeignKey("pets.ID"), nullable=True)
+    QUANTIDADE = Column(Integer, nullable=False)
+    PRECO_UNITARIO = Column(Float, nullable=False)
+    VALOR_TOTAL = Column(Float, nullable=False)
+
+    pedido = relationship("Pedido", back_populates="itens")
 
+    __table_args__ = (
+        Index("ix_itens_pedido_id_pedido", "ID_PEDIDO"),
+    )
+
+# Grava o preço unitário das transações que vão ser inseridas (ou que trocaram de
+# remédio) antes do flush, buscando os preços de todas de uma vez
+@event.listens_for(Session, "before_flush")
+def precificar_transacoes(session, flush_context, instances):
+    pendentes = []
+    for obj in session.new:
+        if isinstance(obj, Transacao) and obj.PRECO_UNITARIO is None:
+            pendentes.append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Transacao):
+            estado = inspect(obj)
+            trocou_remedio = estado.attrs.ID_REMEDIO.history.has_changes()
+            preco_informado = estado.attrs.PRECO_UNITARIO.history.has_changes()
+            if (trocou_remedio and not preco_informado) or obj.PRECO_UNITARIO is None:
+                pendentes.append(obj)
+    if not pendentes:
+        return
+
+    # remédios já carregados na sessão não precisam de consulta
+    precos = {}
+    faltando = set()
+    for transacao in pendentes:
+        remedio = session.identity_map.get(identity_key(Remedio, transacao.ID_REMEDIO))
+        if remedio is not None:
+            precos[transacao.ID_REMEDIO] = remedio.PRECO
+        else:
+            faltando.add(transacao.ID_REMEDIO)
+    if faltando:
+        with session.no_autoflush:
+            precos.update(session.execute(
+                select(Remedio.ID, Remedio.PRECO).where(Remedio.ID.in_(faltando))
+            ).all())
+
+    for transacao in pendentes:
+        if transacao.ID_REMEDIO in precos:
+            transacao.PRECO_UNITARIO = precos[transacao.ID_REMEDIO] or 0
+
+# Parcelas só valem para cartão de crédito (mínimo 1)
+@event.listens_for(Pedido, "before_insert")
+@event.listens_for(Pedido, "before_update")
+def normalizar_parcelas(mapper, connection, target):
     forma = (target.FORMA_PAGAMENTO or "").upper() if target.FORMA_PAGAMENTO else ""
     if forma == "CARTAO_CREDITO":
         if not target.PARCELAS or target.PARCELAS < 1:
@@ -152,9 +378,343 @@ def calcular_valor_total(mapper, connection, target):
     else:
         target.PARCELAS = None
 
-    session.close()
+# Normaliza parcelas e calcula valor total antes de persistir
+@event.listens_for(Transacao, "before_insert")
+@event.listens_for(Transacao, "before_update")
+def calcular_valor_total(mapper, connection, target):
+    if target.PRECO_UNITARIO is not None:
+        preco_total = target.PRECO_UNITARIO * (target.QUANTIDADE or 0)
+        target.VALOR_TOTAL = preco_total - (target.VALOR_DESCONTO or 0) + (target.VALOR_FRETE or 0)
+
+    normalizar_parcelas(mapper, connection, target)
+
+def ajustar_estatisticas_brinquedos(connection, categoria, produtos=0, unidades=0, valor=0.0, em_falta=0):
+    """Soma os deltas na linha da categoria, criando a linha se ainda não existir.
+
+    Chamado pelos eventos de Brinquedo. Quem alterar brinquedos por UPDATE/INSERT
+    direto (Core), sem passar pelo ORM, precisa chamar esta função também.
+    """
+    _somar_nas_linhas(connection, BrinquedoEstatistica.__table__, ["CATEGORIA"], {
+        (categoria,): {"TOTAL_PRODUTOS": produtos, "TOTAL_UNIDADES": unidades, "VALOR_ESTOQUE": valor, "EM_FALTA": em_falta}
+    })
+
+
+def _insert_upsert(connection, tabela):
+    """INSERT com ON CONFLICT do dialeto da conexão (SQLite ou PostgreSQL)."""
+    dialeto = postgresql if connection.dialect.name == "postgresql" else sqlite
+    return dialeto.insert(tabela)
+
+
+def _somar_nas_linhas(connection, tabela, chaves, somas):
+    """Soma `somas` ({valores das colunas `chaves`: {coluna: delta}}) nas linhas da tabela.
+
+    Um único INSERT ... ON CONFLICT (chaves) DO UPDATE SET coluna = coluna + excluded.coluna
+    em lote (executemany): linhas que ainda não existem são criadas com os próprios deltas,
+    e duas transações criando a mesma linha ao mesmo tempo não dão chave duplicada. As
+    linhas vão em ordem de chave, então transações simultâneas travam na mesma ordem.
+    """
+    if not somas:
+        return
+    insercao = _insert_upsert(connection, tabela)
+    colunas_soma = next(iter(somas.values()))
+    insercao = insercao.on_conflict_do_update(
+        index_elements=[tabela.c[chave] for chave in chaves],
+        set_={coluna: tabela.c[coluna] + insercao.excluded[coluna] for coluna in colunas_soma},
+    )
+    connection.execute(insercao, [
+        {**dict(zip(chaves, chave_linha)), **somas[chave_linha]} for chave_linha in sorted(somas)
+    ])
+
+
+def ajustar_estatisticas_brinquedos_em_lote(connection, deltas_por_categoria):
+    """Como `ajustar_estatisticas_brinquedos`, para várias categorias de uma vez.
+
+    `deltas_por_categoria` é {categoria: {"produtos": ..., "unidades": ..., "valor": ...,
+    "em_falta": ...}} (chaves ausentes valem 0). Um único upsert em lote (executemany),
+    em vez de um comando por categoria.
+    """
+    _somar_nas_linhas(connection, BrinquedoEstatistica.__table__, ["CATEGORIA"], {
+        (categoria,): {
+            "TOTAL_PRODUTOS": deltas.get("produtos", 0),
+            "TOTAL_UNIDADES": deltas.get("unidades", 0),
+            "VALOR_ESTOQUE": deltas.get("valor", 0.0),
+            "EM_FALTA": deltas.get("em_falta", 0),
+        }
+        for categoria, deltas in deltas_por_categoria.items() if any(deltas.values())
+    })
+
+
+def _contribuicao_brinquedo(categoria, preco, estoque, sinal=1):
+    """Quanto um brinquedo soma (sinal=1) ou subtrai (sinal=-1) nas estatísticas da categoria."""
+    estoque = estoque or 0
+    return {
+        "categoria": categoria,
+        "produtos": sinal,
+        "unidades": sinal * estoque,
+        "valor": sinal * (preco or 0) * estoque,
+        "em_falta": sinal if estoque == 0 else 0,
+    }
+
+
+@event.listens_for(Brinquedo, "after_insert")
+def estatisticas_brinquedo_inserido(mapper, connection, target):
+    ajustar_estatisticas_brinquedos(
+        connection, **_contribuicao_brinquedo(target.CATEGORIA, target.PRECO, target.ESTOQUE)
+    )
+
+
+@event.listens_for(Brinquedo, "after_delete")
+def estatisticas_brinquedo_removido(mapper, connection, target):
+    ajustar_estatisticas_brinquedos(
+        connection, **_contribuicao_brinquedo(target.CATEGORIA, target.PRECO, target.ESTOQUE, sinal=-1)
+    )
+
+
+@event.listens_for(Brinquedo, "after_update")
+def estatisticas_brinquedo_atualizado(mapper, connection, target):
+    estado = inspect(target)
+
+    def anterior(atributo):
+        historico = estado.attrs[atributo].history
+        return historico.deleted[0] if historico.deleted else getattr(target, atributo)
+
+    antes = (anterior("CATEGORIA"), anterior("PRECO"), anterior("ESTOQUE"))
+    depois = (target.CATEGORIA, target.PRECO, target.ESTOQUE)
+    if antes == depois:
+        return
+
+    # tira o brinquedo como era e soma como ficou (a categoria pode ter mudado)
+    ajustar_estatisticas_brinquedos(connection, **_contribuicao_brinquedo(*antes, sinal=-1))
+    ajustar_estatisticas_brinquedos(connection, **_contribuicao_brinquedo(*depois))
+
+
+# dimensão do resumo de vendas -> atributo da transação (None fica de fora da dimensão).
+# Não há linha de total: toda transação tem remédio, então o total é a soma das linhas
+# REMEDIO, feita na leitura (uma linha de total seria atualizada por todas as compras).
+DIMENSOES_VENDAS = {"FORMA_PAGAMENTO": "FORMA_PAGAMENTO", "REMEDIO": "ID_REMEDIO", "CLIENTE": "ID_CLIENTE", "PET": "ID_PET"}
+
+# Poucas chaves (5 formas de pagamento) recebem quase todas as compras: somá-las dentro da
+# transação da compra seguraria o lock dessas linhas até o commit e enfileiraria checkouts
+# simultâneos. Essas dimensões são somadas logo depois do commit (somar_vendas_no_commit).
+DIMENSOES_APOS_COMMIT = {"FORMA_PAGAMENTO"}
+
+# deltas de dimensões pós-commit que não puderam ser gravados; vão junto no próximo commit
+_vendas_pendentes = {}
+
+
+def ajustar_resumo_vendas(connection, deltas):
+    """Soma `deltas` ({(dimensao, chave): [transacoes, unidades, receita]}) em `vendas_resumo`.
+
+    Chamado pelos eventos da Session. Quem gravar transações por Core direto precisa
+    chamar esta função também, ou recalcular tudo com `reconstruir_vendas`. Linhas que
+    ficam sem transações são apagadas (o relatório só lista quem vendeu).
+    """
+    tabela = VendaResumo.__table__
+    _somar_nas_linhas(connection, tabela, ["DIMENSAO", "CHAVE"], {
+        chave: {"TRANSACOES": transacoes, "UNIDADES": unidades, "RECEITA": receita}
+        for chave, (transacoes, unidades, receita) in deltas.items()
+        if transacoes or unidades or receita
+    })
+    perderam = [chave for chave, (transacoes, _, _) in deltas.items() if transacoes < 0]
+    if perderam:
+        connection.execute(delete(tabela).where(
+            tuple_(tabela.c.DIMENSAO, tabela.c.CHAVE).in_(perderam), tabela.c.TRANSACOES <= 0
+        ))
+
+
+def _somar_deltas(destino, origem):
+    for chave, (transacoes, unidades, receita) in origem.items():
+        soma = destino.setdefault(chave, [0, 0, 0.0])
+        soma[0] += transacoes
+        soma[1] += unidades
+        soma[2] += receita
+
+
+def _somar_venda(deltas, valores, sinal):
+    """Soma (sinal=1) ou subtrai (sinal=-1) uma transação, dada por `valores(atributo)`, nos deltas."""
+    unidades = sinal * (valores("QUANTIDADE") or 0)
+    receita = sinal * (valores("VALOR_TOTAL") or 0)
+    for dimensao, atributo in DIMENSOES_VENDAS.items():
+        valor = valores(atributo)
+        if valor is not None:
+            _somar_deltas(deltas, {(dimensao, str(valor)): (sinal, unidades, receita)})
+
+
+@event.listens_for(Session, "after_flush")
+def registrar_vendas(session, flush_context):
+    # todas as transações do flush entram de uma vez (um upsert em lote)
+    deltas = {}
+    for obj in session.new:
+        if isinstance(obj, Transacao):
+            _somar_venda(deltas, lambda atributo: getattr(obj, atributo), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Transacao):
+            _somar_venda(deltas, lambda atributo: getattr(obj, atributo), -1)
+    for obj in session.dirty:
+        if isinstance(obj, Transacao) and session.is_modified(obj):
+            estado = inspect(obj)
+
+            def anterior(atributo):
+                historico = estado.attrs[atributo].history
+                return historico.deleted[0] if historico.deleted else getattr(obj, atributo)
+
+            # tira a venda como era e soma como ficou
+            _somar_venda(deltas, anterior, -1)
+            _somar_venda(deltas, lambda atributo: getattr(obj, atributo), 1)
+    if not deltas:
+        return
+    apos_commit = {chave: deltas.pop(chave) for chave in list(deltas) if chave[0] in DIMENSOES_APOS_COMMIT}
+    if apos_commit:
+        _somar_deltas(session.info.setdefault("vendas_apos_commit", {}), apos_commit)
+        session.info.setdefault("conexao_vendas", session.connection())
+    if deltas:
+        ajustar_resumo_vendas(session.connection(), deltas)
+
+
+@event.listens_for(Session, "after_commit")
+def somar_vendas_no_commit(session):
+    """Grava as dimensões de `DIMENSOES_APOS_COMMIT` numa transação curta depois do commit.
+
+    Usa a mesma conexão da sessão (como a versão do catálogo). Se falhar, a compra já está
+    gravada: os deltas ficam em memória e vão junto no próximo commit com vendas; se o
+    processo cair antes disso, `reconstruir_estatisticas.py` acerta o resumo.
+    """
+    deltas = session.info.pop("vendas_apos_commit", None)
+    conexao = session.info.pop("conexao_vendas", None)
+    if not deltas:
+        return
+    _somar_deltas(deltas, _vendas_pendentes)
+    _vendas_pendentes.clear()
+    try:
+        if conexao is None or conexao.closed:
+            raise RuntimeError("conexão da sessão já foi fechada")
+        with conexao.begin():
+            ajustar_resumo_vendas(conexao, deltas)
+    except Exception:
+        _somar_deltas(_vendas_pendentes, deltas)
+        logger.warning("Não foi possível somar %d linhas do resumo de vendas; ficam para o próximo commit",
+                       len(deltas), exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def descartar_vendas(session):
+    session.info.pop("vendas_apos_commit", None)
+    session.info.pop("conexao_vendas", None)
+
 
 # criar tabelas (opcional: comente se usar alembic)
 # Base.metadata.create_all(bind=db)
 
 
+TABELAS_VERSIONADAS = {Brinquedo: "brinquedos", Remedio: "remedios"}
+
+
+def incrementar_versao_tabela(connection, tabela):
+    """Sobe a versão da tabela em 1, criando a linha se ainda não existir.
+
+    Chamado pelos eventos da Session. Quem alterar brinquedos/remédios por Core direto,
+    sem passar pela Session, precisa chamar esta função também.
+    """
+    versoes = VersaoTabela.__table__
+    insercao = _insert_upsert(connection, versoes).values(TABELA=tabela, VERSAO=1)
+    connection.execute(insercao.on_conflict_do_update(
+        index_elements=[versoes.c.TABELA], set_={"VERSAO": versoes.c.VERSAO + 1}
+    ))
+
+
+# Tabelas cuja versão gravada pode não bater com o conteúdo: commit feito e versão ainda
+# subindo (contagem por tabela), ou a última subida falhou (até a próxima dar certo).
+# Enquanto `versao_incerta(tabela)`, o catálogo não usa ETag, cache nem retrato colunar.
+_versoes_subindo = {}
+_versoes_com_falha = set()
+
+
+def versao_incerta(tabela):
+    return _versoes_subindo.get(tabela, 0) > 0 or tabela in _versoes_com_falha
+
+
+# funções chamadas com as tabelas do catálogo alteradas, logo depois de cada commit
+# (ex.: o cache em memória de cache_catalogo.py se invalida por aqui)
+AO_CONFIRMAR_CATALOGO = []
+
+
+def _versionar(session, tabela):
+    # só anota: o que muda no commit é tratado em subir_versoes_no_commit
+    session.info.setdefault("tabelas_versionadas", set()).add(tabela)
+    if "conexao_versionamento" not in session.info:
+        session.info["conexao_versionamento"] = session.connection()
+
+
+@event.listens_for(Session, "after_flush")
+def registrar_alteracao_catalogo(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tabela = TABELAS_VERSIONADAS.get(type(obj))
+        if tabela is not None:
+            _versionar(session, tabela)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def registrar_alteracao_em_massa(orm_execute_state):
+    # UPDATE/DELETE em massa (ex.: baixa de estoque das compras) não passam pelo flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        tabela = TABELAS_VERSIONADAS.get(mapper.class_) if mapper is not None else None
+        if tabela is not None:
+            _versionar(orm_execute_state.session, tabela)
+
+
+@event.listens_for(Session, "before_commit")
+def marcar_versoes_subindo(session):
+    # o flush do commit pode anotar mais tabelas: faz aqui para marcá-las antes do COMMIT
+    session.flush()
+    tabelas = session.info.get("tabelas_versionadas")
+    if tabelas:
+        for tabela in tabelas:
+            _versoes_subindo[tabela] = _versoes_subindo.get(tabela, 0) + 1
+        session.info["versoes_marcadas"] = set(tabelas)
+
+
+@event.listens_for(Session, "after_commit")
+def subir_versoes_no_commit(session):
+    """Avisa `AO_CONFIRMAR_CATALOGO` e sobe a versão das tabelas alteradas numa transação
+    curta, logo depois do commit.
+
+    Fora da transação da rota de propósito: a linha de `versoes_tabelas` é a mesma para
+    todas as compras, e atualizá-la dentro do checkout seguraria o lock dela até o commit,
+    enfileirando checkouts simultâneos (no PostgreSQL). Usa a mesma conexão da sessão, que
+    só é devolvida ao pool depois deste evento. Do COMMIT até a versão subir a tabela fica
+    marcada como `versao_incerta`; se a subida falhar, continua marcada até a próxima
+    alteração da tabela conseguir subir a versão.
+    """
+    tabelas = sorted(session.info.pop("tabelas_versionadas", ()))
+    conexao = session.info.pop("conexao_versionamento", None)
+    if not tabelas:
+        return
+    for avisar in AO_CONFIRMAR_CATALOGO:
+        avisar(tabelas)
+    try:
+        if conexao is None or conexao.closed:
+            raise RuntimeError("conexão da sessão já foi fechada")
+        with conexao.begin():
+            for tabela in tabelas:
+                incrementar_versao_tabela(conexao, tabela)
+    except Exception:
+        _versoes_com_falha.update(tabelas)
+        logger.warning("Não foi possível subir a versão de %s; ETag e cache desligados até a próxima alteração",
+                       tabelas, exc_info=True)
+    else:
+        _versoes_com_falha.difference_update(tabelas)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def desmarcar_versoes_subindo(session, transacao):
+    # depois do after_commit (versão já subiu) ou de um commit que falhou
+    if transacao.parent is None:
+        for tabela in session.info.pop("versoes_marcadas", ()):
+            _versoes_subindo[tabela] -= 1
+
+
+@event.listens_for(Session, "after_rollback")
+def limpar_versionamento(session):
+    session.info.pop("tabelas_versionadas", None)
+    session.info.pop("conexao_versionamento", None)
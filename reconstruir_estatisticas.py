@@ -0,0 +1,137 @@
+"""
+Recalcula do zero as estatísticas agregadas mantidas pelos eventos em `models.py`.
+
+Use para reconciliar depois de cargas feitas fora do ORM, restaurações de backup
+ou se houver suspeita de divergência.
+Execute: python reconstruir_estatisticas.py [--lote 100000]
+"""
+import argparse
+
+from sqlalchemy import String, case, cast, delete, func, insert, select, union_all
+
+from models import DIMENSOES_VENDAS, Brinquedo, BrinquedoEstatistica, Transacao, VendaResumo, db
+
+LOTE_VENDAS = 100_000
+
+
+def reconstruir_brinquedos(connection):
+    """Apaga e recalcula `brinquedos_estatisticas` com uma única agregação por categoria."""
+    estoque = func.coalesce(Brinquedo.ESTOQUE, 0)
+    agregado = select(
+        Brinquedo.CATEGORIA,
+        func.count(),
+        func.sum(estoque),
+        func.sum(Brinquedo.PRECO * estoque),
+        func.sum(case((estoque == 0, 1), else_=0)),
+    ).group_by(Brinquedo.CATEGORIA)
+
+    tabela = BrinquedoEstatistica.__table__
+    connection.execute(delete(tabela))
+    connection.execute(insert(tabela).from_select(
+        ["CATEGORIA", "TOTAL_PRODUTOS", "TOTAL_UNIDADES", "VALOR_ESTOQUE", "EM_FALTA"], agregado
+    ))
+    return connection.execute(select(func.count()).select_from(tabela)).scalar()
+
+
+def reconstruir_vendas_sql(connection):
+    """Apaga e recalcula `vendas_resumo` com uma agregação por dimensão, toda no banco.
+
+    Um único INSERT ... SELECT (GROUP BY de cada dimensão, unidos com UNION ALL): nada
+    passa pelo Python, então serve para depois de cargas grandes (seed_brinquedos.py).
+    Mesmas regras de `reconstruir_vendas`. Devolve o número de linhas do resumo.
+    """
+    unidades = func.sum(func.coalesce(Transacao.QUANTIDADE, 0))
+    receita = func.sum(func.coalesce(Transacao.VALOR_TOTAL, 0))
+    agregados = []
+    for dimensao, atributo in DIMENSOES_VENDAS.items():
+        coluna = getattr(Transacao, atributo)
+        agregados.append(
+            select(cast(dimensao, String), cast(coluna, String), func.count(), unidades, receita)
+            .where(coluna.is_not(None))
+            .group_by(coluna)
+        )
+
+    tabela = VendaResumo.__table__
+    connection.execute(delete(tabela))
+    connection.execute(insert(tabela).from_select(
+        ["DIMENSAO", "CHAVE", "TRANSACOES", "UNIDADES", "RECEITA"], union_all(*agregados)
+    ))
+    return connection.execute(select(func.count()).select_from(tabela)).scalar()
+
+
+def reconstruir_vendas(connection, lote=LOTE_VENDAS):
+    """Apaga e recalcula `vendas_resumo` lendo as transações em blocos de `lote` linhas.
+
+    Cada bloco vira um DataFrame e é agregado por dimensão com groupby (vetorizado); os
+    parciais são somados entre os blocos, então a memória depende do número de chaves
+    (clientes, remédios...), não do número de transações. Como nos eventos, só as
+    transações entram: pedidos (`pedidos`/`itens_pedido`) ficam fora do resumo. Devolve o
+    número de linhas do resumo.
+    """
+    import pandas as pd
+
+    somas = ["TRANSACOES", "QUANTIDADE", "VALOR_TOTAL"]
+    consulta = select(
+        *(getattr(Transacao, atributo) for atributo in DIMENSOES_VENDAS.values()),
+        func.coalesce(Transacao.QUANTIDADE, 0).label("QUANTIDADE"),
+        func.coalesce(Transacao.VALOR_TOTAL, 0).label("VALOR_TOTAL"),
+    )
+    leitura = connection.execution_options(stream_results=True, yield_per=lote)
+
+    parciais = {dimensao: [] for dimensao in DIMENSOES_VENDAS}
+    for bloco in pd.read_sql(consulta, leitura, chunksize=lote):
+        bloco["TRANSACOES"] = 1
+        for dimensao, atributo in DIMENSOES_VENDAS.items():
+            # chaves nulas (ex.: venda sem pet) ficam fora da dimensão, como nos eventos
+            parciais[dimensao].append(bloco[somas].groupby(bloco[atributo]).sum())
+
+    resumos = []
+    for dimensao, partes in parciais.items():
+        if not partes:
+            continue
+        agregado = pd.concat(partes).groupby(level=0).sum()
+        chaves = agregado.index
+        if chaves.dtype.kind in "fi":
+            # IDs com nulos chegam como float; a chave é o inteiro em texto (como no evento)
+            chaves = chaves.astype("int64")
+        agregado.index = chaves.astype(str)
+        resumos.append(agregado.assign(DIMENSAO=dimensao))
+    tabela = VendaResumo.__table__
+    connection.execute(delete(tabela))
+    if not resumos:
+        return 0
+
+    resumo = pd.concat(resumos).rename_axis("CHAVE").reset_index().sort_values(["DIMENSAO", "CHAVE"])
+    linhas = list(zip(
+        resumo["DIMENSAO"].tolist(), resumo["CHAVE"].tolist(), resumo["TRANSACOES"].astype("int64").tolist(),
+        resumo["QUANTIDADE"].astype("int64").tolist(), resumo["VALOR_TOTAL"].astype(float).tolist(),
+    ))
+    colunas = ["DIMENSAO", "CHAVE", "TRANSACOES", "UNIDADES", "RECEITA"]
+    if connection.dialect.positional:
+        # tuplas direto no executemany do driver: um dict por linha no Core custa mais que o INSERT
+        compilado = insert(tabela).compile(dialect=connection.dialect, column_keys=colunas)
+        ordem = [colunas.index(nome) for nome in compilado.positiontup]
+        if ordem != list(range(len(colunas))):
+            linhas = [tuple(linha[i] for i in ordem) for linha in linhas]
+        for inicio in range(0, len(linhas), lote):
+            connection.exec_driver_sql(str(compilado), linhas[inicio:inicio + lote])
+    else:
+        for inicio in range(0, len(linhas), lote):
+            connection.execute(insert(tabela), [dict(zip(colunas, linha)) for linha in linhas[inicio:inicio + lote]])
+    return len(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula as estatísticas de brinquedos e o resumo de vendas.")
+    parser.add_argument("--lote", type=int, default=LOTE_VENDAS, help="Transações lidas por bloco no resumo de vendas")
+    args = parser.parse_args()
+
+    with db.begin() as con:
+        categorias = reconstruir_brinquedos(con)
+        resumo = reconstruir_vendas(con, args.lote)
+    print(f"Estatísticas de brinquedos recalculadas ({categorias} categorias).")
+    print(f"Resumo de vendas recalculado ({resumo} linhas).")
+
+
+if __name__ == "__main__":
+    main()
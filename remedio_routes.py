@@ -1,30 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
-from models import Remedio, db
-from dependencies import pegar_sessao
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from models import Remedio
+from dependencies import pegar_sessao_async, pegar_sessao_leitura
 from security import bcrypt_context
-from schemas import RemedioSchema
-from sqlalchemy.orm import Session
+from schemas import AjusteEstoqueLote, ConflitoImportacao, RemedioSchema
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import pandas as pd
+from typing import Literal
+from serializador import FormatoLista, corpo_lista
+from cache_catalogo import resposta_catalogo
+from importacao_catalogo import CORPO_OPENAPI, importar_catalogo
+from estoque import ajustar_estoque_em_lote
 
 remedios_router = APIRouter(prefix="/remedios", tags=["Remedios"])
 
 @remedios_router.get("/")
-async def listar_remedios():
-    conn = db.connect()
-    with conn as con:
-        query = select(Remedio)
-        result = pd.read_sql(query, con)
-        result = result.to_dict(orient='records')
-
+async def listar_remedios(request: Request, formato: FormatoLista = Query("registros", description="registros ou colunar"), session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
-    Essa é a rota para listar todos os remédios
+    Essa é a rota para listar todos os remédios (servida do cache do catálogo enquanto não mudar,
+    com ETag: If-None-Match devolve 304 se a lista for a mesma)
     """
-    return {"mensagem": "Lista de remédios acessada com sucesso!", "data": result}
+    return await resposta_catalogo(
+        request, session, "remedios", ("lista", formato),
+        lambda: corpo_lista(session, "Lista de remédios acessada com sucesso!", select(Remedio), formato),
+    )
 
 @remedios_router.post("/Cadastrar_remedio", status_code=201)
-async def criar_remedio(remedio: RemedioSchema, session: Session = Depends(pegar_sessao)):
-    existente = session.query(Remedio).filter(Remedio.NOME == remedio.nome).first()
+async def criar_remedio(remedio: RemedioSchema, session: AsyncSession = Depends(pegar_sessao_async)):
+    existente = await session.scalar(select(Remedio).where(Remedio.NOME == remedio.nome))
     if existente:
         raise HTTPException(status_code=400, detail="Remédio já cadastrado no sistema, seguir a atualização de estoque")
     try:
@@ -32,26 +34,70 @@ async def criar_remedio(remedio: RemedioSchema, session: Session = Depends(pegar
         receita_val = str(remedio.receita) if remedio.receita is not None else None
         novo_remedio = Remedio(remedio.nome, remedio.descricao, remedio.preco, remedio.estoque, receita_val)
         session.add(novo_remedio)
-        session.commit()
-        session.refresh(novo_remedio)  # Garante que ID está disponível
+        await session.commit()
+        await session.refresh(novo_remedio)  # Garante que ID está disponível
         return {"mensagem": f"Remédio cadastrado com sucesso: {novo_remedio.NOME}", "id": novo_remedio.ID}
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@remedios_router.post("/importar", openapi_extra=CORPO_OPENAPI)
+async def importar_remedios(
+    request: Request,
+    formato: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson ou csv"),
+    conflito: ConflitoImportacao = Query("atualizar", description="nome já cadastrado: atualizar, ignorar ou erro"),
+    session: AsyncSession = Depends(pegar_sessao_async),
+):
+    """
+    Cadastra/atualiza vários remédios de uma vez a partir de um arquivo CSV ou NDJSON
+    enviado no corpo (campos do cadastro: nome, descricao, preco, estoque, receita).
+    Responde com as contagens e os erros de cada linha (ver importacao_catalogo)
+    """
+    return await importar_catalogo(request.stream(), session, Remedio, RemedioSchema, formato, conflito)
+
+
+@remedios_router.patch("/estoque")
+async def ajustar_estoque_remedios(lote: AjusteEstoqueLote, session: AsyncSession = Depends(pegar_sessao_async)):
+    """
+    Ajusta o estoque de vários remédios numa única transação: cada item leva o `id` e
+    `quantidade` (novo estoque) ou `delta` (quanto somar; negativo tira). Um único UPDATE;
+    se algum ID não existir ou algum estoque ficar negativo, nada é gravado.
+    Responde com o estoque anterior e o atual de cada item.
+    """
+    ajustes = [(item.id, item.quantidade, item.delta) for item in lote.itens]
+    try:
+        itens = await ajustar_estoque_em_lote(session, Remedio, ajustes)
+        faltando = {produto_id for produto_id, _, _ in ajustes} - {item["id"] for item in itens}
+        if faltando:
+            await session.rollback()
+            raise HTTPException(status_code=404, detail=f"Remédio não encontrado: {sorted(faltando)}")
+        negativos = [item["id"] for item in itens if item["estoque_atual"] < 0]
+        if negativos:
+            await session.rollback()
+            raise HTTPException(status_code=400, detail=f"Estoque ficaria negativo para os remédios {negativos}")
+        await session.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {"mensagem": "Estoque atualizado com sucesso", "itens": itens}
+
+
 @remedios_router.put("/atualizar_remedio/{remedio_id}")
-async def atualizar_remedio(remedio_id: int, remedio: RemedioSchema, session: Session = Depends(pegar_sessao)):
+async def atualizar_remedio(remedio_id: int, remedio: RemedioSchema, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Atualiza os dados de um remédio existente
     """
-    remedio_existente = session.query(Remedio).filter(Remedio.ID == remedio_id).first()
+    remedio_existente = await session.scalar(select(Remedio).where(Remedio.ID == remedio_id))
     if not remedio_existente:
         raise HTTPException(status_code=404, detail="Remédio não encontrado")
     
     # Verifica se o nome já está sendo usado por outro remédio
     if remedio.nome != remedio_existente.NOME:
-        nome_existe = session.query(Remedio).filter(Remedio.NOME == remedio.nome).first()
+        nome_existe = await session.scalar(select(Remedio).where(Remedio.NOME == remedio.nome))
         if nome_existe:
             raise HTTPException(status_code=400, detail="Nome do remédio já está sendo usado")
     
@@ -62,27 +108,27 @@ async def atualizar_remedio(remedio_id: int, remedio: RemedioSchema, session: Se
         remedio_existente.ESTOQUE = remedio.estoque
         remedio_existente.RECEITA = str(remedio.receita) if remedio.receita is not None else None
         
-        session.commit()
-        session.refresh(remedio_existente)
+        await session.commit()
+        await session.refresh(remedio_existente)
         return {"mensagem": "Remédio atualizado com sucesso", "id": remedio_existente.ID}
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar remédio: {str(e)}")
 
 
 @remedios_router.delete("/deletar_remedio/{remedio_id}")
-async def deletar_remedio(remedio_id: int, session: Session = Depends(pegar_sessao)):
+async def deletar_remedio(remedio_id: int, session: AsyncSession = Depends(pegar_sessao_async)):
     """
     Deleta um remédio do sistema
     """
-    remedio = session.query(Remedio).filter(Remedio.ID == remedio_id).first()
+    remedio = await session.scalar(select(Remedio).where(Remedio.ID == remedio_id))
     if not remedio:
         raise HTTPException(status_code=404, detail="Remédio não encontrado")
     
     try:
-        session.delete(remedio)
-        session.commit()
+        await session.delete(remedio)
+        await session.commit()
         return {"mensagem": "Remédio deletado com sucesso", "id": remedio_id}
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao deletar remédio: {str(e)}")
\ No newline at end of file
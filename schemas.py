@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Literal, Optional
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from typing import List, Literal, Optional
 
 PaymentMethod = Literal["DINHEIRO", "PIX", "BOLETO", "CARTAO_CREDITO", "CARTAO_DEBITO"]
 
@@ -175,7 +175,81 @@ class CompraCreate(BaseModel):
     )
 
 
+TipoProduto = Literal["REMEDIO", "BRINQUEDO"]
+
+
+class ItemPedidoSchema(BaseModel):
+    tipo: TipoProduto = Field(..., example="REMEDIO")
+    id_produto: int = Field(..., example=1)
+    quantidade: int = Field(..., example=2, gt=0)
+    id_pet: Optional[int] = Field(None, example=1)
+
+
+class PedidoCreate(BaseModel):
+    id_cliente: int = Field(..., example=1)
+    itens: List[ItemPedidoSchema] = Field(..., min_length=1)
+    valor_desconto: Optional[float] = Field(0.0, example=0.0)
+    valor_frete: Optional[float] = Field(0.0, example=10.0)
+    forma_pagamento: PaymentMethod = Field(..., example="PIX")
+    parcelas: Optional[int] = Field(None, example=1, description="Usado somente quando forma_pagamento == CARTAO_CREDITO")
+
+    model_config = ConfigDict(
+        json_schema_extra = {
+            "example": {
+                "id_cliente": 1,
+                "itens": [
+                    {"tipo": "REMEDIO", "id_produto": 1, "quantidade": 2, "id_pet": 1},
+                    {"tipo": "BRINQUEDO", "id_produto": 3, "quantidade": 1, "id_pet": None}
+                ],
+                "valor_desconto": 0.0,
+                "valor_frete": 10.0,
+                "forma_pagamento": "PIX",
+                "parcelas": None
+            }
+        }
+    )
+
+
 CategoriaBrinquedo = Literal["Pelúcia", "Bola", "Interativo", "Mordedor"]
+OrdenacaoBrinquedos = Literal["id", "preco", "-preco", "estoque", "-estoque"]
+ConflitoImportacao = Literal["atualizar", "ignorar", "erro"]
+DimensaoVendas = Literal["forma_pagamento", "remedio", "cliente", "pet"]
+OrdenacaoVendas = Literal["receita", "unidades", "transacoes"]
+
+
+class AjusteEstoqueSchema(BaseModel):
+    id: int = Field(..., example=1)
+    quantidade: Optional[int] = Field(None, ge=0, example=50, description="Novo estoque (valor absoluto)")
+    delta: Optional[int] = Field(None, example=-3, description="Quanto somar ao estoque atual (negativo tira)")
+
+    @model_validator(mode="after")
+    def _quantidade_ou_delta(self):
+        if (self.quantidade is None) == (self.delta is None):
+            raise ValueError("informe quantidade ou delta (um dos dois)")
+        return self
+
+
+class AjusteEstoqueLote(BaseModel):
+    itens: List[AjusteEstoqueSchema] = Field(..., min_length=1, max_length=1000)
+
+    @model_validator(mode="after")
+    def _ids_sem_repeticao(self):
+        ids = [item.id for item in self.itens]
+        if len(set(ids)) != len(ids):
+            raise ValueError("cada ID só pode aparecer uma vez no lote")
+        return self
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "itens": [
+                    {"id": 1, "delta": 24},
+                    {"id": 2, "quantidade": 0},
+                    {"id": 3, "delta": -2}
+                ]
+            }
+        }
+    )
 
 
 class EnderecoUpdateSchema(BaseModel):
@@ -1,4 +1,135 @@
-from passlib.context import CryptContext
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Contexto compartilhado para hashing de senhas
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from fastapi import HTTPException
+
+from metricas import LIMITES_SENHAS, Histograma
+
+# Com IMPORTACAO_TARDIA=1 (padrão) o passlib/bcrypt só é importado no primeiro
+# hash/verify, para não pesar no cold start. Use IMPORTACAO_TARDIA=0 para carregar tudo
+# já na inicialização (o primeiro login não paga a importação).
+IMPORTACAO_TARDIA = os.getenv("IMPORTACAO_TARDIA", "1") != "0"
+
+
+class ContextoSenhas:
+    """Cria o CryptContext do passlib sob demanda e repassa hash/verify para ele."""
+
+    def __init__(self, **config):
+        self._config = config
+        self._contexto = None
+
+    def carregar(self):
+        if self._contexto is None:
+            from passlib.context import CryptContext
+            self._contexto = CryptContext(**self._config)
+        return self._contexto
+
+    def hash(self, senha):
+        return self.carregar().hash(senha)
+
+    def verify(self, senha, senha_hash):
+        return self.carregar().verify(senha, senha_hash)
+
+
+class ServicoSenhas:
+    """Roda hash/verify do bcrypt em um pool de threads limitado, fora do event loop.
+
+    Cada hash custa ~100 ms de CPU; chamado direto numa rota `async def` ele trava todas
+    as outras requisições. Aqui no máximo `trabalhadores` rodam ao mesmo tempo e no
+    máximo `fila_maxima` esperam; acima disso a chamada falha na hora com 503 e
+    `Retry-After`, em vez de acumular logins atrás do pool.
+
+    Os contadores só são alterados no event loop, então não precisam de lock.
+    """
+
+    def __init__(self, contexto, trabalhadores, fila_maxima):
+        self._contexto = contexto
+        self.trabalhadores = trabalhadores
+        self.fila_maxima = fila_maxima
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="senhas")
+        self._pendentes = 0
+        self._pico_pendentes = 0
+        self._total = 0
+        self._rejeitadas = 0
+        self._espera_total = 0.0
+        self._execucao_total = 0.0
+        self._execucao_max = 0.0
+        self.histograma_espera = Histograma(LIMITES_SENHAS)
+        self.histograma_execucao = Histograma(LIMITES_SENHAS)
+
+    async def hash(self, senha):
+        return await self._executar(self._contexto.hash, senha)
+
+    async def verify(self, senha, senha_hash):
+        return await self._executar(self._contexto.verify, senha, senha_hash)
+
+    async def _executar(self, funcao, *args):
+        if self._pendentes >= self.trabalhadores + self.fila_maxima:
+            self._rejeitadas += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Serviço de senhas ocupado, tente novamente em instantes",
+                headers={"Retry-After": "1"},
+            )
+
+        enviado = time.perf_counter()
+
+        def tarefa():
+            inicio = time.perf_counter()
+            resultado = funcao(*args)
+            return resultado, inicio - enviado, time.perf_counter() - inicio
+
+        self._pendentes += 1
+        self._pico_pendentes = max(self._pico_pendentes, self._pendentes)
+        futuro = asyncio.get_running_loop().run_in_executor(self._executor, tarefa)
+        # a vaga só é liberada quando o hash termina: se quem esperava for cancelado
+        # (cliente desconectou), o bcrypt continua rodando no pool e segue contando
+        futuro.add_done_callback(self._concluir)
+        resultado, _, _ = await asyncio.shield(futuro)
+        return resultado
+
+    def _concluir(self, futuro):
+        # chamado no event loop, como o resto dos contadores
+        self._pendentes -= 1
+        if futuro.cancelled() or futuro.exception() is not None:
+            return
+        _, espera, execucao = futuro.result()
+        self._total += 1
+        self._espera_total += espera
+        self._execucao_total += execucao
+        self._execucao_max = max(self._execucao_max, execucao)
+        self.histograma_espera.observar(espera)
+        self.histograma_execucao.observar(execucao)
+
+    def metricas(self):
+        """Retrato atual da fila e dos tempos (em ms) desde que o processo subiu."""
+        concluidas = self._total or 1
+        return {
+            "trabalhadores": self.trabalhadores,
+            "fila_maxima": self.fila_maxima,
+            "em_execucao": min(self._pendentes, self.trabalhadores),
+            "na_fila": max(0, self._pendentes - self.trabalhadores),
+            "pico_pendentes": self._pico_pendentes,
+            "concluidas": self._total,
+            "rejeitadas": self._rejeitadas,
+            "espera_media_ms": round(self._espera_total / concluidas * 1000, 2),
+            "execucao_media_ms": round(self._execucao_total / concluidas * 1000, 2),
+            "execucao_max_ms": round(self._execucao_max * 1000, 2),
+        }
+
+
+# Contexto compartilhado para hashing de senhas (uso síncrono: scripts e testes)
+bcrypt_context = ContextoSenhas(schemes=["bcrypt"], deprecated="auto")
+
+if not IMPORTACAO_TARDIA:
+    bcrypt_context.carregar()
+
+# Usado pelas rotas. SENHAS_TRABALHADORES: hashes simultâneos (padrão: até 4 núcleos);
+# SENHAS_FILA_MAX: quantos podem esperar antes de responder 503
+servico_senhas = ServicoSenhas(
+    bcrypt_context,
+    trabalhadores=int(os.getenv("SENHAS_TRABALHADORES", min(4, os.cpu_count() or 1))),
+    fila_maxima=int(os.getenv("SENHAS_FILA_MAX", 32)),
+)
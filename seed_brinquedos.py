@@ -1,8 +1,21 @@
 """
 Script para popular o banco de dados com brinquedos de exemplo
 Execute: python seed_brinquedos.py
+
+Também gera dados sintéticos em volume, para testes de desempenho, em todas as tabelas
+(usuários, clientes, colaboradores, pets, remédios, brinquedos e transações):
+         python seed_brinquedos.py --gerar --linhas 1000000 [--semente 42] [--pets 1500000] ...
+Ver `gerar_dados`.
 """
-from models import SessionLocal, Brinquedo
+import argparse
+import time
+from contextlib import nullcontext
+
+from sqlalchemy import func, insert, select
+
+from busca import carga_em_massa
+from models import (SessionLocal, Brinquedo, Cliente, Colaborador, Pet, Remedio, Transacao, Usuario,
+                    db, incrementar_versao_tabela)
 
 def seed_brinquedos():
     session = SessionLocal()
@@ -126,6 +139,386 @@ def seed_brinquedos():
         session.close()
 
 
+# ---------------------------------------------------------------- dados em volume
+
+LOTE_PADRAO = 50_000
+SENHA_GERADA = "farmpet123"  # senha de todos os usuários gerados (um hash só, o bcrypt é caro)
+
+_PRIMEIROS_NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela",
+                    "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago",
+                    "Vitória", "Lucas", "Mariana", "Pedro", "Juliana", "Gustavo", "Camila", "Rodrigo"]
+_SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima",
+               "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Barbosa"]
+_RUAS = ["Rua das Flores", "Avenida Brasil", "Rua São João", "Rua XV de Novembro", "Avenida Paulista",
+         "Rua Sete de Setembro", "Rua do Comércio", "Avenida Getúlio Vargas", "Rua Santa Luzia", "Rua da Paz"]
+_BAIRROS = ["Centro", "Jardim América", "Vila Nova", "Boa Vista", "Floresta", "Santa Cruz", "Industrial",
+            "Bela Vista", "São José", "Jardim das Acácias", "Parque das Nações", "Alto da Serra"]
+_DDDS = [11, 21, 31, 41, 47, 48, 51, 61, 71, 81, 85, 91]
+_NOMES_PETS = ["Rex", "Thor", "Mel", "Luna", "Bob", "Nina", "Pipoca", "Fred", "Amora", "Simba", "Bidu",
+               "Lola", "Toby", "Belinha", "Max", "Paçoca", "Frida", "Zeus", "Mia", "Bolinha"]
+_CARGOS = (["Atendente", "Estoquista", "Entregador", "Veterinário"], [0.45, 0.2, 0.2, 0.15])
+
+# categoria -> tipos de produto usados no nome
+_TIPOS_BRINQUEDO = {
+    "Pelúcia": ["Urso de Pelúcia", "Pelúcia Patinho", "Coelho de Pelúcia", "Pelúcia Dinossauro", "Pelúcia Polvo"],
+    "Bola": ["Bola de Tênis", "Bola Colorida", "Bola com Luz LED", "Bola Cravo", "Bola de Borracha"],
+    "Interativo": ["Puzzle Interativo", "Corda Interativa", "Dispenser de Petisco", "Labirinto", "Varinha com Penas"],
+    "Mordedor": ["Osso de Nylon", "Mordedor de Borracha", "Mordedor de Corda", "Anel Mordedor", "Osso Dental"],
+}
+_CATEGORIAS = list(_TIPOS_BRINQUEDO)
+_PESOS_CATEGORIAS = [0.25, 0.35, 0.15, 0.25]  # participação de cada categoria no catálogo
+_ADJETIVOS = ["Resistente", "Macio", "Colorido", "Grande", "Pequeno", "Premium", "Sonoro", "Flutuante"]
+_PUBLICOS = ["cães de pequeno porte", "cães de grande porte", "filhotes", "gatos", "cães que adoram roer"]
+
+_PRINCIPIOS = ["Amoxicilina", "Meloxicam", "Ivermectina", "Prednisolona", "Dipirona", "Cefalexina",
+               "Fipronil", "Praziquantel", "Omeprazol", "Tramadol", "Doxiciclina", "Carprofeno"]
+_DOSES = [5, 10, 20, 25, 50, 100, 200, 250, 500]
+_FORMAS = ["Comprimido", "Suspensão oral", "Pipeta", "Pomada", "Injetável", "Spray"]
+_ESPECIES = ["cães", "gatos", "cães e gatos"]
+
+_FORMAS_PAGAMENTO = (["PIX", "CARTAO_CREDITO", "CARTAO_DEBITO", "DINHEIRO", "BOLETO"], [0.4, 0.25, 0.15, 0.1, 0.1])
+_PARCELAS = [0.30, 0.15, 0.20, 0.08, 0.05, 0.08, 0.02, 0.02, 0.02, 0.06, 0.01, 0.01]  # 1x a 12x
+_QUANTIDADES = [0.7, 0.18, 0.07, 0.03, 0.02]  # 1 a 5 unidades
+_FRETES = [8.9, 12.9, 15.9, 19.9, 24.9]
+
+# código de cada tabela na semente dos lotes (o mesmo lote de tabelas diferentes não repete sorteios)
+_CODIGOS = {"usuarios": 1, "clientes": 2, "colaboradores": 3, "pets": 4, "remedios": 5, "brinquedos": 6, "transacoes": 7}
+
+
+def _cpfs(bases):
+    """CPFs válidos (só dígitos) a partir de números de 9 dígitos, com os verificadores calculados em lote."""
+    import numpy as np
+
+    digitos = bases[:, None] // 10 ** np.arange(8, -1, -1) % 10
+    dv1 = digitos @ np.arange(10, 1, -1) * 10 % 11 % 10
+    dv2 = (digitos @ np.arange(11, 2, -1) + dv1 * 2) * 10 % 11 % 10
+    return [f"{numero:011d}" for numero in (bases * 100 + dv1 * 10 + dv2).tolist()]
+
+
+def _telefones(rng, tamanho):
+    numeros = rng.choice(_DDDS, tamanho) * 1_000_000_000 + 900_000_000 + rng.integers(0, 100_000_000, tamanho)
+    return [str(numero) for numero in numeros.tolist()]
+
+
+def _nomes_pessoas(rng, tamanho):
+    primeiros = rng.integers(0, len(_PRIMEIROS_NOMES), tamanho).tolist()
+    sobrenomes = rng.integers(0, len(_SOBRENOMES), (tamanho, 2)).tolist()
+    return [(_PRIMEIROS_NOMES[p], _SOBRENOMES[a], _SOBRENOMES[b]) for p, (a, b) in zip(primeiros, sobrenomes)]
+
+
+def _precos(rng, tamanho, mediana, dispersao, minimo, maximo):
+    """Preços log-normais (muitos baratos, poucos caros) terminados em ,90."""
+    import numpy as np
+
+    return (np.floor(np.clip(rng.lognormal(np.log(mediana), dispersao, tamanho), minimo, maximo)) + 0.9).round(2)
+
+
+def _estoques(rng, tamanho, media, em_falta):
+    """Estoque com cauda longa (geométrica) e uma fração `em_falta` zerada."""
+    import numpy as np
+
+    return np.where(rng.random(tamanho) < em_falta, 0, rng.geometric(1 / media, tamanho))
+
+
+# Cada gerador recebe o sorteador do lote, a faixa de linhas [inicio, fim) e o contexto
+# (ver _contexto) e devolve uma tupla por linha, na ordem de _COLUNAS[tabela].
+
+_COLUNAS = {
+    "usuarios": ("NOME", "EMAIL", "SENHA", "ATIVO", "ADMIN"),
+    "clientes": ("NOME", "ID_USUARIO", "RUA", "NUMERO", "BAIRRO", "COMPLEMENTO", "CPF", "TELEFONE"),
+    "colaboradores": ("NOME", "CPF", "TELEFONE", "CARGO"),
+    "pets": ("NOME", "ID_CLIENTE"),
+    "remedios": ("NOME", "DESCRICAO", "PRECO", "ESTOQUE", "RECEITA"),
+    "brinquedos": ("NOME", "CATEGORIA", "PRECO", "IMAGEM", "ESTOQUE", "DESCRICAO"),
+    "transacoes": ("ID_CLIENTE", "ID_REMEDIO", "ID_PET", "QUANTIDADE", "VALOR_DESCONTO", "VALOR_TOTAL",
+                   "VALOR_FRETE", "FORMA_PAGAMENTO", "PARCELAS", "PRECO_UNITARIO"),
+}
+
+
+def _gerar_usuarios(rng, inicio, fim, contexto):
+    tamanho = fim - inicio
+    ativos = (rng.random(tamanho) < 0.97).tolist()
+    admins = (rng.random(tamanho) < 0.005).tolist()
+    return [
+        (f"{primeiro} {sobrenome}", f"{primeiro}.{sobrenome}.{i}@exemplo.com.br".lower(), contexto["hash_senha"], ativo, admin)
+        for i, (primeiro, sobrenome, _), ativo, admin in zip(range(inicio, fim), _nomes_pessoas(rng, tamanho), ativos, admins)
+    ]
+
+
+def _gerar_clientes(rng, inicio, fim, contexto):
+    import numpy as np
+
+    tamanho = fim - inicio
+    ids_usuarios = contexto["ids_usuarios"]
+    # o cliente i fica com o usuário i (85% dos que têm um correspondente): quase todo cliente tem conta
+    posicoes = np.arange(inicio, fim)
+    com_conta = (posicoes < len(ids_usuarios)) & (rng.random(tamanho) < 0.85)
+    usuarios = [int(ids_usuarios[p]) if conta else None for p, conta in zip(posicoes.tolist(), com_conta.tolist())]
+    ruas = rng.integers(0, len(_RUAS), tamanho).tolist()
+    numeros = rng.integers(1, 3000, tamanho).tolist()
+    bairros = rng.integers(0, len(_BAIRROS), tamanho).tolist()
+    aptos = rng.integers(-200, 300, tamanho).tolist()  # negativo: sem complemento
+    return [
+        (f"{primeiro} {sobrenome1} {sobrenome2}", usuario, _RUAS[rua], str(numero), _BAIRROS[bairro],
+         f"Apto {apto}" if apto > 0 else None, cpf, telefone)
+        for (primeiro, sobrenome1, sobrenome2), usuario, rua, numero, bairro, apto, cpf, telefone in zip(
+            _nomes_pessoas(rng, tamanho), usuarios, ruas, numeros, bairros, aptos,
+            _cpfs(100_000_000 + posicoes), _telefones(rng, tamanho))
+    ]
+
+
+def _gerar_colaboradores(rng, inicio, fim, contexto):
+    import numpy as np
+
+    tamanho = fim - inicio
+    nomes, pesos = _CARGOS
+    cargos = rng.choice(len(nomes), tamanho, p=pesos).tolist()
+    return [
+        (f"{primeiro} {sobrenome}", cpf, telefone, nomes[cargo])
+        for (primeiro, sobrenome, _), cpf, telefone, cargo in zip(
+            # CPFs numa faixa separada da dos clientes
+            _nomes_pessoas(rng, tamanho), _cpfs(900_000_000 + np.arange(inicio, fim)), _telefones(rng, tamanho), cargos)
+    ]
+
+
+def _gerar_pets(rng, inicio, fim, contexto):
+    tamanho = fim - inicio
+    ids_clientes = contexto["ids_clientes"]
+    # dono sorteado entre todos os clientes: a maioria tem 1 ou 2 pets, alguns nenhum, poucos vários
+    donos = ids_clientes[rng.integers(0, len(ids_clientes), tamanho)].tolist() if len(ids_clientes) else [None] * tamanho
+    nomes = rng.integers(0, len(_NOMES_PETS), tamanho).tolist()
+    return [(_NOMES_PETS[nome], dono) for nome, dono in zip(nomes, donos)]
+
+
+def _gerar_remedios(rng, inicio, fim, contexto):
+    tamanho = fim - inicio
+    principios = rng.integers(0, len(_PRINCIPIOS), tamanho).tolist()
+    doses = rng.integers(0, len(_DOSES), tamanho).tolist()
+    formas = rng.integers(0, len(_FORMAS), tamanho).tolist()
+    especies = rng.integers(0, len(_ESPECIES), tamanho).tolist()
+    receitas = (rng.random(tamanho) < 0.3).tolist()
+    precos = _precos(rng, tamanho, 45, 0.7, 3, 900).tolist()
+    estoques = _estoques(rng, tamanho, 60, 0.05).tolist()
+    return [
+        (f"{_PRINCIPIOS[principio]} {_DOSES[dose]}mg {i}", f"{_FORMAS[forma]} para {_ESPECIES[especie]}",
+         preco, estoque, str(receita))
+        for i, principio, dose, forma, especie, receita, preco, estoque in zip(
+            range(inicio, fim), principios, doses, formas, especies, receitas, precos, estoques)
+    ]
+
+
+def _gerar_brinquedos(rng, inicio, fim, contexto):
+    tamanho = fim - inicio
+    categorias = rng.choice(len(_CATEGORIAS), tamanho, p=_PESOS_CATEGORIAS).tolist()
+    tipos = rng.integers(0, 5, tamanho).tolist()
+    adjetivos = rng.integers(0, len(_ADJETIVOS), tamanho).tolist()
+    publicos = rng.integers(0, len(_PUBLICOS), tamanho).tolist()
+    precos = _precos(rng, tamanho, 35, 0.6, 5, 400).tolist()
+    estoques = _estoques(rng, tamanho, 30, 0.08).tolist()
+    linhas = []
+    for i, categoria, tipo, adjetivo, publico, preco, estoque in zip(
+            range(inicio, fim), categorias, tipos, adjetivos, publicos, precos, estoques):
+        nome_categoria = _CATEGORIAS[categoria]
+        produto = _TIPOS_BRINQUEDO[nome_categoria][tipo]
+        linhas.append((
+            f"{produto} {_ADJETIVOS[adjetivo]} {i}", nome_categoria, preco, f"/imagens/brinquedo-{i}.png", estoque,
+            f"{produto} {_ADJETIVOS[adjetivo].lower()} para {_PUBLICOS[publico]}",
+        ))
+    return linhas
+
+
+def _gerar_transacoes(rng, inicio, fim, contexto):
+    import numpy as np
+
+    tamanho = fim - inicio
+    ids_clientes, ids_remedios, precos_remedios = contexto["ids_clientes"], contexto["ids_remedios"], contexto["precos_remedios"]
+    # poucos clientes compram muito e poucos remédios vendem muito (os de ID menor, os mais antigos)
+    clientes = ids_clientes[(len(ids_clientes) * rng.random(tamanho) ** 2.5).astype(np.int64)]
+    posicoes = (len(ids_remedios) * rng.random(tamanho) ** 3).astype(np.int64)
+    remedios, precos = ids_remedios[posicoes], precos_remedios[posicoes]
+
+    # 35% das compras são para um pet do próprio cliente (o primeiro dele, se tiver)
+    donos, ids_pets = contexto["donos_pets"], contexto["ids_pets"]
+    if len(donos):
+        pos = np.minimum(np.searchsorted(donos, clientes), len(donos) - 1)
+        usa_pet = (donos[pos] == clientes) & (rng.random(tamanho) < 0.35)
+        pets = ids_pets[pos]
+    else:
+        usa_pet = pets = np.zeros(tamanho, dtype=bool)
+
+    quantidades = rng.choice(np.arange(1, 6), tamanho, p=_QUANTIDADES)
+    nomes_formas, pesos_formas = _FORMAS_PAGAMENTO
+    formas = rng.choice(len(nomes_formas), tamanho, p=pesos_formas)
+    parcelas = rng.choice(np.arange(1, 13), tamanho, p=_PARCELAS)
+    brutos = precos * quantidades
+    descontos = np.where(rng.random(tamanho) < 0.15, (brutos * rng.uniform(0.05, 0.15, tamanho)).round(2), 0.0)
+    fretes = np.where(rng.random(tamanho) < 0.35, 0.0, rng.choice(_FRETES, tamanho))
+    # mesma conta do compra_routes: bruto - desconto + frete
+    totais = (brutos - descontos + fretes).round(2)
+
+    credito = nomes_formas.index("CARTAO_CREDITO")
+    return [
+        (cliente, remedio, pet if usa else None, quantidade, desconto, total, frete,
+         nomes_formas[forma], parcela if forma == credito else None, preco)
+        for cliente, remedio, pet, usa, quantidade, desconto, total, frete, forma, parcela, preco in zip(
+            clientes.tolist(), remedios.tolist(), pets.tolist(), usa_pet.tolist(), quantidades.tolist(),
+            descontos.tolist(), totais.tolist(), fretes.tolist(), formas.tolist(), parcelas.tolist(), precos.tolist())
+    ]
+
+
+# ordem de inserção (pais antes dos filhos): tabela -> (modelo, gerador)
+_GERADORES = {
+    "usuarios": (Usuario, _gerar_usuarios),
+    "clientes": (Cliente, _gerar_clientes),
+    "colaboradores": (Colaborador, _gerar_colaboradores),
+    "pets": (Pet, _gerar_pets),
+    "remedios": (Remedio, _gerar_remedios),
+    "brinquedos": (Brinquedo, _gerar_brinquedos),
+    "transacoes": (Transacao, _gerar_transacoes),
+}
+
+
+def _colunas(connection, consulta, *tipos):
+    """Resultado de `consulta` como um array do NumPy por coluna (tipos na ordem das colunas)."""
+    import numpy as np
+
+    linhas = connection.execute(consulta).all()
+    return [np.fromiter((linha[k] for linha in linhas), dtype=tipo, count=len(linhas)) for k, tipo in enumerate(tipos)]
+
+
+def _contexto(connection, tabela):
+    """O que o gerador de `tabela` precisa das tabelas já carregadas (IDs, preços, donos dos pets)."""
+    if tabela == "usuarios":
+        from security import bcrypt_context
+        return {"hash_senha": bcrypt_context.hash(SENHA_GERADA)}
+    if tabela == "clientes":
+        return {"ids_usuarios": _colunas(connection, select(Usuario.ID).order_by(Usuario.ID), "int64")[0]}
+    if tabela == "pets":
+        return {"ids_clientes": _colunas(connection, select(Cliente.ID).order_by(Cliente.ID), "int64")[0]}
+    if tabela == "transacoes":
+        ids_clientes = _colunas(connection, select(Cliente.ID).order_by(Cliente.ID), "int64")[0]
+        ids_remedios, precos_remedios = _colunas(
+            connection, select(Remedio.ID, Remedio.PRECO).order_by(Remedio.ID), "int64", "float64")
+        if not len(ids_clientes) or not len(ids_remedios):
+            raise ValueError("transações precisam de clientes e remédios no banco")
+        donos_pets, ids_pets = _colunas(
+            connection,
+            select(Pet.ID_CLIENTE, Pet.ID).where(Pet.ID_CLIENTE.is_not(None)).order_by(Pet.ID_CLIENTE, Pet.ID),
+            "int64", "int64",
+        )
+        return {"ids_clientes": ids_clientes, "ids_remedios": ids_remedios, "precos_remedios": precos_remedios,
+                "donos_pets": donos_pets, "ids_pets": ids_pets}
+    return {}
+
+
+def _inseridor(connection, modelo, colunas):
+    """Função que insere uma lista de tuplas (na ordem de `colunas`) com um executemany.
+
+    Com driver de parâmetros posicionais (SQLite, asyncpg...) as tuplas vão direto para o
+    `executemany` do driver: montar e processar um dict por linha no Core custa mais que
+    o próprio INSERT. Nos outros (psycopg2) cada tupla vira um dict para o `insert()`.
+    """
+    if not connection.dialect.positional:
+        return lambda linhas: connection.execute(insert(modelo), [dict(zip(colunas, linha)) for linha in linhas])
+    compilado = insert(modelo).compile(dialect=connection.dialect, column_keys=list(colunas))
+    ordem = [colunas.index(nome) for nome in compilado.positiontup]
+    if ordem == list(range(len(colunas))):
+        return lambda linhas: connection.exec_driver_sql(str(compilado), linhas)
+    return lambda linhas: connection.exec_driver_sql(str(compilado), [tuple(linha[k] for k in ordem) for linha in linhas])
+
+
+def gerar_dados(connection, quantidades, semente=42, lote=LOTE_PADRAO, progresso=None):
+    """Completa cada tabela de `quantidades` ({"brinquedos": 1_000_000, ...}) até o total pedido.
+
+    Só insere o que falta (a linha i é a i-ésima da tabela), em lotes de `lote` linhas,
+    um executemany por lote, na transação de `connection`. Cada lote sorteia com um
+    gerador do NumPy semeado por (semente, tabela, primeira linha do lote): a mesma
+    semente e as mesmas quantidades dão sempre os mesmos dados. Chaves estrangeiras
+    apontam para IDs que existem no banco.
+
+    Como a carga é fora do ORM, recalcula no fim as estatísticas de brinquedos e o
+    resumo de vendas e sobe a versão das tabelas do catálogo (ETags/cache). O índice
+    de busca recebe as linhas novas de uma vez no fim de cada tabela
+    (`busca.carga_em_massa`).
+    Devolve {tabela: linhas inseridas}.
+    """
+    import numpy as np
+
+    desconhecidas = set(quantidades) - set(_GERADORES)
+    if desconhecidas:
+        raise ValueError(f"tabelas desconhecidas: {sorted(desconhecidas)}")
+
+    inseridas = {}
+    for tabela, (modelo, gerador) in _GERADORES.items():
+        alvo = quantidades.get(tabela, 0)
+        existentes = connection.execute(select(func.count()).select_from(modelo)).scalar()
+        if alvo <= existentes:
+            continue
+        inicio_tabela = time.perf_counter()
+        contexto = _contexto(connection, tabela)
+        inserir = _inseridor(connection, modelo, _COLUNAS[tabela])
+        with carga_em_massa(connection, tabela) if tabela in ("brinquedos", "remedios") else nullcontext():
+            for inicio in range(existentes, alvo, lote):
+                rng = np.random.default_rng([semente, _CODIGOS[tabela], inicio])
+                inserir(gerador(rng, inicio, min(alvo, inicio + lote), contexto))
+        inseridas[tabela] = alvo - existentes
+        if progresso:
+            progresso(tabela, inseridas[tabela], time.perf_counter() - inicio_tabela)
+
+    if "brinquedos" in inseridas:
+        from reconstruir_estatisticas import reconstruir_brinquedos
+        reconstruir_brinquedos(connection)
+    if "transacoes" in inseridas:
+        from reconstruir_estatisticas import reconstruir_vendas_sql
+        reconstruir_vendas_sql(connection)
+    for tabela in ("brinquedos", "remedios"):
+        if tabela in inseridas:
+            incrementar_versao_tabela(connection, tabela)
+    return inseridas
+
+
+def quantidades_para(linhas):
+    """Quantidades padrão de `--linhas N`: N no catálogo, nos clientes e nas transações."""
+    return {
+        "usuarios": int(linhas * 0.9),
+        "clientes": linhas,
+        "colaboradores": max(10, linhas // 1000),
+        "pets": int(linhas * 1.3),
+        "remedios": linhas,
+        "brinquedos": linhas,
+        "transacoes": linhas,
+    }
+
+
+def _mostrar_progresso(tabela, linhas, segundos):
+    print(f"✅ {tabela}: {linhas} linhas em {segundos:.1f} s ({linhas / max(segundos, 1e-9):,.0f} linhas/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Popula o banco com brinquedos de exemplo ou dados sintéticos em volume")
+    parser.add_argument("--gerar", action="store_true", help="gera dados sintéticos em todas as tabelas")
+    parser.add_argument("--linhas", type=int, default=10_000, help="base das quantidades padrão (ver quantidades_para)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=LOTE_PADRAO, help="linhas por executemany")
+    for tabela in _GERADORES:
+        parser.add_argument(f"--{tabela}", type=int, help=f"total de linhas em {tabela} (substitui o padrão)")
+    args = parser.parse_args()
+
+    if not args.gerar:
+        print("🚀 Populando banco de dados com brinquedos de exemplo...\n")
+        seed_brinquedos()
+        return
+
+    quantidades = quantidades_para(args.linhas)
+    for tabela in _GERADORES:
+        if getattr(args, tabela) is not None:
+            quantidades[tabela] = getattr(args, tabela)
+    print(f"🚀 Gerando dados sintéticos (semente {args.semente})...\n")
+    inicio = time.perf_counter()
+    with db.begin() as con:
+        inseridas = gerar_dados(con, quantidades, args.semente, args.lote, progresso=_mostrar_progresso)
+    print(f"\n🎉 {sum(inseridas.values())} linhas em {time.perf_counter() - inicio:.1f} s")
+
+
 if __name__ == "__main__":
-    print("🚀 Populando banco de dados com brinquedos de exemplo...\n")
-    seed_brinquedos()
+    main()
@@ -0,0 +1,72 @@
+"""
+Serialização das rotas de listagem direto do cursor do banco para bytes JSON.
+
+Substitui o caminho antigo `pd.read_sql` -> `to_dict(orient='records')`, que
+montava um DataFrame inteiro (com conversão de NaN/dtypes do NumPy) só para
+devolver uma lista de dicionários. Aqui as linhas saem do cursor como tuplas e
+são codificadas com orjson de uma vez.
+
+Formatos suportados:
+- `registros` (padrão): lista de objetos `{coluna: valor}`, igual à resposta antiga
+- `colunar`: `{"colunas": [...], "linhas": [[...], ...]}`, sem repetir as chaves
+  em cada linha (bem menor para listas grandes)
+
+As rotas usam as versões assíncronas (`buscar_linhas_async`, `resposta_lista`), que
+leem pela AsyncSession da requisição; `buscar_linhas` fica para scripts e benchmarks.
+"""
+from typing import Literal, Sequence
+
+import orjson
+from fastapi import Response
+
+from models import db
+
+FormatoLista = Literal["registros", "colunar"]
+
+
+def buscar_linhas(query):
+    """Executa a query e devolve (colunas, linhas) com cada linha como tupla."""
+    with db.connect() as con:
+        result = con.execute(query)
+        colunas = list(result.keys())
+        linhas = [tuple(linha) for linha in result]
+    return colunas, linhas
+
+
+async def buscar_linhas_async(session, query):
+    """Mesmo que `buscar_linhas`, pela AsyncSession da rota (não bloqueia o event loop)."""
+    # pela conexão da sessão (Core): select(Modelo) volta como colunas, não como objetos do ORM
+    con = await session.connection()
+    result = await con.execute(query)
+    colunas = list(result.keys())
+    linhas = [tuple(linha) for linha in result]
+    return colunas, linhas
+
+
+def montar_dados(colunas: Sequence[str], linhas: Sequence[tuple], formato: FormatoLista = "registros"):
+    """Converte as tuplas do cursor para o formato pedido pelo cliente."""
+    if formato == "colunar":
+        return {"colunas": list(colunas), "linhas": linhas}
+    return [dict(zip(colunas, linha)) for linha in linhas]
+
+
+def registros_ndjson(colunas: Sequence[str], linhas) -> bytes:
+    """Serializa as linhas como NDJSON (um objeto JSON por linha)."""
+    return b"".join(orjson.dumps(dict(zip(colunas, linha))) + b"\n" for linha in linhas)
+
+
+def resposta_json(conteudo) -> Response:
+    """Codifica o conteúdo com orjson (ou usa os bytes já codificados, ex.: do cache) e devolve a resposta."""
+    corpo = conteudo if isinstance(conteudo, bytes) else orjson.dumps(conteudo)
+    return Response(content=corpo, media_type="application/json")
+
+
+async def corpo_lista(session, mensagem: str, query, formato: FormatoLista = "registros", **extras) -> bytes:
+    """Executa a query e devolve o JSON da listagem já em bytes."""
+    colunas, linhas = await buscar_linhas_async(session, query)
+    return orjson.dumps({"mensagem": mensagem, **extras, "data": montar_dados(colunas, linhas, formato)})
+
+
+async def resposta_lista(session, mensagem: str, query, formato: FormatoLista = "registros", **extras) -> Response:
+    """Atalho usado pelas rotas de listagem: executa a query e serializa o resultado."""
+    return resposta_json(await corpo_lista(session, mensagem, query, formato, **extras))
@@ -0,0 +1,61 @@
+"""
+Copia o banco principal (SQLite) para as réplicas de leitura.
+
+Usa a API de backup do sqlite3, que tira uma cópia consistente mesmo com o app
+gravando (inclusive em WAL). Serve para testar localmente o roteamento de leitura:
+
+    DATABASE_URL=sqlite:///./farmpet.db
+    DATABASE_URLS_LEITURA=sqlite:///./farmpet_leitura.db
+
+Execute: python sincronizar_replicas.py [--intervalo 2]
+Sem --intervalo copia uma vez e sai; com ele fica copiando a cada N segundos
+(mantenha abaixo de LEITURA_PRIMARIO_APOS_ESCRITA_S).
+"""
+import argparse
+import sqlite3
+import time
+
+from models import DATABASE_URL, URLS_LEITURA
+
+
+def caminho_sqlite(url):
+    """sqlite:///./arquivo.db -> ./arquivo.db (sqlite:////abs -> /abs)."""
+    if not url.startswith("sqlite") or ":memory:" in url:
+        raise ValueError(f"só bancos SQLite em arquivo podem ser copiados: {url}")
+    return url.split(":///", 1)[1].split("?", 1)[0]
+
+
+def sincronizar(origem, destinos):
+    principal = sqlite3.connect(origem)
+    try:
+        for destino in destinos:
+            replica = sqlite3.connect(destino)
+            try:
+                principal.backup(replica)
+            finally:
+                replica.close()
+    finally:
+        principal.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copia o banco principal para as réplicas de leitura")
+    parser.add_argument("--intervalo", type=float, default=None, help="repete a cópia a cada N segundos")
+    args = parser.parse_args()
+
+    if not URLS_LEITURA:
+        raise SystemExit("Nenhuma réplica configurada (DATABASE_URLS_LEITURA)")
+    origem = caminho_sqlite(DATABASE_URL)
+    destinos = [caminho_sqlite(url) for url in URLS_LEITURA]
+
+    while True:
+        inicio = time.perf_counter()
+        sincronizar(origem, destinos)
+        print(f"{origem} -> {', '.join(destinos)} ({(time.perf_counter() - inicio) * 1000:.0f} ms)")
+        if args.intervalo is None:
+            break
+        time.sleep(args.intervalo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Teste da busca textual (busca.py) e da rota GET /busca.
+
+Cadastra, altera e remove brinquedos e remédios contra um banco SQLite temporário e
+confere que a rota acha o que foi gravado (sem acento, por prefixo, com o nome pesando
+mais que a descrição) e deixa de achar o que foi alterado ou apagado. Confere também
+que o DDL copiado na migração (b8d2f4a6c913) é o mesmo criado por busca.py.
+
+Não precisa do servidor rodando e não mexe no farmpet.db.
+Execute: python test_busca.py   (ou via pytest)
+"""
+import asyncio
+import importlib.util
+import os
+import tempfile
+
+import orjson
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import busca
+from busca_routes import buscar
+from models import Base, Brinquedo, Remedio
+
+MIGRACAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic", "versions",
+                        "b8d2f4a6c913_busca_textual_no_catalogo.py")
+
+
+def preparar_banco():
+    caminho = os.path.join(tempfile.mkdtemp(), 'busca.db')
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)  # o índice nasce junto (evento after_create de busca.py)
+    engine.dispose()
+    return f"sqlite+aiosqlite:///{caminho}"
+
+
+async def _buscar(SessaoAsync, q, tipo=None):
+    """(tipo, id, nome) dos resultados de GET /busca?q=, do mais para o menos relevante."""
+    async with SessaoAsync() as session:
+        resposta = await buscar(q=q, tipo=tipo, limit=20, offset=0, formato="registros", session=session)
+    return [(item["tipo"], item["id"], item["nome"]) for item in orjson.loads(resposta.body)["data"]]
+
+
+async def _ciclo(url):
+    engine = create_async_engine(url)
+    SessaoAsync = async_sessionmaker(bind=engine, expire_on_commit=False)
+    achados = {}
+    try:
+        async with SessaoAsync() as session:
+            session.add_all([
+                Brinquedo("Bola de Pelúcia", "Bola", 20.0, 5, descricao="Macia, para filhotes"),
+                Brinquedo("Corda", "Mordedor", 15.0, 3, descricao="Corda com bola na ponta"),
+                Remedio("Dipirona", "Analgésico para dor", 12.5, 10),
+            ])
+            await session.commit()
+        achados["cadastro"] = await _buscar(SessaoAsync, "bol")
+        achados["sem_acento"] = await _buscar(SessaoAsync, "pelucia")
+        achados["remedio"] = await _buscar(SessaoAsync, "analg", tipo="REMEDIO")
+
+        async with SessaoAsync() as session:
+            await session.execute(update(Brinquedo).where(Brinquedo.ID == 1).values(NOME="Frisbee"))
+            await session.execute(update(Remedio).where(Remedio.ID == 1).values(ESTOQUE=0))  # fora do índice
+            await session.commit()
+        achados["nome_antigo"] = await _buscar(SessaoAsync, "pelucia")
+        achados["nome_novo"] = await _buscar(SessaoAsync, "frisbee")
+        achados["estoque_alterado"] = await _buscar(SessaoAsync, "dipirona")
+
+        async with SessaoAsync() as session:
+            await session.execute(delete(Brinquedo).where(Brinquedo.ID == 2))
+            await session.commit()
+        achados["apagado"] = await _buscar(SessaoAsync, "corda")
+    finally:
+        await engine.dispose()
+    return achados
+
+
+def busca_acompanha_o_catalogo():
+    achados = asyncio.run(_ciclo(preparar_banco()))
+
+    # "Bola" no nome pesa mais do que "bola" na descrição
+    assert achados["cadastro"] == [("BRINQUEDO", 1, "Bola de Pelúcia"), ("BRINQUEDO", 2, "Corda")]
+    assert achados["sem_acento"] == [("BRINQUEDO", 1, "Bola de Pelúcia")]
+    assert achados["remedio"] == [("REMEDIO", 1, "Dipirona")]
+
+    assert achados["nome_antigo"] == []
+    assert achados["nome_novo"] == [("BRINQUEDO", 1, "Frisbee")]
+    assert achados["estoque_alterado"] == [("REMEDIO", 1, "Dipirona")]
+    assert achados["apagado"] == []
+    return achados
+
+
+def migracao_copia_o_ddl_da_busca():
+    especificacao = importlib.util.spec_from_file_location("migracao_busca_textual", MIGRACAO)
+    migracao = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(migracao)
+
+    assert migracao.DDL_SQLITE == busca._DDL_SQLITE
+    assert migracao.DDL_POSTGRES == [
+        f"CREATE INDEX IF NOT EXISTS ix_{tabela}_busca ON {tabela} USING GIN (({busca._documento_postgres(tabela)}))"
+        for tabela in ("brinquedos", "remedios")
+    ]
+    return len(migracao.DDL_SQLITE)
+
+
+def test_busca_acompanha_o_catalogo():
+    busca_acompanha_o_catalogo()
+
+
+def test_migracao_copia_o_ddl_da_busca():
+    migracao_copia_o_ddl_da_busca()
+
+
+if __name__ == "__main__":
+    achados = busca_acompanha_o_catalogo()
+    print(f"✅ busca_acompanha_o_catalogo: {len(achados)} buscas depois de cadastro, alteração e remoção")
+    comandos = migracao_copia_o_ddl_da_busca()
+    print(f"✅ migracao_copia_o_ddl_da_busca: {comandos} comandos iguais aos de busca.py")
@@ -0,0 +1,114 @@
+"""
+Teste do ETag, do 304 e da invalidação do catálogo (cache_catalogo.py).
+
+Lista brinquedos pela rota GET /brinquedos/ contra um banco SQLite temporário: a mesma
+listagem com `If-None-Match` responde 304; depois de um cadastro o ETag muda e o corpo
+traz o brinquedo novo. Se a versão gravada não consegue subir depois do commit, a rota
+responde sem ETag (nunca um 304 com dado velho) até a próxima alteração subir a versão.
+
+Não precisa do servidor rodando e não mexe no farmpet.db.
+Execute: python test_cache_catalogo.py   (ou via pytest)
+"""
+import asyncio
+import logging
+import os
+import tempfile
+
+import orjson
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+import models
+from brinquedo_routes import listar_brinquedos
+from cache_catalogo import cache_catalogo
+from models import Base, Brinquedo, versao_incerta
+
+
+def preparar_banco():
+    caminho = os.path.join(tempfile.mkdtemp(), 'cache.db')
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return f"sqlite+aiosqlite:///{caminho}"
+
+
+async def _listar(SessaoAsync, etag=None):
+    """(status, ETag, nomes dos brinquedos) de GET /brinquedos/."""
+    cabecalhos = [(b"if-none-match", etag.encode())] if etag else []
+    async with SessaoAsync() as session:
+        resposta = await listar_brinquedos(
+            Request({"type": "http", "method": "GET", "path": "/brinquedos/", "query_string": b"", "headers": cabecalhos}),
+            categoria=None, min_preco=None, max_preco=None, em_estoque=None, limit=50, after=None,
+            ordenar="id", offset=0, formato="registros", session=session,
+        )
+    nomes = [item["NOME"] for item in orjson.loads(resposta.body)["data"]] if resposta.status_code == 200 else None
+    return resposta.status_code, resposta.headers.get("etag"), nomes
+
+
+async def _cadastrar(SessaoAsync, nome):
+    async with SessaoAsync() as session:
+        session.add(Brinquedo(nome, "Bola", 10.0, 5))
+        await session.commit()
+
+
+async def _ciclo(url):
+    engine = create_async_engine(url)
+    SessaoAsync = async_sessionmaker(bind=engine, expire_on_commit=False)
+    cache_catalogo.limpar()
+    passos = {}
+    try:
+        await _cadastrar(SessaoAsync, "Bola 1")
+        passos["primeira"] = await _listar(SessaoAsync)
+        passos["revalidada"] = await _listar(SessaoAsync, passos["primeira"][1])
+
+        await _cadastrar(SessaoAsync, "Bola 2")
+        passos["depois_do_cadastro"] = await _listar(SessaoAsync, passos["primeira"][1])
+
+        # a versão não sobe depois do commit: a rota para de usar ETag e cache
+        original = models.incrementar_versao_tabela
+
+        def falhar(connection, tabela):
+            raise RuntimeError("versoes_tabelas indisponível")
+
+        models.incrementar_versao_tabela = falhar
+        nivel = logging.getLogger("farmpet.models").level
+        logging.getLogger("farmpet.models").setLevel(logging.ERROR)
+        try:
+            await _cadastrar(SessaoAsync, "Bola 3")
+        finally:
+            models.incrementar_versao_tabela = original
+            logging.getLogger("farmpet.models").setLevel(nivel)
+        passos["incerta"] = versao_incerta("brinquedos")
+        passos["sem_versao"] = await _listar(SessaoAsync, passos["depois_do_cadastro"][1])
+
+        await _cadastrar(SessaoAsync, "Bola 4")
+        passos["recuperada"] = await _listar(SessaoAsync, passos["depois_do_cadastro"][1])
+        passos["incerta_depois"] = versao_incerta("brinquedos")
+    finally:
+        await engine.dispose()
+    return passos
+
+
+def test_etag_304_e_invalidacao():
+    passos = asyncio.run(_ciclo(preparar_banco()))
+
+    status, etag, nomes = passos["primeira"]
+    assert status == 200 and etag and nomes == ["Bola 1"]
+    assert passos["revalidada"][:2] == (304, etag)
+
+    status, etag_novo, nomes = passos["depois_do_cadastro"]
+    assert status == 200 and etag_novo != etag and nomes == ["Bola 1", "Bola 2"]
+
+    assert passos["incerta"] is True
+    status, sem_etag, nomes = passos["sem_versao"]
+    assert (status, sem_etag) == (200, None) and nomes == ["Bola 1", "Bola 2", "Bola 3"]
+
+    status, etag_final, nomes = passos["recuperada"]
+    assert status == 200 and etag_final not in (None, etag, etag_novo) and len(nomes) == 4
+    assert passos["incerta_depois"] is False
+
+
+if __name__ == "__main__":
+    test_etag_304_e_invalidacao()
+    print("✅ test_etag_304_e_invalidacao: 304 com o ETag atual, ETag novo depois de cada alteração")
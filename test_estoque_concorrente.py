@@ -0,0 +1,323 @@
+"""
+Teste de estresse do controle de estoque sob compras simultâneas.
+
+Dispara centenas de compras em paralelo (rota /compras/criar para remédios e
+/compras/pedido para brinquedos), cada uma com sua própria AsyncSession, contra um
+banco SQLite temporário e confere que o estoque nunca fica negativo e que o número de
+vendas aceitas bate com o estoque inicial. Pedidos com os mesmos produtos em ordens
+opostas baixam o estoque sempre na mesma ordem (sem deadlock no Postgres) e, quando um
+item falta, não baixam nenhum. Faz o mesmo com o ajuste de estoque em lote
+(PATCH /brinquedos/estoque) tirando uma unidade por chamada, confere que um lote com
+um item sem saldo (ou inexistente) é recusado inteiro, em brinquedos e remédios, e mede
+a vazão de checkouts com o versionamento do catálogo ligado e desligado.
+
+Não precisa do servidor rodando e não mexe no farmpet.db.
+Execute: python test_estoque_concorrente.py   (ou via pytest)
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from brinquedo_routes import ajustar_estoque_lote
+from remedio_routes import ajustar_estoque_remedios
+import compra_routes
+from compra_routes import criar_compra, criar_pedido
+import models
+from models import Base, Brinquedo, BrinquedoEstatistica, Cliente, Remedio, Transacao, VersaoTabela
+from schemas import AjusteEstoqueLote, CompraCreate, PedidoCreate
+
+COMPRAS_PARALELAS = 300
+CONEXOES = 32
+ESTOQUE_INICIAL = 100
+
+
+def preparar_banco():
+    caminho = os.path.join(tempfile.mkdtemp(), 'estresse.db')
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)
+    Sessao = sessionmaker(bind=engine)
+    with Sessao() as session:
+        session.add(Cliente(NOME="Cliente Estresse", CPF="00000000000"))
+        session.add(Remedio("Remédio Estresse", "teste", 10.0, ESTOQUE_INICIAL))
+        session.add(Brinquedo("Brinquedo Estresse", "Bola", 5.0, ESTOQUE_INICIAL))
+        session.add(Brinquedo("Outro Brinquedo", "Pelúcia", 8.0, 10))
+        session.commit()
+    return engine, Sessao, f"sqlite+aiosqlite:///{caminho}"
+
+
+async def comprar(SessaoAsync, limite, rota, corpo):
+    """Chama a rota com uma sessão própria. Devolve True se a compra foi aceita."""
+    async with limite, SessaoAsync() as session:
+        try:
+            await rota(corpo, session)
+            return True
+        except HTTPException as exc:
+            assert exc.status_code == 400, exc.detail
+            return False
+
+
+def registrar_comandos(engine, comandos):
+    """Anota (conexão, comando) de cada SQL executado e de cada COMMIT do engine."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def executar(conn, cursor, sql, parametros, contexto, executemany):
+        comandos.append((id(conn.connection.dbapi_connection), " ".join(sql.split())))
+
+    @event.listens_for(engine, "commit")
+    def confirmar(conn):
+        comandos.append((id(conn.connection.dbapi_connection), "COMMIT"))
+
+
+async def _disparar(url, rota, corpos, comandos=None):
+    engine = create_async_engine(url, connect_args={"timeout": 30}, pool_size=CONEXOES)
+    if comandos is not None:
+        registrar_comandos(engine.sync_engine, comandos)
+    SessaoAsync = async_sessionmaker(bind=engine, expire_on_commit=False)
+    limite = asyncio.Semaphore(CONEXOES)
+    try:
+        resultados = await asyncio.gather(*(comprar(SessaoAsync, limite, rota, corpo) for corpo in corpos))
+    finally:
+        await engine.dispose()
+    return sum(resultados)
+
+
+def disparar(url, rota, corpo, comandos=None):
+    """Manda o mesmo corpo COMPRAS_PARALELAS vezes, ou cada corpo da lista uma vez."""
+    corpos = corpo if isinstance(corpo, list) else [corpo] * COMPRAS_PARALELAS
+    return asyncio.run(_disparar(url, rota, corpos, comandos))
+
+
+# cada cenário confere o resultado e devolve (aceitas, estoque final) para o resumo do __main__
+def estresse_estoque_de_remedio():
+    engine, Sessao, url = preparar_banco()
+    compra = CompraCreate(id_cliente=1, id_remedio=1, quantidade=1, forma_pagamento="PIX")
+
+    aceitas = disparar(url, criar_compra, compra)
+
+    with Sessao() as session:
+        estoque = session.scalar(select(Remedio.ESTOQUE).where(Remedio.ID == 1))
+        vendidas = session.scalar(select(func.coalesce(func.sum(Transacao.QUANTIDADE), 0)))
+    engine.dispose()
+
+    assert estoque >= 0
+    assert aceitas == ESTOQUE_INICIAL
+    assert vendidas == ESTOQUE_INICIAL - estoque
+    return aceitas, estoque
+
+
+def estresse_estoque_de_brinquedo():
+    engine, Sessao, url = preparar_banco()
+    pedido = PedidoCreate(
+        id_cliente=1,
+        itens=[{"tipo": "BRINQUEDO", "id_produto": 1, "quantidade": 1}],
+        forma_pagamento="PIX",
+    )
+
+    aceitas = disparar(url, criar_pedido, pedido)
+
+    with Sessao() as session:
+        estoque = session.scalar(select(Brinquedo.ESTOQUE).where(Brinquedo.ID == 1))
+        estatistica = session.get(BrinquedoEstatistica, "Bola")
+    engine.dispose()
+
+    assert estoque >= 0
+    assert aceitas == ESTOQUE_INICIAL
+    assert estatistica.TOTAL_UNIDADES == estoque
+    assert estatistica.EM_FALTA == (1 if estoque == 0 else 0)
+    return aceitas, estoque
+
+
+def estresse_pedidos_em_ordens_opostas():
+    engine, Sessao, url = preparar_banco()
+    itens = [
+        {"tipo": "BRINQUEDO", "id_produto": 1, "quantidade": 1},
+        {"tipo": "BRINQUEDO", "id_produto": 2, "quantidade": 1},
+    ]
+    pedidos = [
+        PedidoCreate(id_cliente=1, itens=itens if i % 2 else itens[::-1], forma_pagamento="PIX")
+        for i in range(40)
+    ]
+    baixas = {}  # sessão -> (tipo, ID) na ordem em que o estoque foi baixado
+    original = compra_routes.baixar_estoque
+
+    async def baixar_anotando(session, modelo, produto_id, quantidade):
+        baixas.setdefault(session, []).append((modelo.__tablename__, produto_id))
+        return await original(session, modelo, produto_id, quantidade)
+
+    compra_routes.baixar_estoque = baixar_anotando
+    try:
+        aceitas = disparar(url, criar_pedido, pedidos)
+    finally:
+        compra_routes.baixar_estoque = original
+
+    with Sessao() as session:
+        estoques = dict(session.execute(select(Brinquedo.ID, Brinquedo.ESTOQUE)).all())
+    engine.dispose()
+
+    # a mesma ordem em todo pedido, qualquer que seja a ordem do carrinho
+    assert all(ordem == sorted(ordem) for ordem in baixas.values())
+    # o brinquedo 2 só tem 10: os outros pedidos são recusados sem baixar o brinquedo 1
+    assert aceitas == 10
+    assert estoques == {1: ESTOQUE_INICIAL - 10, 2: 0}
+    return aceitas, estoques[1]
+
+
+def estresse_ajuste_em_lote():
+    engine, Sessao, url = preparar_banco()
+    # o brinquedo 2 recebe estoque absoluto em todas as chamadas; o 1 perde uma unidade
+    lote = AjusteEstoqueLote(itens=[{"id": 2, "quantidade": 7}, {"id": 1, "delta": -1}])
+
+    aceitas = disparar(url, ajustar_estoque_lote, lote)
+
+    with Sessao() as session:
+        estoque = session.scalar(select(Brinquedo.ESTOQUE).where(Brinquedo.ID == 1))
+        outro = session.scalar(select(Brinquedo.ESTOQUE).where(Brinquedo.ID == 2))
+        bola = session.get(BrinquedoEstatistica, "Bola")
+        pelucia = session.get(BrinquedoEstatistica, "Pelúcia")
+    engine.dispose()
+
+    assert aceitas == ESTOQUE_INICIAL
+    assert estoque == 0 and outro == 7
+    assert (bola.TOTAL_UNIDADES, bola.EM_FALTA, bola.VALOR_ESTOQUE) == (0, 1, 0)
+    assert (pelucia.TOTAL_UNIDADES, pelucia.VALOR_ESTOQUE) == (7, 56.0)
+    return aceitas, estoque
+
+
+async def _lotes_recusados(url):
+    """Status de cada lote recusado; nenhum deles pode ter gravado nada."""
+    engine = create_async_engine(url)
+    SessaoAsync = async_sessionmaker(bind=engine, expire_on_commit=False)
+    lotes = [
+        # o brinquedo 1 tem saldo, o 2 não: o 1 também não pode ser baixado
+        (ajustar_estoque_lote, AjusteEstoqueLote(itens=[{"id": 1, "delta": -1}, {"id": 2, "delta": -11}])),
+        (ajustar_estoque_lote, AjusteEstoqueLote(itens=[{"id": 1, "quantidade": 0}, {"id": 99, "delta": 1}])),
+        (ajustar_estoque_remedios, AjusteEstoqueLote(itens=[{"id": 1, "quantidade": 3}, {"id": 2, "delta": -6}])),
+    ]
+    status = []
+    try:
+        for rota, lote in lotes:
+            async with SessaoAsync() as session:
+                try:
+                    await rota(lote, session)
+                    status.append(200)
+                except HTTPException as exc:
+                    status.append(exc.status_code)
+    finally:
+        await engine.dispose()
+    return status
+
+
+def ajuste_em_lote_recusado_nao_grava_nada():
+    engine, Sessao, url = preparar_banco()
+    with Sessao() as session:
+        session.add(Remedio("Outro Remédio", "teste", 10.0, 5))
+        session.commit()
+        versoes = {v.TABELA: v.VERSAO for v in session.scalars(select(VersaoTabela))}
+
+    status = asyncio.run(_lotes_recusados(url))
+
+    with Sessao() as session:
+        brinquedos = dict(session.execute(select(Brinquedo.ID, Brinquedo.ESTOQUE)).all())
+        remedios = dict(session.execute(select(Remedio.ID, Remedio.ESTOQUE)).all())
+        bola = session.get(BrinquedoEstatistica, "Bola")
+        versoes_depois = {v.TABELA: v.VERSAO for v in session.scalars(select(VersaoTabela))}
+    engine.dispose()
+
+    assert status == [400, 404, 400]
+    assert brinquedos == {1: ESTOQUE_INICIAL, 2: 10}
+    assert remedios == {1: ESTOQUE_INICIAL, 2: 5}
+    assert (bola.TOTAL_UNIDADES, bola.EM_FALTA) == (ESTOQUE_INICIAL, 0)
+    assert versoes_depois == versoes  # rollback: nem o cache do catálogo é invalidado
+    return status
+
+
+def _vazao_de_checkouts(url, versionando):
+    """Compras/s de COMPRAS_PARALELAS checkouts em remédios diferentes, com ou sem o versionamento."""
+    compras = [
+        CompraCreate(id_cliente=1, id_remedio=2 + i % CONEXOES, quantidade=1, forma_pagamento="PIX")
+        for i in range(COMPRAS_PARALELAS)
+    ]
+    comandos = []
+    if not versionando:
+        event.remove(Session, "after_commit", models.subir_versoes_no_commit)
+    try:
+        inicio = time.perf_counter()
+        aceitas = disparar(url, criar_compra, compras, comandos)
+        segundos = time.perf_counter() - inicio
+    finally:
+        if not versionando:
+            event.listen(Session, "after_commit", models.subir_versoes_no_commit)
+    assert aceitas == COMPRAS_PARALELAS
+    return COMPRAS_PARALELAS / segundos, comandos
+
+
+def estresse_vazao_com_versionamento():
+    engine, Sessao, url = preparar_banco()
+    with Sessao() as session:
+        session.add_all(Remedio(f"Remédio {i}", "teste", 10.0, COMPRAS_PARALELAS) for i in range(CONEXOES))
+        session.commit()
+        versao_inicial = session.get(VersaoTabela, "remedios").VERSAO
+
+    sem_versao, _ = _vazao_de_checkouts(url, versionando=False)
+    com_versao, comandos = _vazao_de_checkouts(url, versionando=True)
+
+    with Sessao() as session:
+        versao_final = session.get(VersaoTabela, "remedios").VERSAO
+    engine.dispose()
+
+    # cada checkout sobe a versão, mas só depois do COMMIT da baixa de estoque: a linha
+    # de versoes_tabelas nunca fica presa dentro da transação da compra
+    assert versao_final == versao_inicial + COMPRAS_PARALELAS
+    transacoes = {}  # conexão -> comandos desde o último COMMIT
+    for conexao, comando in comandos:
+        if comando == "COMMIT":
+            pendentes = transacoes.pop(conexao, [])
+            baixou_estoque = any(c.startswith("UPDATE remedios") for c in pendentes)
+            assert not (baixou_estoque and any("versoes_tabelas" in c for c in pendentes)), \
+                "versão subiu dentro da transação do checkout"
+        else:
+            transacoes.setdefault(conexao, []).append(comando)
+    # a transação extra custa um pouco, mas não pode enfileirar os checkouts
+    assert com_versao >= sem_versao / 2, (com_versao, sem_versao)
+    return com_versao, sem_versao
+
+
+def test_estoque_de_remedio_nunca_fica_negativo():
+    estresse_estoque_de_remedio()
+
+
+def test_estoque_de_brinquedo_nunca_fica_negativo():
+    estresse_estoque_de_brinquedo()
+
+
+def test_pedidos_baixam_estoque_na_mesma_ordem():
+    estresse_pedidos_em_ordens_opostas()
+
+
+def test_ajuste_em_lote_nunca_deixa_estoque_negativo():
+    estresse_ajuste_em_lote()
+
+
+def test_ajuste_em_lote_recusado_nao_grava_nada():
+    ajuste_em_lote_recusado_nao_grava_nada()
+
+
+def test_versionamento_nao_enfileira_checkouts():
+    estresse_vazao_com_versionamento()
+
+
+if __name__ == "__main__":
+    for cenario in (estresse_estoque_de_remedio, estresse_estoque_de_brinquedo, estresse_ajuste_em_lote):
+        aceitas, estoque = cenario()
+        print(f"✅ {cenario.__name__}: {COMPRAS_PARALELAS} chamadas, {aceitas} aceitas, estoque final {estoque}")
+    aceitas, estoque = estresse_pedidos_em_ordens_opostas()
+    print(f"✅ estresse_pedidos_em_ordens_opostas: 40 pedidos, {aceitas} aceitos, estoque final {estoque}")
+    status = ajuste_em_lote_recusado_nao_grava_nada()
+    print(f"✅ ajuste_em_lote_recusado_nao_grava_nada: {len(status)} lotes recusados ({status}), nada gravado")
+    com_versao, sem_versao = estresse_vazao_com_versionamento()
+    print(f"✅ estresse_vazao_com_versionamento: {com_versao:.0f} compras/s com versão, {sem_versao:.0f} sem")
@@ -0,0 +1,145 @@
+"""
+Teste da importação em massa do catálogo (importacao_catalogo.py).
+
+Manda arquivos CSV e NDJSON em pedaços pequenos (registros cortados no meio, como
+chegam da rede) e com lotes de 3 registros, contra um banco SQLite temporário, e
+confere o relatório, os dados gravados, as estatísticas de brinquedos, a versão do
+catálogo e o índice de busca.
+
+Não precisa do servidor rodando e não mexe no farmpet.db.
+Execute: python test_importacao_catalogo.py   (ou via pytest)
+"""
+import asyncio
+import os
+import tempfile
+
+from sqlalchemy import case, create_engine, func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import busca  # noqa: F401 (cria o índice de busca junto com as tabelas)
+import importacao_catalogo
+from importacao_catalogo import importar_catalogo
+from models import Base, Brinquedo, BrinquedoEstatistica, Remedio, VersaoTabela
+from schemas import BrinquedoSchema, RemedioSchema
+
+importacao_catalogo.IMPORTACAO_LOTE = 3
+
+CSV_BRINQUEDOS = (
+    "nome,categoria,preco,estoque,descricao\n"
+    "Bola Azul,Bola,12.5,0,\n"                          # já existe: atualiza, descrição vazia fica como está
+    "Urso Novo,Pelúcia,49.9,10,\"Macio, com \"\"laço\"\"\n"
+    "em duas linhas\"\n"                                # campo entre aspas com quebra de linha
+    "Dragão,Dinossauro,30,5,\n"                         # categoria inválida
+    "Corda,Interativo,-3,5,\n"                          # preço inválido
+    "Mordedor X,Mordedor,20,7,primeiro\n"
+    "\n"
+    "Mordedor X,Mordedor,22,8,segundo\n"                # nome repetido no arquivo: vale o último
+)
+
+
+def preparar_banco():
+    caminho = os.path.join(tempfile.mkdtemp(), 'importacao.db')
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)
+    Sessao = sessionmaker(bind=engine)
+    with Sessao() as session:
+        session.add(Brinquedo("Bola Azul", "Bola", 10.0, 5, descricao="Bola de borracha"))
+        session.add(Remedio("Dipirona", "Analgésico", 12.5, 100, "False"))
+        session.commit()
+    return engine, Sessao, f"sqlite+aiosqlite:///{caminho}"
+
+
+async def _pedacos(conteudo, tamanho=7):
+    dados = conteudo.encode("utf-8")
+    for inicio in range(0, len(dados), tamanho):
+        yield dados[inicio:inicio + tamanho]
+
+
+def importar(url, conteudo, modelo, schema, formato, conflito="atualizar"):
+    async def rodar():
+        engine = create_async_engine(url)
+        try:
+            async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+                return await importar_catalogo(_pedacos(conteudo), session, modelo, schema, formato, conflito)
+        finally:
+            await engine.dispose()
+    return asyncio.run(rodar())
+
+
+# cada cenário confere o resultado e devolve o relatório para o resumo do __main__
+def importacao_csv_de_brinquedos():
+    engine, Sessao, url = preparar_banco()
+    relatorio = importar(url, CSV_BRINQUEDOS, Brinquedo, BrinquedoSchema, "csv")
+
+    assert (relatorio["linhas"], relatorio["inseridos"], relatorio["atualizados"], relatorio["com_erro"]) == (6, 2, 2, 2)
+    assert [(erro["linha"], erro["erros"][0]["campo"]) for erro in relatorio["erros"]] == [(5, "categoria"), (6, "preco")]
+
+    with Sessao() as session:
+        brinquedos = {b.NOME: b for b in session.scalars(select(Brinquedo))}
+        estatisticas = {
+            e.CATEGORIA: (e.TOTAL_PRODUTOS, e.TOTAL_UNIDADES, round(e.VALOR_ESTOQUE, 2), e.EM_FALTA)
+            for e in session.scalars(select(BrinquedoEstatistica)) if e.TOTAL_PRODUTOS
+        }
+        estoque = func.coalesce(Brinquedo.ESTOQUE, 0)
+        esperadas = {
+            categoria: (produtos, unidades, round(valor, 2), em_falta)
+            for categoria, produtos, unidades, valor, em_falta in session.execute(
+                select(Brinquedo.CATEGORIA, func.count(), func.sum(estoque), func.sum(Brinquedo.PRECO * estoque),
+                       func.sum(case((estoque == 0, 1), else_=0))).group_by(Brinquedo.CATEGORIA)
+            )
+        }
+        versao = session.get(VersaoTabela, "brinquedos").VERSAO
+        achados = session.execute(text("SELECT rowid / 2 FROM busca_catalogo WHERE busca_catalogo MATCH 'laco'")).scalars().all()
+    engine.dispose()
+
+    assert (brinquedos["Bola Azul"].PRECO, brinquedos["Bola Azul"].ESTOQUE) == (12.5, 0)
+    assert brinquedos["Bola Azul"].DESCRICAO == "Bola de borracha"
+    assert brinquedos["Urso Novo"].DESCRICAO == 'Macio, com "laço"\nem duas linhas'
+    assert (brinquedos["Mordedor X"].PRECO, brinquedos["Mordedor X"].DESCRICAO) == (22.0, "segundo")
+    assert "Dragão" not in brinquedos and "Corda" not in brinquedos
+    assert estatisticas == esperadas
+    assert versao >= 2  # o cadastro inicial e ao menos um lote da importação
+    assert achados == [brinquedos["Urso Novo"].ID]
+    return relatorio
+
+
+def importacao_ndjson_de_remedios_com_conflito_erro():
+    engine, Sessao, url = preparar_banco()
+    conteudo = (
+        '{"nome": "Dipirona", "preco": 15, "estoque": 3}\n'
+        '{"nome": "Amoxicilina", "descricao": "Antibiótico", "preco": 30.9, "estoque": 20, "receita": true}\n'
+        '{"nome": "Quebrado", "preco": \n'
+        '[1, 2]\n'
+        '{"nome": "Meloxicam", "preco": 22, "estoque": 8}'  # última linha sem quebra de linha
+    )
+    relatorio = importar(url, conteudo, Remedio, RemedioSchema, "ndjson", conflito="erro")
+
+    assert (relatorio["linhas"], relatorio["inseridos"], relatorio["atualizados"], relatorio["com_erro"]) == (5, 2, 0, 3)
+    assert sorted((erro["linha"], erro["nome"]) for erro in relatorio["erros"]) == [
+        (1, "Dipirona"), (3, None), (4, None),
+    ]
+
+    with Sessao() as session:
+        remedios = {r.NOME: r for r in session.scalars(select(Remedio))}
+    engine.dispose()
+
+    assert (remedios["Dipirona"].PRECO, remedios["Dipirona"].ESTOQUE) == (12.5, 100)  # não mexeu
+    assert remedios["Amoxicilina"].RECEITA == "True"
+    assert remedios["Meloxicam"].ESTOQUE == 8
+    return relatorio
+
+
+def test_importacao_csv_de_brinquedos():
+    importacao_csv_de_brinquedos()
+
+
+def test_importacao_ndjson_de_remedios_com_conflito_erro():
+    importacao_ndjson_de_remedios_com_conflito_erro()
+
+
+if __name__ == "__main__":
+    for cenario in (importacao_csv_de_brinquedos, importacao_ndjson_de_remedios_com_conflito_erro):
+        relatorio = cenario()
+        print(f"✅ {cenario.__name__}: {relatorio['inseridos']} inseridos, {relatorio['atualizados']} atualizados, "
+              f"{relatorio['com_erro']} com erro")
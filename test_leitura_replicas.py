@@ -0,0 +1,102 @@
+"""
+Teste do roteamento das leituras entre réplicas e primário (dependencies.pegar_sessao_leitura).
+
+Usa dois bancos SQLite temporários, um no papel de primário e outro de réplica (com
+dados diferentes, para saber de onde veio cada leitura), e confere que a leitura vai
+para a réplica, mas volta ao primário logo depois de uma escrita (cookie
+`farmpet_escrita` marcado pelo middleware do main.py) ou com `X-Consistencia: primario`,
+e que o cookie vencido devolve o cliente à réplica.
+
+Não precisa do servidor rodando e não mexe no farmpet.db.
+Execute: python test_leitura_replicas.py   (ou via pytest)
+"""
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+import dependencies
+from dependencies import COOKIE_ESCRITA, JANELA_PRIMARIO_S, EstatisticasPool, pegar_sessao_leitura
+from models import Base, Brinquedo
+
+
+def preparar_banco(nome):
+    caminho = os.path.join(tempfile.mkdtemp(), f'{nome}.db')
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(Brinquedo(nome, "Bola", 10.0, 1))
+        session.commit()
+    engine.dispose()
+    return create_async_engine(f"sqlite+aiosqlite:///{caminho}")
+
+
+def _request(cabecalhos=()):
+    return Request({"type": "http", "method": "GET", "path": "/brinquedos/", "query_string": b"",
+                    "headers": [(nome.encode(), valor.encode()) for nome, valor in cabecalhos]})
+
+
+async def _origem(request):
+    """Nome do banco que respondeu a leitura feita com a sessão de pegar_sessao_leitura."""
+    gerador = pegar_sessao_leitura(request)
+    session = await gerador.__anext__()
+    try:
+        return await session.scalar(select(Brinquedo.NOME))
+    finally:
+        await gerador.aclose()
+
+
+async def _leituras():
+    primario, replica = preparar_banco("primario"), preparar_banco("replica")
+    originais = (dependencies.SessionAsync, dependencies.SessionsLeitura, dependencies._rodizio_leitura,
+                 dict(dependencies.estatisticas_pool))
+    dependencies.SessionAsync = async_sessionmaker(bind=primario, expire_on_commit=False)
+    dependencies.SessionsLeitura = [async_sessionmaker(bind=replica, expire_on_commit=False)]
+    dependencies._rodizio_leitura = itertools.cycle(range(1))
+    dependencies.estatisticas_pool["assincrono"] = EstatisticasPool(primario.sync_engine)
+    dependencies.estatisticas_pool["leitura_1"] = EstatisticasPool(replica.sync_engine)
+    try:
+        return {
+            "sem_cookie": await _origem(_request()),
+            "depois_da_escrita": await _origem(_request([("cookie", f"{COOKIE_ESCRITA}={time.time()}")])),
+            "cookie_vencido": await _origem(
+                _request([("cookie", f"{COOKIE_ESCRITA}={time.time() - JANELA_PRIMARIO_S - 1}")])
+            ),
+            "cookie_invalido": await _origem(_request([("cookie", f"{COOKIE_ESCRITA}=abc")])),
+            "consistencia_primario": await _origem(_request([("x-consistencia", "primario")])),
+            "leituras_na_replica": dependencies.estatisticas_pool["leitura_1"].checkouts,
+        }
+    finally:
+        (dependencies.SessionAsync, dependencies.SessionsLeitura, dependencies._rodizio_leitura, pool) = originais
+        dependencies.estatisticas_pool.clear()
+        dependencies.estatisticas_pool.update(pool)
+        await primario.dispose()
+        await replica.dispose()
+
+
+def leitura_volta_ao_primario_depois_de_escrever():
+    origens = asyncio.run(_leituras())
+
+    assert origens["sem_cookie"] == "replica"
+    assert origens["depois_da_escrita"] == "primario"
+    assert origens["cookie_vencido"] == "replica"
+    assert origens["cookie_invalido"] == "replica"
+    assert origens["consistencia_primario"] == "primario"
+    assert origens["leituras_na_replica"] == 3
+    return origens
+
+
+def test_leitura_volta_ao_primario_depois_de_escrever():
+    leitura_volta_ao_primario_depois_de_escrever()
+
+
+if __name__ == "__main__":
+    origens = leitura_volta_ao_primario_depois_de_escrever()
+    print(f"✅ leitura_volta_ao_primario_depois_de_escrever: {origens['leituras_na_replica']} leituras na réplica, "
+          f"{len(origens) - 1 - origens['leituras_na_replica']} no primário")
@@ -0,0 +1,174 @@
+"""
+Teste da paginação da listagem de brinquedos (GET /brinquedos/).
+
+Percorre a listagem página a página, pelo cursor (`after`) na ordenação por ID e pelo
+offset nas ordenações por preço, tanto no SQL quanto no retrato colunar, contra um banco
+SQLite temporário, e confere que nenhum brinquedo some ou repete. O cursor com outra
+ordenação é recusado com 400. Um cliente que só segue o cabeçalho `Link: rel="next"`
+(sem ler `proximo_cursor`) também chega ao fim da lista. O retrato colunar é um por
+banco, e uma alteração logo depois de uma releitura não dispara outra (a listagem
+filtra em SQL).
+
+Não precisa do servidor rodando e não mexe no farmpet.db.
+Execute: python test_listagem_brinquedos.py   (ou via pytest)
+"""
+import asyncio
+import os
+import re
+import tempfile
+from urllib.parse import parse_qsl, urlsplit
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+import brinquedo_routes
+from brinquedo_routes import listar_brinquedos
+from cache_catalogo import cache_catalogo
+from catalogo_colunar import catalogo_colunar
+from models import Base, Brinquedo
+
+PRECOS = [30.0, 10.0, 50.0, 20.0, 10.0, 40.0, 25.0]
+
+
+def preparar_banco():
+    caminho = os.path.join(tempfile.mkdtemp(), 'listagem.db')
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all(Brinquedo(f"Brinquedo {i}", "Bola", preco, i) for i, preco in enumerate(PRECOS))
+        session.commit()
+    engine.dispose()
+    return f"sqlite+aiosqlite:///{caminho}"
+
+
+async def _listar(session, **parametros):
+    filtros = {"categoria": None, "min_preco": None, "max_preco": None, "em_estoque": None, "limit": 3,
+               "after": None, "ordenar": "id", "offset": 0, "formato": "registros", **parametros}
+    request = Request({"type": "http", "method": "GET", "path": "/brinquedos/", "query_string": b"", "headers": []})
+    resposta = await listar_brinquedos(request, session=session, **filtros)
+    return orjson.loads(resposta.body)
+
+
+async def _percorrer(url, colunar):
+    """(IDs pelo cursor, preços pelo offset) percorrendo todas as páginas."""
+    original, brinquedo_routes.CATALOGO_COLUNAR = brinquedo_routes.CATALOGO_COLUNAR, colunar
+    cache_catalogo.limpar()
+    catalogo_colunar.limpar()
+    reconstrucoes = catalogo_colunar.reconstrucoes
+    engine = create_async_engine(url)
+    try:
+        async with async_sessionmaker(bind=engine)() as session:
+            ids, after = [], None
+            while True:
+                pagina = await _listar(session, after=after)
+                ids += [item["ID"] for item in pagina["data"]]
+                after = pagina["proximo_cursor"]
+                if after is None:
+                    break
+            precos, offset = [], 0
+            while offset is not None:
+                pagina = await _listar(session, ordenar="preco", offset=offset)
+                precos += [item["PRECO"] for item in pagina["data"]]
+                offset = pagina["proximo_offset"]
+            try:
+                await _listar(session, ordenar="preco", after=ids[2])
+                recusado = None
+            except HTTPException as exc:
+                recusado = exc.status_code
+    finally:
+        await engine.dispose()
+        brinquedo_routes.CATALOGO_COLUNAR = original
+    # o retrato foi montado uma vez (e usado em todas as páginas) só no caminho colunar
+    assert catalogo_colunar.reconstrucoes - reconstrucoes == (1 if colunar else 0)
+    return ids, precos, recusado
+
+
+def test_paginas_nao_perdem_brinquedos():
+    url = preparar_banco()
+    for colunar in (False, True):
+        ids, precos, recusado = asyncio.run(_percorrer(url, colunar))
+        assert ids == list(range(1, len(PRECOS) + 1)), colunar
+        assert precos == sorted(PRECOS), colunar
+        assert recusado == 400, colunar
+
+
+async def _seguir_links(url, caminho):
+    """(IDs, cabeçalhos Link) lendo só o corpo `data` e o Link de cada página, a partir de `caminho`."""
+    cache_catalogo.limpar()
+    engine = create_async_engine(url)
+    ids, links = [], []
+    try:
+        async with async_sessionmaker(bind=engine)() as session:
+            while caminho:
+                partes = urlsplit(caminho)
+                parametros = {"categoria": None, "min_preco": None, "max_preco": None, "em_estoque": None,
+                              "limit": 50, "after": None, "ordenar": "id", "offset": 0, "formato": "registros"}
+                for nome, valor in parse_qsl(partes.query):
+                    parametros[nome] = int(valor) if nome in ("limit", "after", "offset") else valor
+                request = Request({"type": "http", "method": "GET", "path": partes.path,
+                                   "query_string": partes.query.encode(), "headers": []})
+                resposta = await listar_brinquedos(request, session=session, **parametros)
+                ids += [item["ID"] for item in orjson.loads(resposta.body)["data"]]
+                link = resposta.headers.get("link")
+                links.append(link)
+                caminho = re.fullmatch(r'<(.+)>; rel="next"', link).group(1) if link else None
+    finally:
+        await engine.dispose()
+    return ids, links
+
+
+def paginas_pelo_cabecalho_link():
+    url = preparar_banco()
+    ids, links = asyncio.run(_seguir_links(url, "/brinquedos/?limit=3"))
+    assert ids == list(range(1, len(PRECOS) + 1))
+    assert links == ['</brinquedos/?limit=3&after=3>; rel="next"', '</brinquedos/?limit=3&after=6>; rel="next"', None]
+
+    # nas outras ordenações o Link avança o offset
+    ids_preco, links_preco = asyncio.run(_seguir_links(url, "/brinquedos/?ordenar=preco&limit=2&offset=0"))
+    assert sorted(ids_preco) == list(range(1, len(PRECOS) + 1))
+    assert links_preco[0] == '</brinquedos/?ordenar=preco&limit=2&offset=2>; rel="next"'
+    return len(links) + len(links_preco)
+
+
+def test_paginas_pelo_cabecalho_link():
+    paginas_pelo_cabecalho_link()
+
+
+async def _retratos(url, outra_url):
+    """Versões dos retratos de dois bancos e o que `obter` devolve depois de uma venda."""
+    catalogo_colunar.limpar()
+    engine, outro = create_async_engine(url), create_async_engine(outra_url)
+    try:
+        async with async_sessionmaker(bind=engine)() as session, async_sessionmaker(bind=outro)() as sessao_outra:
+            primeiro = await catalogo_colunar.obter(session)
+            do_outro = await catalogo_colunar.obter(sessao_outra)
+            mesmo = await catalogo_colunar.obter(session)
+            # uma alteração logo depois da última releitura: filtra em SQL, sem reler
+            session.add(Brinquedo("Brinquedo novo", "Bola", 1.0, 1))
+            await session.commit()
+            depois_da_venda = await catalogo_colunar.obter(session)
+    finally:
+        await engine.dispose()
+        await outro.dispose()
+    return primeiro, do_outro, mesmo, depois_da_venda
+
+
+def test_retrato_por_banco_e_releitura_adiada():
+    primeiro, do_outro, mesmo, depois_da_venda = asyncio.run(_retratos(preparar_banco(), preparar_banco()))
+
+    assert len(primeiro) == len(PRECOS) and mesmo is primeiro
+    assert do_outro is not primeiro  # cada engine tem o seu retrato
+    assert depois_da_venda is None
+
+
+if __name__ == "__main__":
+    test_paginas_nao_perdem_brinquedos()
+    print(f"✅ test_paginas_nao_perdem_brinquedos: {len(PRECOS)} brinquedos, SQL e retrato colunar")
+    paginas = paginas_pelo_cabecalho_link()
+    print(f"✅ paginas_pelo_cabecalho_link: {paginas} páginas seguindo o Link rel=\"next\"")
+    test_retrato_por_banco_e_releitura_adiada()
+    print("✅ test_retrato_por_banco_e_releitura_adiada")
@@ -0,0 +1,115 @@
+"""
+Teste da precificação das transações (models.precificar_transacoes).
+
+Grava várias transações de uma vez, com remédios já carregados na sessão e outros não,
+contra um banco SQLite temporário, e confere PRECO_UNITARIO e VALOR_TOTAL, que os
+preços faltantes vieram de uma única consulta e que a reconstrução do preço feita pela
+migração (d93a0b6c5e18) devolve o mesmo preço a partir do total gravado.
+
+Não precisa do servidor rodando e não mexe no farmpet.db.
+Execute: python test_precificacao_transacoes.py   (ou via pytest)
+"""
+import importlib.util
+import os
+import tempfile
+
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.orm import Session
+
+from models import Base, Cliente, Remedio, Transacao
+
+MIGRACAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic", "versions",
+                        "d93a0b6c5e18_preco_unitario_em_transacoes.py")
+
+
+def preparar_banco():
+    caminho = os.path.join(tempfile.mkdtemp(), 'precificacao.db')
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(Cliente(NOME="Cliente Preço", CPF="00000000000"))
+        session.add_all([
+            Remedio("Dipirona", "Analgésico", 12.5, 100),
+            Remedio("Amoxicilina", "Antibiótico", 30.0, 100),
+            Remedio("Meloxicam", "Anti-inflamatório", 22.0, 100),
+        ])
+        session.commit()
+    return engine
+
+
+def consultas_de_preco(engine):
+    """Lista que recebe cada SELECT feito na tabela de remédios."""
+    consultas = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def contar(conn, cursor, sql, parametros, contexto, executemany):
+        if sql.lstrip().upper().startswith("SELECT") and "remedios" in sql:
+            consultas.append(sql)
+
+    return consultas
+
+
+def _dados_transacoes(engine):
+    with Session(engine) as session:
+        dipirona = session.get(Remedio, 1)  # fica no identity map: não precisa de consulta
+        consultas = consultas_de_preco(engine)
+        session.add_all([
+            Transacao(1, dipirona.ID, None, 2),
+            Transacao(1, 2, None, 3, valor_desconto=5.0),
+            Transacao(1, 3, None, 1, valor_frete=7.5),
+            Transacao(1, 2, None, 1),
+            Transacao(1, 3, None, 4, valor_desconto=2.0, valor_frete=1.0),
+        ])
+        session.commit()
+        linhas = session.execute(
+            select(Transacao.ID_REMEDIO, Transacao.QUANTIDADE, Transacao.PRECO_UNITARIO, Transacao.VALOR_TOTAL)
+            .order_by(Transacao.ID)
+        ).all()
+    return linhas, consultas
+
+
+def test_precos_das_transacoes_vem_de_uma_consulta():
+    engine = preparar_banco()
+    linhas, consultas = _dados_transacoes(engine)
+
+    assert [tuple(linha) for linha in linhas] == [
+        (1, 2, 12.5, 25.0),
+        (2, 3, 30.0, 85.0),
+        (3, 1, 22.0, 29.5),
+        (2, 1, 30.0, 30.0),
+        (3, 4, 22.0, 87.0),
+    ]
+    # Amoxicilina e Meloxicam numa única consulta; a Dipirona já estava na sessão
+    assert len(consultas) == 1
+
+    # preço alterado depois da venda não muda as transações já gravadas
+    with Session(engine) as session:
+        session.get(Remedio, 2).PRECO = 99.0
+        transacao = session.get(Transacao, 2)
+        transacao.QUANTIDADE = 4
+        session.commit()
+        assert (transacao.PRECO_UNITARIO, transacao.VALOR_TOTAL) == (30.0, 115.0)
+    engine.dispose()
+
+
+def test_migracao_reconstroi_o_preco_pelo_total():
+    engine = preparar_banco()
+    linhas, _ = _dados_transacoes(engine)
+
+    especificacao = importlib.util.spec_from_file_location("migracao_preco_unitario", MIGRACAO)
+    migracao = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(migracao)
+
+    with engine.begin() as conexao:
+        conexao.execute(text('UPDATE transacoes SET "PRECO_UNITARIO" = NULL'))
+        conexao.execute(text(migracao.PRECO_UNITARIO_PELO_TOTAL))
+        reconstruidos = conexao.execute(text('SELECT "PRECO_UNITARIO" FROM transacoes ORDER BY "ID"')).scalars().all()
+    engine.dispose()
+
+    assert reconstruidos == [linha.PRECO_UNITARIO for linha in linhas]
+
+
+if __name__ == "__main__":
+    for teste in (test_precos_das_transacoes_vem_de_uma_consulta, test_migracao_reconstroi_o_preco_pelo_total):
+        teste()
+        print(f"✅ {teste.__name__}")
@@ -0,0 +1,98 @@
+"""
+Teste da fila do serviço de senhas (security.ServicoSenhas) sob saturação.
+
+Usa um contexto de senhas falso que só termina o "hash" quando o teste manda, com 1
+trabalhador e fila de 1: a terceira chamada simultânea é recusada na hora com 503 e
+`Retry-After` (também na resposta HTTP, por uma rota mínima servida pelo transporte
+ASGI do httpx). Quem desiste de esperar (cliente desconectou) não libera a vaga antes
+de o hash terminar.
+
+Não precisa do servidor rodando e não mexe no farmpet.db.
+Execute: python test_servico_senhas.py   (ou via pytest)
+"""
+import asyncio
+import threading
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from security import ServicoSenhas
+
+
+class ContextoTravado:
+    """Contexto de senhas cujo hash fica preso até `liberar()`."""
+
+    def __init__(self):
+        self._liberado = threading.Event()
+
+    def hash(self, senha):
+        self._liberado.wait(10)
+        return f"hash-{senha}"
+
+    def verify(self, senha, senha_hash):
+        return self.hash(senha) == senha_hash
+
+    def liberar(self):
+        self._liberado.set()
+
+
+async def _saturar():
+    contexto = ContextoTravado()
+    servico = ServicoSenhas(contexto, trabalhadores=1, fila_maxima=1)
+    app = FastAPI()
+
+    @app.post("/senha")
+    async def gerar(senha: str):
+        return {"hash": await servico.hash(senha)}
+
+    resultado = {}
+    rodando = asyncio.create_task(servico.hash("a"))
+    na_fila = asyncio.create_task(servico.hash("b"))
+    await asyncio.sleep(0.05)
+    try:
+        await servico.hash("c")
+    except HTTPException as exc:
+        resultado["recusada"] = (exc.status_code, exc.headers)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://senhas") as cliente:
+        resposta = await cliente.post("/senha", params={"senha": "d"})
+        resultado["http"] = (resposta.status_code, resposta.headers.get("retry-after"))
+
+        # quem estava na fila desiste: a vaga continua ocupada até o hash terminar
+        na_fila.cancel()
+        await asyncio.sleep(0.05)
+        resultado["pendentes_apos_cancelar"] = servico.metricas()["em_execucao"] + servico.metricas()["na_fila"]
+
+        contexto.liberar()
+        resultado["primeira"] = await rodando
+        for _ in range(100):
+            if servico.metricas()["em_execucao"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        resposta = await cliente.post("/senha", params={"senha": "e"})
+        resultado["depois"] = (resposta.status_code, resposta.json())
+    resultado["metricas"] = servico.metricas()
+    return resultado
+
+
+def senhas_saturadas_respondem_503():
+    resultado = asyncio.run(_saturar())
+
+    assert resultado["recusada"] == (503, {"Retry-After": "1"})
+    assert resultado["http"] == (503, "1")
+    assert resultado["pendentes_apos_cancelar"] == 2
+    assert resultado["primeira"] == "hash-a"
+    assert resultado["depois"] == (200, {"hash": "hash-e"})
+    assert resultado["metricas"]["rejeitadas"] == 2
+    assert resultado["metricas"]["pico_pendentes"] == 2
+    return resultado["metricas"]
+
+
+def test_senhas_saturadas_respondem_503():
+    senhas_saturadas_respondem_503()
+
+
+if __name__ == "__main__":
+    metricas = senhas_saturadas_respondem_503()
+    print(f"✅ senhas_saturadas_respondem_503: {metricas['rejeitadas']} recusadas com Retry-After, "
+          f"{metricas['concluidas']} concluídas")
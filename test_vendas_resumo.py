@@ -0,0 +1,148 @@
+"""
+Teste do resumo de vendas (vendas_resumo) e da rota GET /vendas/resumo.
+
+Cria, altera e remove compras pelas rotas de /compras contra um banco SQLite
+temporário (mais um pedido, que fica de fora) e confere que o resumo mantido pelos
+eventos bate com o recalculado do zero por `reconstruir_vendas` (pandas, em blocos
+pequenos), por `reconstruir_vendas_sql` e pela carga SQL da migração (c5a8e3d7f214), e
+que a rota ordena e totaliza certo.
+
+Não precisa do servidor rodando e não mexe no farmpet.db.
+Execute: python test_vendas_resumo.py   (ou via pytest)
+"""
+import asyncio
+import importlib.util
+import os
+import tempfile
+
+import orjson
+from sqlalchemy import create_engine, delete, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from compra_routes import atualizar_compra, criar_compra, criar_pedido, deletar_compra
+from models import Base, Cliente, Pet, Remedio, VendaResumo
+from reconstruir_estatisticas import reconstruir_vendas, reconstruir_vendas_sql
+from schemas import CompraCreate, PedidoCreate
+from vendas_routes import resumo_vendas
+
+MIGRACAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic", "versions",
+                        "c5a8e3d7f214_resumo_de_vendas.py")
+
+
+def preparar_banco():
+    caminho = os.path.join(tempfile.mkdtemp(), 'vendas.db')
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)
+    Sessao = sessionmaker(bind=engine)
+    with Sessao() as session:
+        session.add_all([Cliente(NOME="Ana", CPF="11111111111"), Cliente(NOME="Bruno", CPF="22222222222")])
+        session.add(Pet(NOME="Rex", ID_CLIENTE=1))
+        session.add_all([Remedio("Dipirona", "teste", 10.0, 100), Remedio("Amoxicilina", "teste", 30.0, 100)])
+        session.commit()
+    return engine, Sessao, f"sqlite+aiosqlite:///{caminho}"
+
+
+def resumo(Sessao):
+    with Sessao() as session:
+        return {
+            (linha.DIMENSAO, linha.CHAVE): (linha.TRANSACOES, linha.UNIDADES, round(linha.RECEITA, 2))
+            for linha in session.scalars(select(VendaResumo))
+        }
+
+
+async def _movimentar(url):
+    engine = create_async_engine(url)
+    SessaoAsync = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        compras = [
+            CompraCreate(id_cliente=1, id_remedio=1, id_pet=1, quantidade=2, forma_pagamento="PIX"),
+            CompraCreate(id_cliente=1, id_remedio=2, quantidade=1, valor_frete=5.0, forma_pagamento="PIX"),
+            CompraCreate(id_cliente=2, id_remedio=1, quantidade=3, valor_desconto=2.0, forma_pagamento="BOLETO"),
+            CompraCreate(id_cliente=2, id_remedio=2, quantidade=1, forma_pagamento="CARTAO_CREDITO", parcelas=3),
+        ]
+        for compra in compras:
+            async with SessaoAsync() as session:
+                await criar_compra(compra, session)
+        async with SessaoAsync() as session:
+            # troca remédio, quantidade, cliente e forma de pagamento da primeira compra
+            await atualizar_compra(1, CompraCreate(id_cliente=2, id_remedio=2, quantidade=4, forma_pagamento="DINHEIRO"), session)
+        async with SessaoAsync() as session:
+            await deletar_compra(4, session)
+        async with SessaoAsync() as session:
+            # pedidos de vários itens ficam fora do resumo (nos eventos e na reconstrução)
+            await criar_pedido(PedidoCreate(
+                id_cliente=1, itens=[{"tipo": "REMEDIO", "id_produto": 1, "quantidade": 5}], forma_pagamento="PIX",
+            ), session)
+
+        async with SessaoAsync() as session:
+            por_remedio = await resumo_vendas(por="remedio", ordenar="unidades", limit=1, offset=0, session=session)
+        async with SessaoAsync() as session:
+            por_forma = await resumo_vendas(por="forma_pagamento", ordenar="receita", limit=20, offset=0, session=session)
+    finally:
+        await engine.dispose()
+    return orjson.loads(por_remedio.body), orjson.loads(por_forma.body)
+
+
+# cada cenário confere o resultado e devolve o que o __main__ resume
+def resumo_incremental_bate_com_o_recalculado():
+    engine, Sessao, url = preparar_banco()
+    asyncio.run(_movimentar(url))
+
+    incremental = resumo(Sessao)
+    with engine.begin() as con:
+        reconstruir_vendas(con, lote=2)
+    recalculado = resumo(Sessao)
+    with engine.begin() as con:
+        reconstruir_vendas_sql(con)
+    recalculado_no_banco = resumo(Sessao)
+
+    especificacao = importlib.util.spec_from_file_location("migracao_resumo_de_vendas", MIGRACAO)
+    migracao = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(migracao)
+    with engine.begin() as con:
+        con.execute(delete(VendaResumo.__table__))
+        con.execute(text(migracao.RESUMO_PELAS_TRANSACOES))
+    carga_da_migracao = resumo(Sessao)
+    engine.dispose()
+
+    # compras 1 (alterada: 4 x Amoxicilina), 2 e 3; a 4 foi removida
+    por_remedio = [numeros for (dimensao, _), numeros in incremental.items() if dimensao == "REMEDIO"]
+    assert tuple(round(sum(coluna), 2) for coluna in zip(*por_remedio)) == (3, 8, 183.0)
+    assert incremental[("FORMA_PAGAMENTO", "PIX")] == (1, 1, 35.0)  # somada depois do commit
+    assert incremental[("REMEDIO", "2")] == (2, 5, 155.0)
+    assert ("PET", "1") not in incremental  # a compra alterada perdeu o pet
+    assert ("FORMA_PAGAMENTO", "CARTAO_CREDITO") not in incremental
+    assert incremental == recalculado == recalculado_no_banco == carga_da_migracao
+    return incremental
+
+
+def rota_ordena_e_totaliza():
+    engine, Sessao, url = preparar_banco()
+    por_remedio, por_forma = asyncio.run(_movimentar(url))
+    engine.dispose()
+
+    assert por_remedio["total"] == {"transacoes": 3, "unidades": 8, "receita": 183.0, "ticket_medio": 61.0}
+    assert por_remedio["data"] == [
+        {"id": 2, "nome": "Amoxicilina", "transacoes": 2, "unidades": 5, "receita": 155.0, "ticket_medio": 77.5}
+    ]
+    assert por_remedio["proximo_offset"] == 1
+    assert [(linha["forma_pagamento"], linha["receita"]) for linha in por_forma["data"]] == [
+        ("DINHEIRO", 120.0), ("PIX", 35.0), ("BOLETO", 28.0)
+    ]
+    return por_forma
+
+
+def test_resumo_incremental_bate_com_o_recalculado():
+    resumo_incremental_bate_com_o_recalculado()
+
+
+def test_rota_ordena_e_totaliza():
+    rota_ordena_e_totaliza()
+
+
+if __name__ == "__main__":
+    linhas = resumo_incremental_bate_com_o_recalculado()
+    print(f"✅ resumo_incremental_bate_com_o_recalculado: {len(linhas)} linhas no resumo")
+    por_forma = rota_ordena_e_totaliza()
+    print(f"✅ rota_ordena_e_totaliza: {len(por_forma['data'])} formas de pagamento")
@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, Query
+from dependencies import pegar_sessao_leitura
+from models import Cliente, Pet, Remedio, VendaResumo
+from schemas import DimensaoVendas, OrdenacaoVendas
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from serializador import resposta_json
+
+vendas_router = APIRouter(prefix="/vendas", tags=["Vendas"])
+
+# dimensão pedida na URL -> (DIMENSAO no resumo, modelo de onde vem o nome)
+DIMENSOES = {
+    "forma_pagamento": ("FORMA_PAGAMENTO", None),
+    "remedio": ("REMEDIO", Remedio),
+    "cliente": ("CLIENTE", Cliente),
+    "pet": ("PET", Pet),
+}
+COLUNAS_ORDEM = {"receita": VendaResumo.RECEITA, "unidades": VendaResumo.UNIDADES, "transacoes": VendaResumo.TRANSACOES}
+
+
+def _numeros(transacoes, unidades, receita):
+    return {
+        "transacoes": transacoes,
+        "unidades": unidades,
+        "receita": round(receita, 2),
+        "ticket_medio": round(receita / transacoes, 2) if transacoes else None,
+    }
+
+
+@vendas_router.get("/resumo", summary="Receita, unidades e ticket médio das vendas por dimensão")
+async def resumo_vendas(
+    por: DimensaoVendas = Query("forma_pagamento", description="forma_pagamento, remedio, cliente ou pet"),
+    ordenar: OrdenacaoVendas = Query("receita", description="receita, unidades ou transacoes (do maior para o menor)"),
+    limit: int = Query(20, ge=1, le=500, description="Quantidade máxima de linhas por página"),
+    offset: int = Query(0, ge=0, le=10_000, description="Linhas a pular (use o `proximo_offset` da resposta anterior)"),
+    session: AsyncSession = Depends(pegar_sessao_leitura)
+):
+    """
+    Relatório de vendas (transações) agrupado por `por`, dos que mais venderam para os
+    que menos venderam, mais o total geral.
+
+    Cada linha traz transações, unidades, receita (soma do VALOR_TOTAL) e ticket médio
+    (receita / transações). Lê o resumo pré-agregado `vendas_resumo`, atualizado a cada
+    compra criada, alterada ou removida: o custo não cresce com o número de transações.
+    As formas de pagamento são somadas logo depois do commit de cada compra. Pedidos de
+    vários itens (`/compras/pedido`) ficam fora do relatório.
+
+    **Exemplos:** `?por=forma_pagamento`, `?por=remedio&ordenar=unidades&limit=10` (top remédios)
+    """
+    dimensao, modelo = DIMENSOES[por]
+    ordem = COLUNAS_ORDEM[ordenar]
+    linhas = (await session.execute(
+        select(VendaResumo.CHAVE, VendaResumo.TRANSACOES, VendaResumo.UNIDADES, VendaResumo.RECEITA)
+        .where(VendaResumo.DIMENSAO == dimensao)
+        .order_by(ordem.desc(), VendaResumo.CHAVE)
+        .limit(limit + 1)
+        .offset(offset)
+    )).all()
+    # toda transação tem remédio: o total geral é a soma das linhas REMEDIO
+    total = (await session.execute(
+        select(func.coalesce(func.sum(VendaResumo.TRANSACOES), 0), func.coalesce(func.sum(VendaResumo.UNIDADES), 0),
+               func.coalesce(func.sum(VendaResumo.RECEITA), 0.0))
+        .where(VendaResumo.DIMENSAO == "REMEDIO")
+    )).one()
+
+    proximo_offset = None
+    if len(linhas) > limit:
+        linhas = linhas[:limit]
+        proximo_offset = offset + limit
+
+    if modelo is None:
+        dados = [{"forma_pagamento": chave, **_numeros(*numeros)} for chave, *numeros in linhas]
+    else:
+        ids = [int(chave) for chave, *_ in linhas]
+        nomes = dict((await session.execute(select(modelo.ID, modelo.NOME).where(modelo.ID.in_(ids)))).all()) if ids else {}
+        dados = [{"id": id_linha, "nome": nomes.get(id_linha), **_numeros(*numeros)}
+                 for id_linha, (_, *numeros) in zip(ids, linhas)]
+
+    return resposta_json({
+        "mensagem": f"Vendas por {por}",
+        "total": _numeros(*total),
+        "proximo_offset": proximo_offset,
+        "data": dados,
+    })